@@ -0,0 +1,30 @@
+"""add_authz_updated_at_to_users
+
+Revision ID: 3f1c9a7d2e4b
+Revises: a441a4eff166
+Create Date: 2026-10-18 15:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2e4b'
+down_revision: Union[str, None] = 'a441a4eff166'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('authz_updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_users_authz_updated_at'), 'users', ['authz_updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_users_authz_updated_at'), table_name='users')
+    op.drop_column('users', 'authz_updated_at')
@@ -0,0 +1,40 @@
+"""add_unique_active_job_per_kind
+
+Revision ID: 4e8a1c3b7d9f
+Revises: 9d4f2b6c8e1a
+Create Date: 2026-10-18 21:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e8a1c3b7d9f'
+down_revision: Union[str, None] = '9d4f2b6c8e1a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Tarefas ativas repetidas (criadas antes do índice): fica só a mais antiga de cada tipo
+    op.execute("""
+        UPDATE jobs SET status = 'FAILED', finished_at = now(),
+            last_error = 'Tarefa repetida: já existia outra do mesmo tipo em fila ou em execução.'
+        WHERE status IN ('QUEUED', 'RUNNING')
+          AND id NOT IN (
+              SELECT DISTINCT ON (kind) id FROM jobs
+              WHERE status IN ('QUEUED', 'RUNNING')
+              ORDER BY kind, created_at
+          )
+    """)
+    op.create_index('uq_jobs_active_kind', 'jobs', ['kind'], unique=True,
+                    postgresql_where=sa.text("status IN ('QUEUED', 'RUNNING')"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_jobs_active_kind', table_name='jobs', postgresql_where=sa.text("status IN ('QUEUED', 'RUNNING')"))
@@ -0,0 +1,42 @@
+"""add_league_id_and_listing_indexes_to_games
+
+Revision ID: 5c7e9a1b3d2f
+Revises: 8b2d4e6f1a3c
+Create Date: 2026-10-18 18:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c7e9a1b3d2f'
+down_revision: Union[str, None] = '8b2d4e6f1a3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # league_id fica a NULL nos jogos existentes até à próxima sincronização (é um dos SYNCED_FIELDS)
+    op.add_column('games', sa.Column('league_id', sa.Integer(), nullable=True, comment='O ID da liga na API-Futebol'))
+    # (game_time, id) substitui o índice só sobre game_time
+    op.drop_index(op.f('ix_games_game_time'), table_name='games')
+    op.create_index('ix_games_game_time_id', 'games', ['game_time', 'id'], unique=False)
+    op.create_index('ix_games_league_id_game_time_id', 'games', ['league_id', 'game_time', 'id'], unique=False)
+    op.create_index('ix_games_status_game_time_id', 'games', ['status', 'game_time', 'id'], unique=False)
+    op.create_index('ix_games_home_team_id_game_time_id', 'games', ['home_team_id', 'game_time', 'id'], unique=False)
+    op.create_index('ix_games_away_team_id_game_time_id', 'games', ['away_team_id', 'game_time', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_games_away_team_id_game_time_id', table_name='games')
+    op.drop_index('ix_games_home_team_id_game_time_id', table_name='games')
+    op.drop_index('ix_games_status_game_time_id', table_name='games')
+    op.drop_index('ix_games_league_id_game_time_id', table_name='games')
+    op.drop_index('ix_games_game_time_id', table_name='games')
+    op.create_index(op.f('ix_games_game_time'), 'games', ['game_time'], unique=False)
+    op.drop_column('games', 'league_id')
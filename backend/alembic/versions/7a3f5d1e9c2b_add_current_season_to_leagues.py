@@ -0,0 +1,28 @@
+"""add_current_season_to_leagues
+
+Revision ID: 7a3f5d1e9c2b
+Revises: 4e8a1c3b7d9f
+Create Date: 2026-10-18 22:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3f5d1e9c2b'
+down_revision: Union[str, None] = '4e8a1c3b7d9f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('leagues', sa.Column('current_season', sa.Integer(), nullable=True, comment='Temporada em curso na API-Futebol'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('leagues', 'current_season')
@@ -2,22 +2,22 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 from pydantic import ValidationError
+from typing import Any, Dict, Optional, Tuple
 from uuid import UUID
 
 from app.core.config import settings
-from app.db.session import get_db_session
+from app.db.session import ReadOnlySessionLocal, get_db_session
 from app.models.user import User
-from app.models.role import Role
+from app.services.principal_cache import Principal, principal_cache
 import app.crud.crud_user as crud_user
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"/api/v1/auth/login"
 )
 
-async def _get_user_from_token(token: str, db: AsyncSession) -> User | None:
-    """Lógica central para descodificar um token e buscar o utilizador."""
+def _decode_token(token: str) -> Optional[Tuple[UUID, Dict[str, Any]]]:
+    """Valida o JWT e devolve o ID do utilizador e o payload."""
     if not token:
         return None
     try:
@@ -27,26 +27,75 @@ async def _get_user_from_token(token: str, db: AsyncSession) -> User | None:
         user_id: UUID = UUID(payload.get("sub"))
         if user_id is None:
             return None
-    except (JWTError, ValidationError, AttributeError):
+    except (JWTError, ValidationError, AttributeError, ValueError, TypeError):
+        return None
+    return user_id, payload
+
+async def _get_user_from_token(token: str, db: AsyncSession) -> User | None:
+    """Lógica central para descodificar um token e buscar o utilizador."""
+    decoded = _decode_token(token)
+    if decoded is None:
         return None
-    
-    user = await crud_user.get_user_by_id_with_permissions(db, user_id=user_id)
+    user = await crud_user.get_user_by_id_with_permissions(db, user_id=decoded[0])
     return user
 
+async def get_principal_from_token(token: str) -> Principal | None:
+    """
+    Resolve um token para o Principal do utilizador. Com a cache preenchida não há
+    descodificação do JWT nem acesso à base de dados. Numa falha, usa as permissões
+    incluídas no token (JWT_EMBED_PERMISSIONS), se não forem anteriores a uma alteração
+    dos planos do utilizador; caso contrário carrega o utilizador com os roles e permissões
+    numa sessão própria. O resultado fica em cache.
+    """
+    if not token:
+        return None
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    decoded = _decode_token(token)
+    if decoded is None:
+        return None
+    user_id, payload = decoded
+    generation = principal_cache.generation
+    if not principal_cache.is_stale(user_id, payload.get("iat")):
+        principal = Principal.from_claims(user_id, payload)
+    if principal is None:
+        async with ReadOnlySessionLocal() as db:
+            user = await crud_user.get_user_by_id_with_permissions(db, user_id=user_id)
+            if user is None:
+                return None
+            principal = Principal.from_user(user)
+    principal_cache.put(token, principal, expires_at=float(payload.get("exp", 0)), generation=generation)
+    return principal
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Não foi possível validar as credenciais",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
 async def get_current_user(
     db: AsyncSession = Depends(get_db_session), token: str = Depends(reusable_oauth2)
 ) -> User:
-    """Dependência para rotas HTTP."""
+    """
+    Dependência para rotas HTTP que precisam do objeto User (ex: alterar os dados do próprio
+    utilizador). As rotas que só precisam do ID ou das permissões devem usar get_current_principal.
+    """
     user = await _get_user_from_token(token=token, db=db)
     if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Não foi possível validar as credenciais",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_exception()
     return user
 
-def get_current_superuser(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_principal(token: str = Depends(reusable_oauth2)) -> Principal:
+    """Dependência para rotas HTTP que só precisam do ID, flags ou permissões do utilizador."""
+    principal = await get_principal_from_token(token)
+    if principal is None:
+        raise _credentials_exception()
+    return principal
+
+def get_current_superuser(current_user: Principal = Depends(get_current_principal)) -> Principal:
     """Verifica se o utilizador é um superutilizador."""
     if not current_user.is_superuser:
         raise HTTPException(
@@ -58,16 +107,9 @@ def get_current_superuser(current_user: User = Depends(get_current_user)) -> Use
 def require_permission(permission_name: str):
     """Verifica se o utilizador tem uma permissão específica."""
     async def permission_checker(
-        current_user: User = Depends(get_current_user)
-    ) -> User:
-        if current_user.is_superuser:
-            return current_user
-        user_permissions = {
-            permission.name 
-            for role in current_user.roles 
-            for permission in role.permissions
-        }
-        if permission_name not in user_permissions:
+        current_user: Principal = Depends(get_current_principal)
+    ) -> Principal:
+        if not current_user.has_permission(permission_name):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Você não tem permissão para aceder a este recurso.",
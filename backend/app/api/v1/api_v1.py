@@ -11,6 +11,7 @@ from app.api.v1.endpoints import (
     predictions,
     admin_users,
     admin_tasks,
+    admin_metrics,
     bets
 )
 
@@ -30,3 +31,4 @@ api_router_v1.include_router(permissions.router, prefix="/admin/permissions", ta
 api_router_v1.include_router(admin_users.router, prefix="/admin/users", tags=["Admin - Gestão de Utilizadores"])
 # O router admin_tasks já está incluído, garantimos que o ficheiro está atualizado
 api_router_v1.include_router(admin_tasks.router, prefix="/admin/tasks", tags=["Admin - Tarefas"])
+api_router_v1.include_router(admin_metrics.router, prefix="/admin/metrics", tags=["Admin - Métricas"])
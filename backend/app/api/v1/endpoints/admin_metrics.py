@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps.current_user import get_current_superuser
+from app.db.session import engine, replica_router
+from app.services import ai_response_cache
+from app.services.game_list_cache import game_list_cache
+from app.services.principal_cache import Principal, principal_cache
+from app.services.backplane import backplane
+from app.services.job_queue import job_worker
+from app.services.live_poller import live_poller
+from app.services.local_prediction_model import local_model
+from app.services.prediction_service import prediction_flight
+from app.services.rate_limiter import football_api_limiter
+from app.websocket_manager import manager
+
+router = APIRouter()
+
+@router.get("/", summary="Métricas Operacionais", tags=["Admin - Métricas"])
+async def get_metrics(
+    current_superuser: Principal = Depends(get_current_superuser),
+):
+    """Devolve o estado atual dos recursos partilhados deste processo (quota do fornecedor, etc.)."""
+    return {
+        "football_api": football_api_limiter.snapshot(),
+        "live_poller": live_poller.snapshot(),
+        "job_worker": job_worker.snapshot(),
+        "prediction_single_flight": prediction_flight.snapshot(),
+        "ai_response_cache": ai_response_cache.snapshot(),
+        "local_prediction_model": local_model.snapshot(),
+        "websockets": manager.snapshot(),
+        "backplane": backplane.snapshot(),
+        "principal_cache": principal_cache.snapshot(),
+        "game_list_cache": game_list_cache.snapshot(),
+        "db_pool": engine.pool.snapshot(),
+        "db_replica": replica_router.snapshot(),
+    }
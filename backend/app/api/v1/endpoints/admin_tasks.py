@@ -1,26 +1,74 @@
-from fastapi import APIRouter, Depends, Body, status
+from fastapi import APIRouter, Depends, Body, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from uuid import UUID
 
-from app.services import pre_analysis_service
-from app.db.session import get_db_session
+from app.crud import crud_job
+from app.models.job import JobStatus
+from app.schemas.job import JobQueued, JobRead
+from app.services import job_queue
+from app.db.session import get_db_session, get_readonly_db_session
 from app.api.deps.current_user import get_current_superuser
-from app.models.user import User
+from app.services.principal_cache import Principal
 from app.websocket_manager import manager
 
 router = APIRouter()
 
 @router.post(
     "/run-pre-analysis",
+    response_model=JobQueued,
     summary="Acionar o Serviço de Pré-Análise de Jogos",
+    status_code=status.HTTP_202_ACCEPTED,
     tags=["Admin - Tarefas"]
 )
 async def trigger_pre_analysis(
+    limit: int = Body(5, embed=True, ge=1, le=200, description="Número máximo de jogos a analisar."),
     db: AsyncSession = Depends(get_db_session),
-    current_superuser: User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
+):
+    """
+    Põe a pré-análise (geração de previsões de IA) na fila de tarefas e responde logo com o
+    ID da tarefa, executada por um worker (app/scripts/run_worker.py). O estado e o progresso
+    são consultados em GET /admin/tasks/jobs/{job_id}. Se já houver uma pré-análise em fila
+    ou em execução, devolve essa.
+    """
+    job, created = await job_queue.enqueue(db, kind=job_queue.PRE_ANALYSIS, payload={"limit": limit})
+    if not created:
+        return JobQueued(message="Já existe uma pré-análise em fila ou em execução.", job_id=job.id, status=job.status)
+    return JobQueued(message="Pré-análise posta na fila.", job_id=job.id, status=job.status)
+
+@router.get(
+    "/jobs",
+    response_model=List[JobRead],
+    summary="Listar Tarefas de Fundo",
+    tags=["Admin - Tarefas"]
+)
+async def list_jobs(
+    kind: Optional[str] = Query(None, description="Tipo de tarefa, ex: pre_analysis."),
+    job_status: Optional[JobStatus] = Query(None, alias="status"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_readonly_db_session),
+    current_superuser: Principal = Depends(get_current_superuser),
+):
+    """Lista as tarefas mais recentes da fila."""
+    return await crud_job.get_jobs(db, kind=kind, status=job_status, limit=limit)
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=JobRead,
+    summary="Estado de uma Tarefa de Fundo",
+    tags=["Admin - Tarefas"]
+)
+async def get_job_status(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_readonly_db_session),
+    current_superuser: Principal = Depends(get_current_superuser),
 ):
-    """Aciona manualmente o serviço de fundo para gerar previsões de IA."""
-    result = await pre_analysis_service.run_pre_analysis_for_upcoming_games(db=db, limit=5)
-    return result
+    """Estado, progresso, tentativas e resultado de uma tarefa."""
+    job = await crud_job.get_job(db, job_id=job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tarefa não encontrada.")
+    return job
 
 @router.post(
     "/broadcast-test",
@@ -30,7 +78,7 @@ async def trigger_pre_analysis(
 )
 async def broadcast_test_message(
     message: str = Body(..., embed=True, description="A mensagem a ser enviada."),
-    current_superuser: User = Depends(get_current_superuser),
+    current_superuser: Principal = Depends(get_current_superuser),
 ):
     """Envia uma mensagem de teste para todos os clientes WebSocket conectados."""
     print(f"Admin '{current_superuser.email}' a enviar broadcast: '{message}'")
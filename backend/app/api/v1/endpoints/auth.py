@@ -5,9 +5,12 @@ from datetime import timedelta
 
 import app.schemas.token as token_schemas
 import app.crud.crud_user as crud_user
+import app.crud.crud_refresh_token as crud_refresh_token
+from app.models.user import User
 from app.db.session import get_db_session
-from app.core.security import verify_password, create_access_token
+from app.core.security import verify_password_async, create_access_token
 from app.core.config import settings
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
@@ -23,18 +26,56 @@ async def login_for_access_token(
     user = await crud_user.get_user_by_email(db, email=form_data.username)
 
     # 2. Verifica se o usuário existe e se a senha está correta
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha incorretos",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # 3. Cria o token de acesso
+    # 3. Cria o token de acesso e o refresh token (a senha só é verificada uma vez por sessão)
+    access_token = await _create_access_token_for(db, user)
+    refresh_token = await crud_refresh_token.create_refresh_token(db, user_id=user.id)
+
+    # 4. Retorna os tokens
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+async def _create_access_token_for(db: AsyncSession, user: User) -> str:
+    """Token de acesso (com as permissões, se JWT_EMBED_PERMISSIONS estiver ativo)."""
+    claims = None
+    if settings.JWT_EMBED_PERMISSIONS:
+        user_with_permissions = await crud_user.get_user_by_id_with_permissions(db, user_id=user.id)
+        claims = Principal.from_user(user_with_permissions).to_claims()
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        subject=user.id, expires_delta=access_token_expires
+    return create_access_token(
+        subject=user.id, expires_delta=access_token_expires, claims=claims
     )
 
-    # 4. Retorna o token
-    return {"access_token": access_token, "token_type": "bearer"}
+@router.post("/refresh", response_model=token_schemas.Token, summary="Renovar o Token de Acesso", tags=["Autenticação"])
+async def refresh_access_token(
+    token_in: token_schemas.RefreshTokenRequest,
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Troca um refresh token por um novo token de acesso e um novo refresh token.
+    O refresh token usado deixa de ser válido; reutilizá-lo termina a sessão.
+    """
+    rotated = await crud_refresh_token.rotate_refresh_token(db, token=token_in.refresh_token)
+    user = await crud_user.get_user_by_id(db, user_id=rotated[0]) if rotated else None
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token inválido ou expirado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    access_token = await _create_access_token_for(db, user)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": rotated[1]}
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT, summary="Terminar a Sessão", tags=["Autenticação"])
+async def logout(
+    token_in: token_schemas.RefreshTokenRequest,
+    db: AsyncSession = Depends(get_db_session),
+):
+    """Revoga o refresh token e todos os obtidos a partir do mesmo login."""
+    await crud_refresh_token.revoke_refresh_token_family(db, token=token_in.refresh_token)
+    return
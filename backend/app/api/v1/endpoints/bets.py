@@ -4,9 +4,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.bet import BetRead, BetCreate, BetUpdate
 from app.crud import crud_bet
-from app.db.session import get_db_session
-from app.api.deps.current_user import get_current_user
-from app.models.user import User
+from app.db.session import get_db_session, get_replica_db_session
+from app.api.deps.current_user import get_current_principal
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
@@ -21,7 +21,7 @@ async def create_new_bet(
     *,
     bet_in: BetCreate,
     db: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Regista uma nova aposta para o utilizador atualmente autenticado."""
     return await crud_bet.create_bet(db=db, bet_in=bet_in, user_id=current_user.id)
@@ -33,8 +33,8 @@ async def create_new_bet(
     tags=["Apostas (Bet Tracker)"]
 )
 async def list_user_bets(
-    db: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_replica_db_session),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Obtém uma lista de todas as apostas registadas pelo utilizador autenticado."""
     return await crud_bet.get_bets_by_user(db=db, user_id=current_user.id)
@@ -50,7 +50,7 @@ async def update_bet_status(
     bet_id: int,
     bet_in: BetUpdate,
     db: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Atualiza o status de uma aposta (ex: para 'won' ou 'lost')."""
     db_bet = await crud_bet.get_bet_by_id(db=db, bet_id=bet_id, user_id=current_user.id)
@@ -69,7 +69,7 @@ async def delete_user_bet(
     *,
     bet_id: int,
     db: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Apaga uma aposta específica do utilizador."""
     db_bet = await crud_bet.get_bet_by_id(db=db, bet_id=bet_id, user_id=current_user.id)
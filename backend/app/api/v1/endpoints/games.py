@@ -1,17 +1,30 @@
+from datetime import datetime, timezone
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.models.game import GameStatus
 from app.schemas.game import GameRead
 from app.schemas.prediction import PredictionRead
 from app.crud import crud_game, crud_prediction
-from app.services import ai_prediction_service
-from app.db.session import get_db_session
-from app.api.deps.current_user import get_current_user
-from app.models.user import User
+from app.services import prediction_service
+from app.services.game_list_cache import game_list_cache
+from app.db.session import get_db_session, get_replica_db_session
+from app.api.deps.current_user import get_current_principal
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
+# Tamanho de página máximo de GET /games (o por omissão é settings.GAMES_PAGE_SIZE)
+GAMES_MAX_PAGE_SIZE = 500
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """As datas sem fuso horário são interpretadas como UTC."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
 @router.get(
     "/{game_id}",
     response_model=GameRead,
@@ -21,8 +34,8 @@ router = APIRouter()
 async def get_game_details(
     *,
     game_id: int,
-    db: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_replica_db_session),
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Obtém todos os detalhes de um jogo específico pelo seu ID."""
     game = await crud_game.get_game_by_id(db=db, game_id=game_id)
@@ -42,18 +55,67 @@ async def get_game_details(
 )
 async def list_games(
     *,
-    db: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    db: AsyncSession = Depends(get_replica_db_session),
+    current_user: Principal = Depends(get_current_principal),
     # Adicionamos um parâmetro de query para o filtro de tempo
-    time_filter: Optional[str] = Query("upcoming", enum=["live", "today", "upcoming"])
+    time_filter: Optional[str] = Query(None, enum=["live", "today", "upcoming"]),
+    league_id: Optional[int] = Query(None, description="ID da liga."),
+    team_id: Optional[int] = Query(None, description="ID de uma equipa (em casa ou fora)."),
+    game_status: Optional[GameStatus] = Query(None, alias="status"),
+    date_from: Optional[datetime] = Query(None, description="Jogos a partir desta data (inclusive)."),
+    date_to: Optional[datetime] = Query(None, description="Jogos antes desta data (exclusive)."),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor da página anterior."),
+    limit: int = Query(settings.GAMES_PAGE_SIZE, ge=1, le=GAMES_MAX_PAGE_SIZE),
+    if_none_match: Optional[str] = Header(None),
 ):
     """
-    Obtém uma lista de jogos, que pode ser filtrada por tempo.
+    Obtém uma lista de jogos ordenada por data, que pode ser filtrada por tempo.
     - **live**: Jogos atualmente em progresso.
     - **today**: Jogos agendados para hoje.
-    - **upcoming**: Jogos agendados para os próximos 7 dias (padrão).
+    - **upcoming**: Jogos agendados para os próximos 7 dias (padrão sem outros filtros).
+
+    Pode também ser filtrada por liga, equipa, estado e intervalo de datas (combináveis
+    com time_filter). Se houver mais jogos, o cabeçalho X-Next-Cursor traz o cursor para
+    pedir a página seguinte com os mesmos filtros.
+
+    Sem filtros nem cursor, as listas são as mesmas para todos os utilizadores e vêm da
+    cache já serializadas (ver GameListCache). Com If-None-Match igual ao ETag da lista,
+    a resposta é 304.
     """
-    games = await crud_game.get_games(db=db, limit=100, time_filter=time_filter)
+    filters = {
+        "league_id": league_id, "team_id": team_id, "status": game_status,
+        "date_from": _as_utc(date_from), "date_to": _as_utc(date_to),
+    }
+    has_filters = any(value is not None for value in filters.values())
+
+    if not has_filters and cursor is None and limit == game_list_cache.limit:
+        games = await game_list_cache.get(time_filter or "upcoming")
+        headers = {"ETag": games.etag, "Cache-Control": "private, no-cache"}
+        if games.next_cursor:
+            headers["X-Next-Cursor"] = games.next_cursor
+        if if_none_match == games.etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=games.body, media_type="application/json", headers=headers)
+
+    if time_filter is not None or not has_filters:
+        # As datas indicadas restringem a janela de time_filter; um status indicado substitui o da janela
+        window = crud_game.time_filter_window(time_filter or "upcoming")
+        filters["status"] = filters["status"] or window["status"]
+        if "date_from" in window:
+            filters["date_from"] = max(filter(None, [filters["date_from"], window["date_from"]]))
+            filters["date_to"] = min(filter(None, [filters["date_to"], window["date_to"]]))
+    after = None
+    if cursor is not None:
+        try:
+            after = crud_game.decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido.")
+
+    games = await crud_game.get_games_page(db, **filters, after=after, limit=limit + 1)
+    if len(games) > limit:
+        games = games[:limit]
+        response.headers["X-Next-Cursor"] = crud_game.encode_cursor(games[-1])
     return games
 
 @router.post(
@@ -66,9 +128,12 @@ async def generate_or_get_prediction(
     *,
     game_id: int,
     db: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    """Gera uma nova previsão de IA para um jogo se ainda não existir, ou retorna a existente."""
+    """
+    Gera uma nova previsão de IA para um jogo se ainda não existir, ou retorna a existente.
+    Pedidos simultâneos para o mesmo jogo esperam por uma única geração.
+    """
     game = await crud_game.get_game_by_id(db=db, game_id=game_id)
     if not game:
         raise HTTPException(
@@ -80,7 +145,14 @@ async def generate_or_get_prediction(
     if prediction:
         return prediction
 
-    prediction_in = await ai_prediction_service.generate_prediction_for_game(game=game)
-    new_prediction = await crud_prediction.create_prediction(db=db, prediction_in=prediction_in)
-    
-    return new_prediction
+    # Liberta a conexão enquanto espera pelo modelo (o jogo e as equipas já estão carregados):
+    # com muitos pedidos à espera da mesma geração, o pool não fica esgotado
+    await db.close()
+    try:
+        return await prediction_service.get_or_generate_prediction(game)
+    except Exception as e:
+        print(f"ERRO ao gerar a previsão do jogo ID {game_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Não foi possível gerar a previsão. Tente novamente mais tarde.",
+        )
@@ -4,10 +4,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.prediction import PredictionReadWithGame 
 from app.crud import crud_prediction
-from app.db.session import get_db_session
+from app.db.session import get_replica_db_session
 # MUDANÇA: Importamos a nossa nova dependência 'require_permission'
 from app.api.deps.current_user import require_permission 
-from app.models.user import User
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
@@ -18,10 +18,10 @@ router = APIRouter()
     tags=["Previsões"]
 )
 async def list_predictions(
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_replica_db_session),
     # MUDANÇA: Em vez de apenas verificar se o utilizador está autenticado,
     # agora exigimos que ele tenha uma permissão específica.
-    current_user: User = Depends(require_permission("feature:access_advanced_analysis"))
+    current_user: Principal = Depends(require_permission("feature:access_advanced_analysis"))
 ):
     """
     Obtém uma lista das previsões mais recentes geradas pela IA.
@@ -4,14 +4,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.role import RoleRead, RoleCreate, RoleUpdate, RoleReadWithPermissions, RoleUpdatePermissions
 from app.crud import crud_role
-from app.db.session import get_db_session
+from app.db.session import get_db_session, get_readonly_db_session
 from app.api.deps.current_user import get_current_superuser
 
 router = APIRouter()
 
 @router.get("/{role_id}", response_model=RoleReadWithPermissions, tags=["Admin - Gestão de Planos"])
 async def get_role_details(
-    *, role_id: int, db: AsyncSession = Depends(get_db_session), current_superuser = Depends(get_current_superuser)
+    *, role_id: int, db: AsyncSession = Depends(get_readonly_db_session), current_superuser = Depends(get_current_superuser)
 ):
     """Obtém os detalhes de um plano específico, incluindo suas permissões."""
     role = await crud_role.get_role_by_id(db=db, role_id=role_id)
@@ -63,7 +63,7 @@ async def create_new_role(
 
 @router.get("/", response_model=List[RoleRead], tags=["Admin - Gestão de Planos"])
 async def list_roles(
-    db: AsyncSession = Depends(get_db_session), current_superuser = Depends(get_current_superuser)
+    db: AsyncSession = Depends(get_readonly_db_session), current_superuser = Depends(get_current_superuser)
 ):
     """Obtém uma lista de todos os planos (roles) no sistema."""
     return await crud_role.get_roles(db=db)
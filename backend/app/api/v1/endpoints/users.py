@@ -6,7 +6,7 @@ import app.crud.crud_user as crud_user
 from app.db.session import get_db_session
 from app.api.deps.current_user import get_current_user
 from app.models.user import User
-from app.core.security import verify_password
+from app.core.security import verify_password_async
 
 router = APIRouter()
 
@@ -40,7 +40,7 @@ async def update_current_user_password(
     Altera a senha do utilizador autenticado.
     """
     # 1. Verifica se a senha atual fornecida está correta
-    if not verify_password(password_data.current_password, current_user.hashed_password):
+    if not await verify_password_async(password_data.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A senha atual está incorreta.",
@@ -1,32 +1,34 @@
 import json
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
 
-from app.db.session import get_db_session
 from app.websocket_manager import manager
-from app.api.deps.current_user import _get_user_from_token
+from app.api.deps.current_user import get_principal_from_token
 
 router = APIRouter()
 
 @router.websocket("/ws")
-async def websocket_endpoint(
-    websocket: WebSocket,
-    db: AsyncSession = Depends(get_db_session)
-):
-    """Endpoint WebSocket com autenticação pós-conexão."""
+async def websocket_endpoint(websocket: WebSocket):
+    """
+    Endpoint WebSocket com autenticação pós-conexão.
+
+    Depois de autenticado, o cliente escolhe o que quer receber:
+        {"type": "subscribe", "topics": ["game:123", "league:71"]}
+        {"type": "unsubscribe", "topics": ["game:123"]}
+    As notificações pessoais (tópico user:{id}) são subscritas automaticamente.
+    """
     await websocket.accept()
-    user_id = None
+    connected = False
     try:
         auth_data_str = await websocket.receive_text()
         auth_data = json.loads(auth_data_str)
         token = auth_data.get("token")
         
         if auth_data.get("type") == "auth" and token:
-            user = await _get_user_from_token(token=token, db=db)
+            user = await get_principal_from_token(token)
             if user:
-                user_id = user.id
-                await manager.connect(websocket, user_id)
-                await websocket.send_json({"type": "auth_success", "message": "Conectado ao servidor de alertas!"})
+                await manager.connect(websocket, user.id)
+                connected = True
+                await manager.send_personal(websocket, {"type": "auth_success", "message": "Conectado ao servidor de alertas!"})
             else:
                 await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
                 return
@@ -35,13 +37,35 @@ async def websocket_endpoint(
             return
 
         while True:
-            await websocket.receive_text()
+            await _handle_client_message(websocket, await websocket.receive_text())
 
     except WebSocketDisconnect:
-        if user_id: manager.disconnect(user_id)
+        if connected: manager.disconnect(websocket)
     except Exception:
-        if user_id: manager.disconnect(user_id)
+        if connected: manager.disconnect(websocket)
         try:
             await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
         except RuntimeError:
             pass
+
+async def _handle_client_message(websocket: WebSocket, raw: str):
+    """
+    Processa os pedidos de subscrição enviados pelo cliente depois da autenticação.
+    As respostas passam pela fila da conexão para nunca haver dois envios em simultâneo no mesmo socket.
+    """
+    try:
+        message = json.loads(raw)
+    except json.JSONDecodeError:
+        await manager.send_personal(websocket, {"type": "error", "message": "Mensagem inválida."})
+        return
+
+    message_type = message.get("type") if isinstance(message, dict) else None
+    topics = message.get("topics") if isinstance(message, dict) else None
+    if message_type in ("subscribe", "unsubscribe") and isinstance(topics, list):
+        if message_type == "subscribe":
+            accepted = manager.subscribe(websocket, topics)
+        else:
+            accepted = manager.unsubscribe(websocket, topics)
+        await manager.send_personal(websocket, {"type": f"{message_type}d", "topics": accepted})
+    elif message_type != "ping":
+        await manager.send_personal(websocket, {"type": "error", "message": "Tipo de mensagem desconhecido."})
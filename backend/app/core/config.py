@@ -14,6 +14,7 @@ from pathlib import Path
 # parents[2] -> .../backend/
 # parents[3] -> .../sportsbet-ev-ai/
 PROJECT_ROOT_DIR = Path(__file__).resolve().parents[3]
+BACKEND_DIR = Path(__file__).resolve().parents[2]
 ENV_PATH = PROJECT_ROOT_DIR / '.env'
 
 # print(f"DEBUG [config.py]: A procurar .env em: {ENV_PATH}") # Para depuração
@@ -28,14 +29,151 @@ class Settings:
     # Configurações do JWT
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "default_secret_key_if_not_set")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+    # Tokens de acesso de curta duração, renovados com o refresh token (POST /auth/refresh)
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 15))
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 30))
+    # Inclui no token de acesso as permissões do utilizador, para autorizar sem ir à base de dados.
+    # Um token emitido antes de uma alteração dos planos/permissões do utilizador é ignorado
+    # nessa parte e as permissões são lidas da base de dados.
+    JWT_EMBED_PERMISSIONS: bool = os.getenv("JWT_EMBED_PERMISSIONS", "false").lower() in ("1", "true", "yes")
+    # Threads dedicadas ao bcrypt (hash/verificação de senhas). Cada operação ocupa um núcleo
+    # durante 100-300ms: mais threads do que núcleos não aumenta o débito.
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
 
     # Chave da API para dados de futebol
     API_FOOTBALL_KEY: str = os.getenv("API_FOOTBALL_KEY")
     API_FOOTBALL_HOST: str = "v3.football.api-sports.io" # O host da API
+    # URL base da API (pode ser apontada para um servidor local em testes/benchmarks)
+    API_FOOTBALL_BASE_URL: str = os.getenv("API_FOOTBALL_BASE_URL", "https://v3.football.api-sports.io")
+
+    # Pool de conexões HTTP partilhado pelos serviços externos
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", 20))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 10))
+    HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30.0))
+    HTTP_TIMEOUT: float = float(os.getenv("HTTP_TIMEOUT", 30.0))
+    HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "false").lower() in ("1", "true", "yes")
+
+    # Sincronização de ligas/equipas/jogos
+    # Temporadas a sincronizar para cada liga ativa (lista separada por vírgulas, ex: "2023,2024")
+    SYNC_SEASONS: list[int] = [int(s) for s in os.getenv("SYNC_SEASONS", "2023").split(",") if s.strip()]
+    SYNC_MAX_CONCURRENCY: int = int(os.getenv("SYNC_MAX_CONCURRENCY", 4))
+    # Quota de pedidos por minuto do plano da API-Futebol (o plano gratuito permite 10)
+    API_FOOTBALL_REQUESTS_PER_MINUTE: int = int(os.getenv("API_FOOTBALL_REQUESTS_PER_MINUTE", 10))
+    # Número máximo de pedidos em rajada antes de o token bucket começar a espaçar os pedidos
+    API_FOOTBALL_BURST: int = int(os.getenv("API_FOOTBALL_BURST", 5))
+    # Novas tentativas em respostas 429/5xx e erros de rede (backoff exponencial com jitter)
+    API_FOOTBALL_MAX_RETRIES: int = int(os.getenv("API_FOOTBALL_MAX_RETRIES", 3))
+    API_FOOTBALL_BACKOFF_BASE_SECONDS: float = float(os.getenv("API_FOOTBALL_BACKOFF_BASE_SECONDS", 1.0))
+    API_FOOTBALL_BACKOFF_MAX_SECONDS: float = float(os.getenv("API_FOOTBALL_BACKOFF_MAX_SECONDS", 30.0))
+
+    # Cache em disco (respostas do fornecedor, etc.)
+    CACHE_DIR: str = os.getenv("CACHE_DIR", str(BACKEND_DIR / ".cache"))
+    API_FOOTBALL_CACHE_ENABLED: bool = os.getenv("API_FOOTBALL_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    API_FOOTBALL_CACHE_MAX_ENTRIES: int = int(os.getenv("API_FOOTBALL_CACHE_MAX_ENTRIES", 2000))
+    # Tempo (em segundos) durante o qual uma resposta em cache é usada sem contactar o fornecedor.
+    # Depois disso é revalidada (ETag / If-Modified-Since). 0 desativa a cache para o endpoint.
+    API_FOOTBALL_CACHE_TTLS: dict[str, int] = {
+        "/status": 0,
+        "/leagues": int(os.getenv("API_FOOTBALL_CACHE_TTL_LEAGUES", 24 * 3600)),
+        "/teams": int(os.getenv("API_FOOTBALL_CACHE_TTL_TEAMS", 24 * 3600)),
+        "/fixtures": int(os.getenv("API_FOOTBALL_CACHE_TTL_FIXTURES", 300)),
+    }
+    # Janelas de datas da sincronização incremental (mudam mais vezes que a temporada inteira)
+    API_FOOTBALL_CACHE_TTL_FIXTURES_WINDOW: int = int(os.getenv("API_FOOTBALL_CACHE_TTL_FIXTURES_WINDOW", 30))
+
+    # Sincronização incremental de jogos (janela de datas à volta de hoje + jogos ao vivo)
+    SYNC_INCREMENTAL_LOOKAHEAD_DAYS: int = int(os.getenv("SYNC_INCREMENTAL_LOOKAHEAD_DAYS", 1))
+    # Limite para trás quando há jogos que já começaram mas ainda não foram dados como terminados
+    SYNC_INCREMENTAL_MAX_LOOKBACK_DAYS: int = int(os.getenv("SYNC_INCREMENTAL_MAX_LOOKBACK_DAYS", 3))
+
+    # Poller de resultados ao vivo (tarefa de fundo da API que envia alterações por WebSocket).
+    # Ativar apenas num processo: cada poller gasta quota do fornecedor.
+    LIVE_POLLER_ENABLED: bool = os.getenv("LIVE_POLLER_ENABLED", "false").lower() in ("1", "true", "yes")
+    # Intervalo entre pedidos enquanto há jogos a decorrer (ou a começar em breve)
+    LIVE_POLLER_INTERVAL_SECONDS: float = float(os.getenv("LIVE_POLLER_INTERVAL_SECONDS", 15))
+    # Intervalo quando não há jogos a decorrer
+    LIVE_POLLER_IDLE_INTERVAL_SECONDS: float = float(os.getenv("LIVE_POLLER_IDLE_INTERVAL_SECONDS", 300))
+
+    # WebSockets: cada conexão tem uma fila de envio limitada, esvaziada por uma tarefa própria.
+    # Quando a fila está cheia a mensagem mais antiga é descartada; um cliente que acumule
+    # demasiadas mensagens descartadas ou não consiga receber dentro do timeout é desligado.
+    WS_SEND_QUEUE_SIZE: int = int(os.getenv("WS_SEND_QUEUE_SIZE", 256))
+    WS_SEND_TIMEOUT_SECONDS: float = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", 5))
+    WS_MAX_DROPPED_MESSAGES: int = int(os.getenv("WS_MAX_DROPPED_MESSAGES", 100))
+
+    # Backplane entre processos da API (necessário com vários workers/pods para que as mensagens
+    # WebSocket cheguem a todos os clientes): "local" (um só processo) ou "postgres" (LISTEN/NOTIFY)
+    WS_BACKPLANE: str = os.getenv("WS_BACKPLANE", "local").lower()
+    WS_BACKPLANE_CHANNEL: str = os.getenv("WS_BACKPLANE_CHANNEL", "sportsbet_events")
+
+    # Pool de conexões à base de dados (por processo). O máximo de conexões de cada processo é
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW; um pedido espera até DB_POOL_TIMEOUT segundos por uma livre.
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    # Recicla as conexões mais antigas que isto (segundos; -1 desativa), antes de firewalls/proxies as cortarem
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    # Testa a conexão ao tirá-la do pool, para evitar erros após quedas da base de dados. Com o
+    # asyncpg o teste é feito numa transação própria (BEGIN; ;ROLLBACK = 3 round trips por pedido),
+    # por isso vem desligado; o DB_POOL_RECYCLE já descarta as conexões antigas.
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+    # Cache de prepared statements do asyncpg por conexão. Usar 0 atrás de um PgBouncer em modo transaction.
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
+
+    # Réplica de leitura (DB_REPLICA_HOST/DB_REPLICA_PORT): as rotas de consulta só a usam
+    # enquanto o atraso medido não passar de DB_REPLICA_MAX_LAG_SECONDS; senão leem do primário.
+    DB_REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", 5))
+    DB_REPLICA_CHECK_INTERVAL_SECONDS: float = float(os.getenv("DB_REPLICA_CHECK_INTERVAL_SECONDS", 2))
+
+    # Cache em memória dos utilizadores autenticados (token já validado + permissões), para
+    # que os pedidos autenticados não vão à base de dados. As entradas são invalidadas quando
+    # os planos/permissões mudam; o TTL limita o tempo de vida de alterações feitas por fora da API.
+    PRINCIPAL_CACHE_TTL_SECONDS: float = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60))
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", 10000))
+
+    # Cache das listas de GET /games já serializadas, invalidada quando os jogos são gravados.
+    # O TTL só conta para as escritas que não chegam pelo backplane (0 desativa a cache).
+    GAME_LIST_CACHE_TTL_SECONDS: float = float(os.getenv("GAME_LIST_CACHE_TTL_SECONDS", 300))
+    # Tamanho de página por omissão de GET /games, que é também o das listas em cache
+    GAMES_PAGE_SIZE: int = int(os.getenv("GAMES_PAGE_SIZE", 100))
 
     # --- NOVA CONFIGURAÇÃO ADICIONADA - GOOGLE AI STUDIO ---
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY")
+    # Cache em disco (em CACHE_DIR) das respostas do modelo, por hash do prompt e nome do modelo.
+    # TTL em segundos (0 = sem expiração); acima de MAX_ENTRIES saem as menos usadas.
+    AI_RESPONSE_CACHE_ENABLED: bool = os.getenv("AI_RESPONSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    AI_RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("AI_RESPONSE_CACHE_MAX_ENTRIES", 5000))
+    AI_RESPONSE_CACHE_TTL_SECONDS: int = int(os.getenv("AI_RESPONSE_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+    # Modelo usado para gerar as previsões: "gemini" ou "local" (modelo de Poisson calculado
+    # a partir dos resultados guardados, sem rede). Se o principal não estiver configurado
+    # (ex: sem GOOGLE_API_KEY), é usado PREDICTION_FALLBACK_BACKEND (vazio = sem alternativa).
+    # Os erros do principal (timeouts, 5xx) não passam para a alternativa: a previsão fica
+    # por gerar e é tentada de novo, em vez de gravar para sempre a do modelo alternativo.
+    PREDICTION_BACKEND: str = os.getenv("PREDICTION_BACKEND", "gemini")
+    PREDICTION_FALLBACK_BACKEND: str = os.getenv("PREDICTION_FALLBACK_BACKEND", "local")
+    # Modelo local: estatísticas dos jogos terminados nos últimos HISTORY_DAYS dias,
+    # relidas no máximo a cada REFRESH_SECONDS
+    LOCAL_MODEL_REFRESH_SECONDS: float = float(os.getenv("LOCAL_MODEL_REFRESH_SECONDS", 3600))
+    LOCAL_MODEL_HISTORY_DAYS: int = int(os.getenv("LOCAL_MODEL_HISTORY_DAYS", 730))
+    # Pré-análise: previsões geradas em simultâneo e tempo máximo de cada uma (segundos)
+    PRE_ANALYSIS_CONCURRENCY: int = int(os.getenv("PRE_ANALYSIS_CONCURRENCY", 4))
+    PRE_ANALYSIS_TIMEOUT_SECONDS: float = float(os.getenv("PRE_ANALYSIS_TIMEOUT_SECONDS", 60))
+    # POST /games/{id}/predict: advisory lock por jogo para que, com vários processos da API,
+    # só um gere a previsão (dentro de cada processo os pedidos já são juntos numa só geração)
+    PREDICTION_ADVISORY_LOCK: bool = os.getenv("PREDICTION_ADVISORY_LOCK", "true").lower() in ("1", "true", "yes")
+    # Tempo máximo de uma geração em POST /games/{id}/predict (segundos). A espera pelo advisory
+    # lock de outro processo tem o mesmo limite, mais uma margem para gravar a previsão.
+    PREDICTION_TIMEOUT_SECONDS: float = float(os.getenv("PREDICTION_TIMEOUT_SECONDS", 60))
+
+    # Fila de tarefas de fundo (tabela jobs), executada por app/scripts/run_worker.py.
+    # Uma tarefa que falha é repetida até JOB_MAX_ATTEMPTS vezes, com espera de
+    # JOB_RETRY_BASE_SECONDS * 2^(tentativa - 1); uma tarefa em execução sem heartbeat há
+    # JOB_STALE_SECONDS volta à fila. JOB_WORKER_IN_API corre também um worker no processo da API.
+    JOB_POLL_INTERVAL_SECONDS: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", 2))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+    JOB_RETRY_BASE_SECONDS: float = float(os.getenv("JOB_RETRY_BASE_SECONDS", 30))
+    JOB_STALE_SECONDS: float = float(os.getenv("JOB_STALE_SECONDS", 300))
+    JOB_WORKER_IN_API: bool = os.getenv("JOB_WORKER_IN_API", "false").lower() in ("1", "true", "yes")
 
 # Cria uma instância das configurações para ser usada em toda a aplicação
 settings = Settings()
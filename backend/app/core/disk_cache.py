@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional
+
+
+def make_key(*parts: Any) -> str:
+    """Cria uma chave estável (sha256) a partir de qualquer combinação de valores serializáveis em JSON."""
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Cache simples em disco, partilhável entre processos na mesma máquina.
+
+    Cada entrada tem um ficheiro de metadados JSON (`<chave>.json`) e, opcionalmente,
+    um corpo binário (`<chave>.body`). As escritas são atómicas (ficheiro temporário +
+    rename), por isso um leitor nunca vê uma entrada a meio. Quando há mais de
+    `max_entries` entradas, as menos usadas recentemente (mtime) são removidas.
+
+    Os métodos são síncronos; em código async devem ser chamados com `asyncio.to_thread`
+    quando o corpo puder ser grande.
+    """
+    PRUNE_EVERY = 50
+
+    def __init__(self, directory: str, max_entries: int = 1000):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self._writes = 0
+
+    def _meta_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _body_path(self, key: str) -> Path:
+        return self.directory / f"{key}.body"
+
+    def _atomic_write(self, path: Path, data: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def get_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        """Lê os metadados de uma entrada, ou None se não existir/estiver corrompida."""
+        try:
+            with open(self._meta_path(key), "rb") as f:
+                return json.loads(f.read())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def get_body(self, key: str) -> Optional[bytes]:
+        """Lê o corpo de uma entrada e marca-a como usada recentemente."""
+        path = self._body_path(key)
+        try:
+            with open(path, "rb") as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(self._meta_path(key))
+        except FileNotFoundError:
+            pass
+        return body
+
+    def set(self, key: str, meta: Dict[str, Any], body: Optional[bytes] = None) -> None:
+        """Grava uma entrada. O corpo é escrito antes dos metadados para nunca apontar para um corpo em falta."""
+        if body is not None:
+            self._atomic_write(self._body_path(key), body)
+        self._atomic_write(self._meta_path(key), json.dumps(meta).encode("utf-8"))
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def update_meta(self, key: str, **changes: Any) -> None:
+        """Atualiza apenas alguns campos dos metadados de uma entrada existente."""
+        meta = self.get_meta(key)
+        if meta is None:
+            return
+        meta.update(changes)
+        self._atomic_write(self._meta_path(key), json.dumps(meta).encode("utf-8"))
+
+    def open_body(self, key: str) -> Optional[BinaryIO]:
+        """Abre o corpo de uma entrada para leitura aos bocados (o chamador fecha o ficheiro)."""
+        try:
+            f = open(self._body_path(key), "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(self._meta_path(key))
+        except FileNotFoundError:
+            pass
+        return f
+
+    def body_writer(self, key: str) -> "BodyWriter":
+        """Escrita de um corpo grande aos bocados; só fica visível depois de `commit`."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        return BodyWriter(self, key, os.fdopen(fd, "wb"), tmp_path)
+
+    def delete(self, key: str) -> None:
+        for path in (self._meta_path(key), self._body_path(key)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def prune(self) -> int:
+        """Remove as entradas mais antigas acima de `max_entries`. Devolve quantas foram removidas."""
+        try:
+            metas = [p for p in self.directory.iterdir() if p.suffix == ".json"]
+        except FileNotFoundError:
+            return 0
+        excess = len(metas) - self.max_entries
+        if excess <= 0:
+            return 0
+
+        def mtime(path: Path) -> float:
+            try:
+                return path.stat().st_mtime
+            except FileNotFoundError:
+                return 0.0
+
+        metas.sort(key=mtime)
+        for path in metas[:excess]:
+            self.delete(path.stem)
+        return excess
+
+
+class BodyWriter:
+    """Corpo de uma entrada a ser escrito num ficheiro temporário (ver `DiskCache.body_writer`)."""
+
+    def __init__(self, cache: DiskCache, key: str, file: BinaryIO, tmp_path: str):
+        self._cache = cache
+        self._key = key
+        self._file = file
+        self._tmp_path = tmp_path
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+
+    def commit(self, meta: Dict[str, Any]) -> None:
+        """Publica o corpo e grava os metadados (pela mesma ordem que `DiskCache.set`)."""
+        self._file.close()
+        os.replace(self._tmp_path, self._cache._body_path(self._key))
+        self._cache.set(self._key, meta)
+
+    def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.unlink(self._tmp_path)
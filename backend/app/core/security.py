@@ -1,6 +1,8 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone # Adicionado timedelta e timezone
-from typing import Any, Union # Adicionado para tipagem
+from typing import Any, Dict, Optional, Union # Adicionado para tipagem
 from jose import jwt # Adicionado para manipulação de JWT
 
 from app.core.config import settings # Importa nossas configurações
@@ -15,25 +17,46 @@ def get_password_hash(password: str) -> str:
     """Gera o hash da senha."""
     return pwd_context.hash(password)
 
-def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
+# O bcrypt demora 100-300ms por operação e liberta o GIL: corre num pool de threads limitado
+# para não bloquear o event loop. Os pedidos em excesso esperam na fila do pool.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Versão de verify_password para código assíncrono (não bloqueia o event loop)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Versão de get_password_hash para código assíncrono (não bloqueia o event loop)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, get_password_hash, password)
+
+def create_access_token(
+    subject: Union[str, Any], expires_delta: timedelta = None, claims: Optional[Dict[str, Any]] = None
+) -> str:
     """
     Cria um token de acesso JWT.
 
     Args:
         subject: O "assunto" do token (geralmente o ID ou email do usuário).
         expires_delta: O tempo de vida do token.
+        claims: Dados adicionais a incluir no token (ex: as permissões do utilizador).
 
     Returns:
         O token JWT codificado como uma string.
     """
+    now = datetime.now(timezone.utc)
     if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
+        expire = now + expires_delta
     else:
         # Se não for fornecido um delta, usa o padrão das configurações
-        expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    # Dados a serem codificados no token
-    to_encode = {"exp": expire, "sub": str(subject)}
+    # Dados a serem codificados no token ("iat" permite saber se o token é anterior a uma
+    # alteração das permissões do utilizador)
+    to_encode = {**(claims or {}), "exp": expire, "iat": now, "sub": str(subject)}
 
     # Codifica o token usando a chave secreta e o algoritmo
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.ALGORITHM)
@@ -1,12 +1,15 @@
+from sqlalchemy import func, or_, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
+import base64
 from datetime import datetime, timezone, timedelta
-from typing import List
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from app.models.game import Game, GameStatus
 from app.models.prediction import Prediction
 from app.schemas.game import GameCreate, GameUpdate
+from app.services.game_list_cache import game_list_cache
 
 async def get_game_by_id(db: AsyncSession, *, game_id: int) -> Game | None:
     """Busca um único jogo pelo seu ID, carregando os dados das equipas."""
@@ -17,46 +20,91 @@ async def get_game_by_id(db: AsyncSession, *, game_id: int) -> Game | None:
     )
     return result.scalars().first()
 
-# --- FUNÇÃO MODIFICADA ---
-async def get_games(
-    db: AsyncSession, *, 
-    time_filter: str = "upcoming", 
-    skip: int = 0, 
-    limit: int = 100
-) -> list[Game]:
+def time_filter_window(time_filter: str, now: Optional[datetime] = None) -> Dict[str, Any]:
     """
-    Busca uma lista de jogos, com um filtro de tempo opcional.
-    Filtros: 'live', 'today', 'upcoming'.
+    Filtros equivalentes às janelas fixas de GET /games, para usar com `get_games_page`:
+    'live' (a decorrer), 'today' (agendados para hoje) e 'upcoming' (agendados de amanhã
+    aos 7 dias seguintes, o padrão).
     """
-    now = datetime.now(timezone.utc)
-    
-    query = select(Game).options(
-        selectinload(Game.home_team), selectinload(Game.away_team)
-    )
-
+    now = now or datetime.now(timezone.utc)
     if time_filter == "live":
-        query = query.where(Game.status == GameStatus.IN_PROGRESS).order_by(Game.game_time.asc())
-    elif time_filter == "today":
+        return {"status": GameStatus.IN_PROGRESS}
+    if time_filter == "today":
         start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = start_of_day + timedelta(days=1)
-        query = query.where(
-            Game.game_time >= start_of_day,
-            Game.game_time < end_of_day,
-            Game.status == GameStatus.SCHEDULED
-        ).order_by(Game.game_time.asc())
-    else: # "upcoming" é o padrão
-        start_of_tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_week = start_of_tomorrow + timedelta(days=7)
-        query = query.where(
-            Game.game_time >= start_of_tomorrow,
-            Game.game_time < end_of_week,
-            Game.status == GameStatus.SCHEDULED
-        ).order_by(Game.game_time.asc())
-        
-    query = query.offset(skip).limit(limit)
-    
-    result = await db.execute(query)
-    return result.scalars().all()
+        return {
+            "status": GameStatus.SCHEDULED,
+            "date_from": start_of_day,
+            "date_to": start_of_day + timedelta(days=1),
+        }
+    start_of_tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return {
+        "status": GameStatus.SCHEDULED,
+        "date_from": start_of_tomorrow,
+        "date_to": start_of_tomorrow + timedelta(days=7),
+    }
+
+
+def _games_query(
+    *,
+    league_id: Optional[int] = None,
+    team_id: Optional[int] = None,
+    status: Optional[GameStatus] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+):
+    query = select(Game).options(selectinload(Game.home_team), selectinload(Game.away_team))
+    if league_id is not None:
+        query = query.where(Game.league_id == league_id)
+    if team_id is not None:
+        query = query.where(or_(Game.home_team_id == team_id, Game.away_team_id == team_id))
+    if status is not None:
+        query = query.where(Game.status == status)
+    if date_from is not None:
+        query = query.where(Game.game_time >= date_from)
+    if date_to is not None:
+        query = query.where(Game.game_time < date_to)
+    return query.order_by(Game.game_time.asc(), Game.id.asc())
+
+
+async def get_games_page(
+    db: AsyncSession, *,
+    league_id: Optional[int] = None,
+    team_id: Optional[int] = None,
+    status: Optional[GameStatus] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: int = 100,
+) -> List[Game]:
+    """
+    Busca uma página de jogos ordenada por (game_time, id), com paginação por cursor:
+    `after` é o (game_time, id) do último jogo da página anterior (ver `encode_cursor`).
+    Ao contrário de OFFSET, o custo de uma página não cresce com a sua posição na lista.
+    `date_from` é inclusivo e `date_to` exclusivo.
+    """
+    query = _games_query(
+        league_id=league_id, team_id=team_id, status=status, date_from=date_from, date_to=date_to
+    )
+    if after is not None:
+        query = query.where(tuple_(Game.game_time, Game.id) > tuple_(*after))
+    result = await db.execute(query.limit(limit))
+    return list(result.scalars().all())
+
+
+def encode_cursor(game: Game) -> str:
+    """Cursor opaco que aponta para depois de `game` na ordem (game_time, id)."""
+    raw = f"{game.game_time.isoformat()}|{game.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverso de `encode_cursor`. Levanta ValueError se o cursor for inválido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        game_time, game_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(game_time), int(game_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
 
 
 async def create_game(db: AsyncSession, *, game_in: GameCreate) -> Game:
@@ -65,6 +113,7 @@ async def create_game(db: AsyncSession, *, game_in: GameCreate) -> Game:
     db.add(db_game)
     await db.commit()
     await db.refresh(db_game)
+    await game_list_cache.invalidate()
     return db_game
 
 
@@ -77,6 +126,7 @@ async def update_game(db: AsyncSession, *, db_game: Game, game_in: GameUpdate) -
     db.add(db_game)
     await db.commit()
     await db.refresh(db_game)
+    await game_list_cache.invalidate()
     return db_game
 
 
@@ -100,3 +150,57 @@ async def get_upcoming_games_without_prediction(db: AsyncSession, limit: int = 5
         .limit(limit)
     )
     return result.scalars().all()
+
+
+async def get_games_sync_state(db: AsyncSession, *, game_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Busca apenas as colunas atualizadas pela sincronização para os jogos indicados.
+    Usado para comparar com os dados da API e gravar só o que mudou.
+    """
+    game_ids = list(game_ids)
+    if not game_ids:
+        return {}
+    result = await db.execute(
+        select(
+            Game.id, Game.league_id, Game.game_time, Game.status, Game.home_score, Game.away_score, Game.updated_at
+        ).where(Game.id.in_(game_ids))
+    )
+    return {row.id: row._asdict() for row in result}
+
+
+async def get_oldest_unfinished_game_time(
+    db: AsyncSession, *, before: datetime, not_before: datetime
+) -> datetime | None:
+    """
+    Devolve a data do jogo mais antigo (entre `not_before` e `before`) que já devia ter começado
+    mas ainda não está dado como terminado. Define o início da janela da sincronização incremental.
+    """
+    result = await db.execute(
+        select(func.min(Game.game_time)).where(
+            Game.status.in_([GameStatus.SCHEDULED, GameStatus.IN_PROGRESS]),
+            Game.game_time < before,
+            Game.game_time >= not_before,
+        )
+    )
+    return result.scalar()
+
+
+async def get_in_progress_game_ids(db: AsyncSession, *, league_ids: Optional[Iterable[int]] = None) -> List[int]:
+    """IDs dos jogos dados como a decorrer na base de dados (opcionalmente só das ligas indicadas)."""
+    query = select(Game.id).where(Game.status == GameStatus.IN_PROGRESS)
+    if league_ids is not None:
+        query = query.where(Game.league_id.in_(list(league_ids)))
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def has_games_starting_between(db: AsyncSession, *, start: datetime, end: datetime) -> bool:
+    """Indica se há jogos agendados a começar no intervalo [start, end)."""
+    result = await db.execute(
+        select(Game.id).where(
+            Game.status == GameStatus.SCHEDULED,
+            Game.game_time >= start,
+            Game.game_time < end,
+        ).limit(1)
+    )
+    return result.first() is not None
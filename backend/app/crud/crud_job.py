@@ -0,0 +1,170 @@
+from sqlalchemy import or_, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from app.models.job import Job, JobStatus
+
+ACTIVE_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+async def enqueue_job(
+    db: AsyncSession, *, kind: str, payload: Dict[str, Any], max_attempts: int
+) -> Tuple[Job, bool]:
+    """
+    Põe uma tarefa na fila, para ser executada assim que houver um worker livre.
+
+    Só pode haver uma tarefa de cada tipo em fila ou em execução (índice uq_jobs_active_kind):
+    se já existir, não cria outra e devolve essa. Devolve (tarefa, criada).
+    """
+    result = await db.execute(
+        insert(Job)
+        .values(kind=kind, payload=payload, max_attempts=max_attempts)
+        .on_conflict_do_nothing(
+            index_elements=[Job.kind], index_where=text("status IN ('QUEUED', 'RUNNING')")
+        )
+        .returning(Job.id)
+    )
+    job_id = result.scalar()
+    await db.commit()
+    if job_id is not None:
+        return await db.get(Job, job_id), True
+    job = await get_active_job(db, kind=kind)
+    if job is None:
+        # A tarefa ativa terminou entre o INSERT e a leitura: tentar de novo
+        return await enqueue_job(db, kind=kind, payload=payload, max_attempts=max_attempts)
+    return job, False
+
+async def get_job(db: AsyncSession, *, job_id: UUID) -> Job | None:
+    return await db.get(Job, job_id)
+
+async def get_jobs(
+    db: AsyncSession, *, kind: Optional[str] = None, status: Optional[JobStatus] = None, limit: int = 20
+) -> List[Job]:
+    """Tarefas mais recentes, opcionalmente filtradas por tipo e estado."""
+    query = select(Job).order_by(Job.created_at.desc()).limit(limit)
+    if kind is not None:
+        query = query.where(Job.kind == kind)
+    if status is not None:
+        query = query.where(Job.status == status)
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+async def get_active_job(db: AsyncSession, *, kind: str) -> Job | None:
+    """A tarefa deste tipo que está em fila ou em execução, se existir."""
+    result = await db.execute(
+        select(Job)
+        .where(Job.kind == kind, Job.status.in_(ACTIVE_STATUSES))
+        .order_by(Job.created_at.asc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+async def claim_next_job(db: AsyncSession, *, worker_id: str, kinds: List[str]) -> Job | None:
+    """
+    Reserva a próxima tarefa pronta a correr e marca-a como em execução.
+
+    FOR UPDATE SKIP LOCKED faz com que workers em simultâneo nunca reservem a mesma tarefa
+    nem esperem uns pelos outros: cada um salta as linhas já bloqueadas pelos restantes.
+    """
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        select(Job)
+        .where(Job.status == JobStatus.QUEUED, Job.run_after <= now, Job.kind.in_(kinds))
+        .order_by(Job.run_after.asc())
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    job = result.scalars().first()
+    if job is None:
+        await db.rollback()
+        return None
+    job.status = JobStatus.RUNNING
+    job.attempts += 1
+    job.worker_id = worker_id
+    job.started_at = job.heartbeat_at = now
+    job.progress_done = 0
+    await db.commit()
+    return job
+
+async def update_job_progress(db: AsyncSession, *, job_id: UUID, done: int, total: Optional[int]) -> None:
+    """Atualiza o progresso (e o heartbeat) de uma tarefa em execução."""
+    await db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == JobStatus.RUNNING)
+        .values(progress_done=done, progress_total=total, heartbeat_at=datetime.now(timezone.utc))
+    )
+    await db.commit()
+
+async def touch_job(db: AsyncSession, *, job_id: UUID) -> None:
+    """Heartbeat: indica que o worker continua a executar a tarefa."""
+    await db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == JobStatus.RUNNING)
+        .values(heartbeat_at=datetime.now(timezone.utc))
+    )
+    await db.commit()
+
+async def complete_job(db: AsyncSession, *, job_id: UUID, worker_id: str, result: Dict[str, Any]) -> bool:
+    """
+    Marca a tarefa como concluída, só se ainda estiver em execução por este worker: uma
+    tarefa devolvida à fila por falta de heartbeat (e talvez já reservada por outro worker)
+    não é alterada. Devolve False nesse caso.
+    """
+    updated = await db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == JobStatus.RUNNING, Job.worker_id == worker_id)
+        .values(status=JobStatus.SUCCEEDED, result=result, last_error=None, finished_at=datetime.now(timezone.utc))
+    )
+    await db.commit()
+    return updated.rowcount > 0
+
+async def fail_job(
+    db: AsyncSession, *, job_id: UUID, worker_id: str, error: str, retry_base_seconds: float
+) -> Job | None:
+    """
+    Regista a falha de uma tentativa. Se ainda houver tentativas, a tarefa volta à fila
+    depois de retry_base_seconds * 2^(tentativas - 1); senão fica como falhada.
+    Como em `complete_job`, só altera a tarefa se ainda estiver em execução por este worker
+    (senão devolve None).
+    """
+    job = await db.get(Job, job_id, with_for_update=True)
+    if job is None or job.status != JobStatus.RUNNING or job.worker_id != worker_id:
+        await db.rollback()
+        return None
+    now = datetime.now(timezone.utc)
+    job.last_error = error
+    if job.attempts < job.max_attempts:
+        job.status = JobStatus.QUEUED
+        job.run_after = now + timedelta(seconds=retry_base_seconds * 2 ** (job.attempts - 1))
+    else:
+        job.status = JobStatus.FAILED
+        job.finished_at = now
+    await db.commit()
+    return job
+
+async def requeue_stale_jobs(db: AsyncSession, *, stale_after_seconds: float) -> int:
+    """
+    Devolve à fila as tarefas em execução sem heartbeat há mais de `stale_after_seconds`
+    (o worker terminou a meio). Conta como uma tentativa; sem tentativas restantes, falham.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=stale_after_seconds)
+    stale = Job.status == JobStatus.RUNNING, or_(Job.heartbeat_at.is_(None), Job.heartbeat_at < cutoff)
+    requeued = await db.execute(
+        update(Job)
+        .where(*stale, Job.attempts < Job.max_attempts)
+        .values(status=JobStatus.QUEUED, last_error="Worker sem heartbeat; tarefa devolvida à fila.")
+    )
+    failed = await db.execute(
+        update(Job)
+        .where(*stale)
+        .values(
+            status=JobStatus.FAILED,
+            last_error="Worker sem heartbeat e sem tentativas restantes.",
+            finished_at=datetime.now(timezone.utc),
+        )
+    )
+    await db.commit()
+    return requeued.rowcount + failed.rowcount
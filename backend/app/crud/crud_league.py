@@ -0,0 +1,12 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from typing import List
+
+from app.models.league import League
+
+async def get_sync_enabled_leagues(db: AsyncSession) -> List[League]:
+    """Busca as ligas marcadas para sincronização (is_sync_enabled)."""
+    result = await db.execute(
+        select(League).where(League.is_sync_enabled.is_(True)).order_by(League.id)
+    )
+    return result.scalars().all()
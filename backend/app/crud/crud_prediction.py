@@ -1,7 +1,8 @@
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from typing import List
+from typing import Iterable, List
 
 from app.models.prediction import Prediction
 from app.models.game import Game # Importar Game para o relacionamento
@@ -42,4 +43,39 @@ async def create_prediction(db: AsyncSession, *, prediction_in: PredictionCreate
     db.add(db_prediction)
     await db.commit()
     await db.refresh(db_prediction)
-    return db_prediction
\ No newline at end of file
+    return db_prediction
+
+
+async def create_predictions_bulk(db: AsyncSession, *, predictions_in: Iterable[PredictionCreate]) -> List[int]:
+    """
+    Grava várias previsões numa única instrução INSERT. Os jogos que entretanto já têm
+    previsão (ex: gerada por POST /games/{id}/predict) são ignorados (ON CONFLICT DO NOTHING).
+    Devolve os IDs dos jogos cujas previsões foram gravadas.
+    """
+    rows = [prediction_in.model_dump() for prediction_in in predictions_in]
+    if not rows:
+        return []
+    result = await db.execute(
+        insert(Prediction)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[Prediction.game_id])
+        .returning(Prediction.game_id)
+    )
+    game_ids = list(result.scalars().all())
+    await db.commit()
+    return game_ids
+
+
+async def create_prediction_if_absent(db: AsyncSession, *, prediction_in: PredictionCreate) -> Prediction:
+    """
+    Cria a previsão do jogo, exceto se ele já tiver uma (ON CONFLICT DO NOTHING), e devolve
+    a previsão guardada. Nunca falha pela restrição única de game_id.
+    """
+    await db.execute(
+        insert(Prediction)
+        .values(**prediction_in.model_dump())
+        .on_conflict_do_nothing(index_elements=[Prediction.game_id])
+    )
+    await db.commit()
+    prediction = await get_prediction_by_game_id(db, game_id=prediction_in.game_id)
+    return prediction
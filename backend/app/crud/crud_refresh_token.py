@@ -0,0 +1,81 @@
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from typing import Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.models.refresh_token import RefreshToken
+
+def _hash_token(token: str) -> str:
+    # O token é aleatório (256 bits): um SHA-256 simples chega, não é preciso bcrypt
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def _new_token(db: AsyncSession, *, user_id: UUID, family_id: UUID) -> str:
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        user_id=user_id,
+        token_hash=_hash_token(token),
+        family_id=family_id,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+async def create_refresh_token(db: AsyncSession, *, user_id: UUID) -> str:
+    """Emite um refresh token numa nova família (um login). Devolve o valor a enviar ao cliente."""
+    token = _new_token(db, user_id=user_id, family_id=uuid.uuid4())
+    await db.commit()
+    return token
+
+async def rotate_refresh_token(db: AsyncSession, *, token: str) -> Tuple[UUID, str] | None:
+    """
+    Troca um refresh token válido por um novo da mesma família e revoga o antigo.
+    Devolve (ID do utilizador, novo token), ou None se o token não existir, tiver expirado
+    ou já tiver sido usado. A reutilização de um token revogado revoga a família inteira.
+    """
+    result = await db.execute(
+        select(RefreshToken).where(RefreshToken.token_hash == _hash_token(token)).with_for_update()
+    )
+    db_token = result.scalars().first()
+    now = datetime.now(timezone.utc)
+    if db_token is None or db_token.expires_at <= now:
+        return None
+    if db_token.revoked_at is not None:
+        print(f"ATENÇÃO: refresh token reutilizado (utilizador {db_token.user_id}). A revogar a sessão.")
+        await _revoke_family(db, family_id=db_token.family_id)
+        await db.commit()
+        return None
+
+    db_token.revoked_at = now
+    new_token = _new_token(db, user_id=db_token.user_id, family_id=db_token.family_id)
+    await db.commit()
+    return db_token.user_id, new_token
+
+async def _revoke_family(db: AsyncSession, *, family_id: UUID) -> None:
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+
+async def revoke_refresh_token_family(db: AsyncSession, *, token: str) -> None:
+    """Termina a sessão a que o token pertence (logout)."""
+    result = await db.execute(
+        select(RefreshToken.family_id).where(RefreshToken.token_hash == _hash_token(token))
+    )
+    family_id = result.scalars().first()
+    if family_id is not None:
+        await _revoke_family(db, family_id=family_id)
+        await db.commit()
+
+async def revoke_user_refresh_tokens(db: AsyncSession, *, user_id: UUID) -> None:
+    """Revoga todas as sessões de um utilizador. Não faz commit (faz parte da operação de quem chama)."""
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
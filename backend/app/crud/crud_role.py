@@ -1,3 +1,5 @@
+from datetime import datetime, timezone
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
@@ -5,7 +7,9 @@ from typing import List
 
 from app.models.role import Role
 from app.models.permission import Permission
+from app.models.user import User, user_role_association_table
 from app.schemas.role import RoleCreate, RoleUpdate
+from app.services.principal_cache import principal_cache
 
 async def get_role_by_id(db: AsyncSession, *, role_id: int) -> Role | None:
     """Busca um único Role pelo seu ID, carregando as permissões relacionadas."""
@@ -24,10 +28,23 @@ async def update_role(db: AsyncSession, *, db_role: Role, role_in: RoleUpdate) -
     await db.refresh(db_role)
     return db_role
 
+async def _touch_role_users(db: AsyncSession, *, role_id: int) -> None:
+    """Marca a alteração das permissões de todos os utilizadores com este plano (ver users.authz_updated_at)."""
+    await db.execute(
+        update(User)
+        .where(User.id.in_(
+            select(user_role_association_table.c.user_id).where(user_role_association_table.c.role_id == role_id)
+        ))
+        .values(authz_updated_at=datetime.now(timezone.utc))
+    )
+
 async def delete_role(db: AsyncSession, *, db_role: Role) -> None:
     """Apaga um Role do banco de dados."""
+    await _touch_role_users(db, role_id=db_role.id)
     await db.delete(db_role)
     await db.commit()
+    # Afeta todos os utilizadores com este plano
+    await principal_cache.invalidate_all()
     return
 
 async def create_role(db: AsyncSession, *, role_in: RoleCreate) -> Role:
@@ -52,8 +69,10 @@ async def update_role_permissions(db: AsyncSession, *, role: Role, permission_id
     """Atualiza as permissões de um Role."""
     result = await db.execute(select(Permission).where(Permission.id.in_(permission_ids)))
     role.permissions = result.scalars().all()
+    await _touch_role_users(db, role_id=role.id)
     db.add(role)
     await db.commit()
     await db.refresh(role)
+    await principal_cache.invalidate_all()
     # Recarrega o role com as permissões para a resposta
     return await get_role_by_id(db, role_id=role.id)
@@ -1,5 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from typing import Iterable, Set
 from app.models.team import Team
 from app.schemas.team import TeamCreate
 
@@ -16,3 +17,12 @@ async def create_team(db: AsyncSession, *, team_in: TeamCreate) -> Team:
     await db.commit()
     await db.refresh(db_team)
     return db_team
+
+
+async def get_existing_team_ids(db: AsyncSession, *, team_ids: Iterable[int]) -> Set[int]:
+    """Devolve, dos IDs indicados, os que já existem na tabela de equipas."""
+    team_ids = list(team_ids)
+    if not team_ids:
+        return set()
+    result = await db.execute(select(Team.id).where(Team.id.in_(team_ids)))
+    return set(result.scalars().all())
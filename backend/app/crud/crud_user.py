@@ -2,13 +2,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload, subqueryload
 from uuid import UUID
-from typing import List, Dict, Any, Union
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Tuple, Union
 
 from app.models.user import User
 from app.models.role import Role
 from app.schemas.user import UserCreate
 from app.schemas.admin import AdminUserUpdate # Importa o novo schema de admin
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
+from app.crud import crud_refresh_token
+from app.services.principal_cache import principal_cache
 
 async def update_user(
     db: AsyncSession, *, db_user: User, user_in: Union[AdminUserUpdate, Dict[str, Any]]
@@ -25,22 +28,29 @@ async def update_user(
 
     # Se uma nova senha for fornecida no dicionário, faz o hash dela
     if "password" in update_data and update_data["password"]:
-        hashed_password = get_password_hash(update_data["password"])
+        hashed_password = await get_password_hash_async(update_data["password"])
         del update_data["password"] # Remove a senha em texto puro
         update_data["hashed_password"] = hashed_password
     
     for field, value in update_data.items():
         setattr(db_user, field, value)
+    if "is_active" in update_data or "is_superuser" in update_data:
+        db_user.authz_updated_at = datetime.now(timezone.utc)
+    # Mudar a senha ou desativar a conta termina as sessões existentes
+    if "hashed_password" in update_data or update_data.get("is_active") is False:
+        await crud_refresh_token.revoke_user_refresh_tokens(db, user_id=db_user.id)
     
     db.add(db_user)
     await db.commit()
     await db.refresh(db_user)
+    # O estado (is_active, is_superuser) faz parte do principal em cache
+    await principal_cache.invalidate_user(db_user.id)
     return db_user
 
 async def create_user(db: AsyncSession, *, user_in: UserCreate) -> User:
     """Cria um novo utilizador no banco de dados."""
     db_user_data = user_in.model_dump(exclude={"password"})
-    hashed_password = get_password_hash(user_in.password)
+    hashed_password = await get_password_hash_async(user_in.password)
     db_user = User(**db_user_data, hashed_password=hashed_password)
     db.add(db_user)
     await db.commit()
@@ -75,7 +85,16 @@ async def update_user_roles(db: AsyncSession, *, user: User, role_ids: List[int]
     """Atualiza os planos (roles) de um utilizador."""
     result = await db.execute(select(Role).where(Role.id.in_(role_ids)))
     user.roles = result.scalars().all()
+    user.authz_updated_at = datetime.now(timezone.utc)
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    await principal_cache.invalidate_user(user.id)
     return await get_user_by_id_with_permissions(db, user_id=user.id)
+
+async def get_authz_changes_since(db: AsyncSession, *, since: datetime) -> List[Tuple[UUID, datetime]]:
+    """Utilizadores cujos planos, permissões ou estado mudaram depois de `since`."""
+    result = await db.execute(
+        select(User.id, User.authz_updated_at).where(User.authz_updated_at > since)
+    )
+    return [(row.id, row.authz_updated_at) for row in result]
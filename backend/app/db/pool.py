@@ -0,0 +1,69 @@
+import time
+from collections import deque
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Número de esperas recentes usadas para os percentis
+WAIT_SAMPLES = 1000
+
+
+class MonitoredAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Pool do engine assíncrono que mede quanto tempo cada pedido espera por uma conexão
+    (inclui a abertura de uma conexão nova, quando o pool ainda não está cheio).
+    Esperas longas ou timeouts indicam que DB_POOL_SIZE/DB_MAX_OVERFLOW são pequenos
+    para o tráfego (ou que há sessões a segurar conexões demasiado tempo).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._recent_waits: deque = deque(maxlen=WAIT_SAMPLES)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            wait = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self._recent_waits.append(wait)
+
+    def recreate(self):
+        # O SQLAlchemy recria o pool (ex: engine.dispose()); os contadores continuam no novo
+        new_pool = super().recreate()
+        for name in ("checkouts", "checkout_timeouts", "wait_total", "wait_max"):
+            setattr(new_pool, name, getattr(self, name))
+        return new_pool
+
+    def snapshot(self) -> Dict[str, Any]:
+        waits = sorted(self._recent_waits)
+
+        def percentile(pct: float) -> float:
+            if not waits:
+                return 0.0
+            return waits[min(len(waits) - 1, int(round(pct / 100 * (len(waits) - 1))))] * 1000
+
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": self.overflow(),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.checkout_timeouts,
+            "wait_avg_ms": (self.wait_total / self.checkouts * 1000) if self.checkouts else 0.0,
+            "wait_p50_ms": percentile(50),
+            "wait_p99_ms": percentile(99),
+            "wait_max_ms": self.wait_max * 1000,
+        }
@@ -0,0 +1,149 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+# Atraso da réplica em segundos. Se a réplica já aplicou todo o WAL que recebeu, está em dia
+# (mesmo que a última transação aplicada seja antiga, porque o primário está parado);
+# caso contrário o atraso é o tempo desde a última transação aplicada.
+# "Aplicou tudo o que recebeu" só significa "em dia" enquanto estiver a receber: sem o
+# walreceiver em streaming (ligação ao primário perdida) o resultado é NULL e a réplica não
+# é usada. Sem pg_read_all_stats, o status vem a NULL e conta a existência do walreceiver.
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming' OR status IS NULL
+        ) THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaRouter:
+    """
+    Encaminha as sessões de leitura para uma réplica, enquanto ela estiver em dia.
+
+    Uma tarefa de fundo mede o atraso da réplica a cada `check_interval` segundos. A réplica
+    só é usada se a última medição tiver sucesso, for recente e o atraso não passar de
+    `max_lag` segundos; caso contrário (ou se a conexão à réplica falhar ao abrir a sessão)
+    a sessão é aberta no primário, com `fallback`.
+
+    As rotas servidas pela réplica podem não ver as escritas dos últimos `max_lag` segundos:
+    usar apenas onde isso é aceitável.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[AsyncEngine],
+        fallback: async_sessionmaker,
+        max_lag: float,
+        check_interval: float,
+    ):
+        self.engine = engine
+        self.fallback = fallback
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._factory = (
+            async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False) if engine is not None else None
+        )
+        self._task: Optional[asyncio.Task] = None
+        self.lag: Optional[float] = None
+        self.last_check_at = 0.0
+        self.last_error: Optional[str] = None
+        self.replica_sessions = 0
+        self.primary_sessions = 0
+        self.failovers = 0
+
+    @property
+    def available(self) -> bool:
+        return (
+            self.engine is not None
+            and self.lag is not None
+            and self.lag <= self.max_lag
+            and time.monotonic() - self.last_check_at <= 3 * self.check_interval
+        )
+
+    async def start(self) -> None:
+        if self.engine is None or self._task is not None:
+            return
+        await self.check_once()
+        self._task = asyncio.create_task(self._run(), name="replica-lag-check")
+        print(f"Réplica de leitura configurada (atraso máximo {self.max_lag}s).")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self.engine is not None:
+            await self.engine.dispose()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check_once()
+
+    async def check_once(self) -> None:
+        """Mede o atraso da réplica. Em caso de erro a réplica fica indisponível até à próxima medição."""
+        try:
+            async with self.engine.connect() as conn:
+                lag = (await conn.execute(REPLICA_LAG_SQL)).scalar()
+        except (OSError, DBAPIError, asyncio.TimeoutError) as e:
+            self._mark_unavailable(e)
+            return
+        if lag is None:
+            self._mark_unavailable(RuntimeError("a réplica não está a receber WAL do primário"))
+            return
+        lag = float(lag)
+        if self.lag is not None and self.lag <= self.max_lag < lag:
+            print(f"Réplica atrasada {lag:.1f}s: leituras passam para o primário.")
+        self.lag = lag
+        self.last_check_at = time.monotonic()
+        self.last_error = None
+
+    def _mark_unavailable(self, error: Exception) -> None:
+        if self.lag is not None:
+            print(f"Réplica indisponível ({error}): leituras passam para o primário.")
+        self.lag = None
+        self.last_error = str(error)
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """Sessão de leitura na réplica, ou no primário se a réplica não estiver disponível."""
+        if self.available:
+            async with self._factory() as session:
+                try:
+                    # Abre já a conexão para poder mudar para o primário se a réplica falhar
+                    await session.connection()
+                except (OSError, DBAPIError) as e:
+                    self.failovers += 1
+                    self._mark_unavailable(e)
+                else:
+                    self.replica_sessions += 1
+                    yield session
+                    return
+        self.primary_sessions += 1
+        async with self.fallback() as session:
+            yield session
+
+    def snapshot(self) -> Dict[str, Any]:
+        if self.engine is None:
+            return {"configured": False}
+        return {
+            "configured": True,
+            "available": self.available,
+            "lag_seconds": self.lag,
+            "max_lag_seconds": self.max_lag,
+            "last_error": self.last_error,
+            "replica_sessions": self.replica_sessions,
+            "primary_sessions": self.primary_sessions,
+            "failovers": self.failovers,
+            "pool": self.engine.pool.snapshot(),
+        }
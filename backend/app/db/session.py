@@ -3,6 +3,10 @@ from dotenv import load_dotenv
 import os
 from urllib.parse import quote_plus
 
+from app.core.config import settings
+from app.db.pool import MonitoredAsyncQueuePool
+from app.db.replica import ReplicaRouter
+
 # Caminho para o diretório raiz do projeto (sportsbet-ev-ai)
 PROJECT_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 ENV_PATH = os.path.join(PROJECT_ROOT_DIR, '.env')
@@ -32,7 +36,34 @@ SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{ENCODED_DB_PASSWORD}
 
 # print(f"DEBUG: DATABASE_URL construída: {SQLALCHEMY_DATABASE_URL.replace(DB_PASSWORD, '********')}") # Debug, ocultando a senha
 
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=False) # echo=True para debug SQL
+def _create_engine(url: str):
+    return create_async_engine(
+        url,
+        echo=False, # echo=True para debug SQL
+        poolclass=MonitoredAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            # Cache do dialeto asyncpg do SQLAlchemy e cache interna do asyncpg
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+    )
+
+engine = _create_engine(SQLALCHEMY_DATABASE_URL)
+
+# Réplica de leitura opcional (streaming replication do primário), com as mesmas credenciais
+DB_REPLICA_HOST = os.getenv("DB_REPLICA_HOST")
+DB_REPLICA_PORT = os.getenv("DB_REPLICA_PORT", DB_PORT)
+
+replica_engine = None
+if DB_REPLICA_HOST:
+    replica_engine = _create_engine(
+        f"postgresql+asyncpg://{DB_USER}:{ENCODED_DB_PASSWORD}@{DB_REPLICA_HOST}:{DB_REPLICA_PORT}/{DB_NAME}"
+    ).execution_options(isolation_level="AUTOCOMMIT")
 
 AsyncSessionLocal = async_sessionmaker(
     autocommit=False,
@@ -41,15 +72,42 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False
 )
 
+# Sessões só de leitura: as conexões ficam em modo AUTOCOMMIT, por isso cada consulta é
+# enviada sem BEGIN/COMMIT à volta (um round trip em vez de três). Não usar para escritas.
+ReadOnlySessionLocal = async_sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine.execution_options(isolation_level="AUTOCOMMIT"),
+    expire_on_commit=False
+)
+
 from app.db.base_class import Base # Importa a Base
 
 async def get_db_session():
+    """
+    Sessão de leitura/escrita (unit of work). As funções de crud que escrevem fazem elas
+    próprias o commit, uma única vez; aqui não há commit no fim do pedido. O que ficar por
+    confirmar (ex: um erro a meio) é desfeito quando a sessão fecha.
+    """
     async with AsyncSessionLocal() as session:
-        try:
-            yield session
-            await session.commit() # Commit aqui pode ser muito agressivo, geralmente o commit é feito no service layer
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
+        yield session
+
+async def get_readonly_db_session():
+    """Sessão para rotas que só leem (ver ReadOnlySessionLocal)."""
+    async with ReadOnlySessionLocal() as session:
+        yield session
+
+replica_router = ReplicaRouter(
+    replica_engine,
+    fallback=ReadOnlySessionLocal,
+    max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DB_REPLICA_CHECK_INTERVAL_SECONDS,
+)
+
+async def get_replica_db_session():
+    """
+    Sessão só de leitura servida pela réplica, se houver uma em dia (senão pelo primário).
+    Para rotas públicas de consulta que toleram alguns segundos de atraso.
+    """
+    async with replica_router.session() as session:
+        yield session
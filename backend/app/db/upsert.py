@@ -0,0 +1,96 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import func, literal_column, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# O protocolo do PostgreSQL limita cada instrução a 32767 parâmetros ($1..$32767)
+MAX_BIND_PARAMS = 32767
+DEFAULT_CHUNK_SIZE = 1000
+
+
+@dataclass
+class UpsertResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    def __iadd__(self, other: "UpsertResult") -> "UpsertResult":
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        return self
+
+    @property
+    def written(self) -> int:
+        return self.inserted + self.updated
+
+    def __str__(self) -> str:
+        return f"{self.inserted} inseridos, {self.updated} atualizados, {self.unchanged} sem alterações"
+
+
+def _dedupe(rows: Iterable[Dict[str, Any]], index_elements: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Remove linhas repetidas pela chave de conflito (fica a última).
+    Um ON CONFLICT DO UPDATE não pode afetar a mesma linha duas vezes na mesma instrução.
+    """
+    unique = {tuple(row[column] for column in index_elements): row for row in rows}
+    return list(unique.values())
+
+
+async def bulk_upsert(
+    db: AsyncSession,
+    model: Any,
+    rows: Iterable[Dict[str, Any]],
+    *,
+    update_columns: Sequence[str],
+    index_elements: Sequence[str] = ("id",),
+    touch_column: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> UpsertResult:
+    """
+    INSERT ... ON CONFLICT DO UPDATE em lotes, com deteção de alterações.
+
+    - As linhas são enviadas em lotes que respeitam o limite de parâmetros do PostgreSQL;
+    - só as linhas existentes em que alguma de `update_columns` mudou (`IS DISTINCT FROM`)
+      são reescritas, o que evita gerar versões mortas e WAL para linhas iguais;
+    - `touch_column` (ex: "updated_at") é posta a now() apenas nas linhas realmente alteradas
+      (o onupdate do modelo não é aplicado em ON CONFLICT DO UPDATE).
+
+    Não faz commit. Devolve quantas linhas foram inseridas, atualizadas e deixadas como estavam.
+    """
+    rows = _dedupe(rows, index_elements)
+    result = UpsertResult()
+    if not rows:
+        return result
+
+    table = model.__table__
+    # Limite superior de parâmetros por linha: os defaults do modelo também são enviados como parâmetros
+    columns_per_row = len(table.columns)
+    chunk_size = max(1, min(chunk_size, MAX_BIND_PARAMS // columns_per_row))
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        stmt = insert(model).values(chunk)
+
+        set_ = {column: stmt.excluded[column] for column in update_columns}
+        if touch_column:
+            set_[touch_column] = func.now()
+
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(index_elements),
+            set_=set_,
+            where=or_(*(table.c[column].is_distinct_from(stmt.excluded[column]) for column in update_columns)),
+        ).returning(
+            # xmax = 0 só numa linha acabada de inserir; as linhas não alteradas não são devolvidas
+            literal_column("(xmax = 0)").label("inserted")
+        )
+
+        flags = (await db.execute(stmt)).scalars().all()
+        inserted = sum(1 for flag in flags if flag)
+        result.inserted += inserted
+        result.updated += len(flags) - inserted
+        result.unchanged += len(chunk) - len(flags)
+
+    return result
@@ -1,13 +1,43 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.api_v1 import api_router_v1
 from app.api.v1.endpoints import websockets
+from app.core.config import settings
+from app.db.session import replica_router
+from app.services.http_client import get_http_client, close_http_client
+from app.services.job_queue import job_worker
+from app.services.backplane import backplane
+from app.services.live_poller import live_poller
+from app.services.principal_cache import principal_cache
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Gere os recursos partilhados durante o ciclo de vida da aplicação."""
+    # Cria o pool HTTP partilhado no arranque para que o primeiro pedido não pague a criação
+    get_http_client()
+    await backplane.start()
+    await replica_router.start()
+    if settings.JWT_EMBED_PERMISSIONS:
+        await principal_cache.load_recent_changes()
+    if settings.LIVE_POLLER_ENABLED:
+        live_poller.start()
+    if settings.JOB_WORKER_IN_API:
+        job_worker.start()
+    yield
+    await job_worker.stop()
+    await live_poller.stop()
+    await replica_router.stop()
+    await backplane.stop()
+    await close_http_client()
 
 app = FastAPI(
     title="SportsBet +EV AI API",
     description="API para a plataforma SportsBet +EV AI.",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 origins = [
@@ -21,6 +51,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cabeçalhos de GET /games que o frontend precisa de ler (paginação e revalidação)
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 @app.get("/", tags=["Root"])
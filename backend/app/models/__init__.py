@@ -14,3 +14,9 @@ from .prediction import Prediction
 
 # Novo modelo de aposta
 from .bet import Bet, BetStatus
+
+# Sessões (refresh tokens)
+from .refresh_token import RefreshToken
+
+# Fila de tarefas de fundo
+from .job import Job, JobStatus
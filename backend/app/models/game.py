@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLAlchemyEnum, Text # Adicione Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLAlchemyEnum, Text, Index # Adicione Text
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import enum
@@ -19,8 +19,10 @@ class Game(Base):
 
     home_team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
     away_team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
+    # Sem chave estrangeira: a liga de um jogo pode ainda não estar na tabela leagues
+    league_id = Column(Integer, nullable=True, comment="O ID da liga na API-Futebol")
 
-    game_time = Column(DateTime(timezone=True), nullable=False, index=True)
+    game_time = Column(DateTime(timezone=True), nullable=False)
     status = Column(SQLAlchemyEnum(GameStatus), nullable=False, default=GameStatus.SCHEDULED)
 
     home_score = Column(Integer, nullable=True)
@@ -40,5 +42,15 @@ class Game(Base):
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
+    # As listagens ordenam por (game_time, id) e paginam por cursor sobre essas colunas:
+    # cada filtro tem um índice que começa pela coluna filtrada e termina em (game_time, id)
+    __table_args__ = (
+        Index("ix_games_game_time_id", "game_time", "id"),
+        Index("ix_games_league_id_game_time_id", "league_id", "game_time", "id"),
+        Index("ix_games_status_game_time_id", "status", "game_time", "id"),
+        Index("ix_games_home_team_id_game_time_id", "home_team_id", "game_time", "id"),
+        Index("ix_games_away_team_id_game_time_id", "away_team_id", "game_time", "id"),
+    )
+
     def __repr__(self):
         return f"<Game(id={self.id}, home_team_id={self.home_team_id}, away_team_id={self.away_team_id})>"
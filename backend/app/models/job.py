@@ -0,0 +1,56 @@
+import enum
+import uuid
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, Enum as SQLAlchemyEnum, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from datetime import datetime, timezone
+
+from app.db.base_class import Base
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class Job(Base):
+    """
+    Tarefa de fundo na fila persistente (ex: a pré-análise de IA), executada pelo worker
+    (app/scripts/run_worker.py). Os workers reservam a próxima tarefa com
+    SELECT ... FOR UPDATE SKIP LOCKED, por isso vários workers podem partilhar a fila.
+
+    Uma tarefa que falha volta à fila com `run_after` no futuro (backoff exponencial) até
+    esgotar `max_attempts`. Enquanto corre, o worker atualiza `heartbeat_at`; uma tarefa em
+    execução sem heartbeat recente (worker terminado a meio) volta à fila.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String(50), nullable=False, comment="Tipo de tarefa, ex: 'pre_analysis'")
+    payload = Column(JSONB, nullable=False, default=dict)
+    status = Column(SQLAlchemyEnum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    # Progresso reportado pela tarefa (ex: jogos analisados / total)
+    progress_done = Column(Integer, nullable=False, default=0)
+    progress_total = Column(Integer, nullable=True)
+    result = Column(JSONB, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    worker_id = Column(String(100), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # A reserva procura as tarefas em fila cujo run_after já passou, pela ordem de run_after.
+    # Só pode haver uma tarefa de cada tipo em fila ou em execução (índice único parcial).
+    __table_args__ = (
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+        Index("uq_jobs_active_kind", "kind", unique=True, postgresql_where=text("status IN ('QUEUED', 'RUNNING')")),
+    )
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, kind='{self.kind}', status={self.status})>"
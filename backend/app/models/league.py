@@ -9,6 +9,9 @@ class League(Base):
     country = Column(String(100), nullable=False)
     logo = Column(String(255), nullable=True)
     type = Column(String(50), nullable=True) # Ex: League, Cup
+    # Temporada em curso segundo a API (seasons[].current); as ligas de ano civil e as de
+    # agosto a maio estão em temporadas diferentes na mesma data
+    current_season = Column(Integer, nullable=True, comment="Temporada em curso na API-Futebol")
     is_sync_enabled = Column(Boolean, default=False, nullable=False, comment="Flag para controlar se sincronizamos equipas e jogos desta liga")
 
     def __repr__(self):
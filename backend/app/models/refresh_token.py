@@ -0,0 +1,31 @@
+import uuid
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime, timezone
+
+from app.db.base_class import Base
+
+class RefreshToken(Base):
+    """
+    Refresh token emitido no login. O cliente recebe um valor aleatório opaco; aqui guarda-se
+    apenas o seu SHA-256, pesquisado por um índice único na renovação.
+
+    Cada renovação revoga o token usado e emite outro na mesma família (rotação). Se um token
+    já revogado voltar a ser apresentado, alguém guardou uma cópia: a família inteira é revogada.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+    # Todos os tokens obtidos por rotação a partir do mesmo login partilham a família
+    family_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+
+    user = relationship("User")
+
+    def __repr__(self):
+        return f"<RefreshToken(id={self.id}, user_id={self.user_id}, family_id={self.family_id})>"
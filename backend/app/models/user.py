@@ -26,6 +26,8 @@ class User(Base):
     is_superuser = Column(Boolean(), default=False, nullable=False)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    # Última alteração dos planos, permissões ou estado (tokens emitidos antes já não são fiáveis nisso)
+    authz_updated_at = Column(DateTime(timezone=True), nullable=True, index=True)
 
     # Relacionamento com Role (muitos-para-muitos)
     roles = relationship(
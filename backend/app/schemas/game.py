@@ -30,6 +30,7 @@ class GameUpdate(BaseModel):
 # Esquema usado para retornar os dados de um jogo da API
 class GameRead(GameBase):
     id: int
+    league_id: Optional[int] = None
     home_score: Optional[int] = None
     away_score: Optional[int] = None
     # --- NOVOS CAMPOS ADICIONADOS ---
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Any, Dict, Optional
+from datetime import datetime
+from uuid import UUID
+
+from app.models.job import JobStatus
+
+class JobRead(BaseModel):
+    id: UUID
+    kind: str
+    status: JobStatus
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+    run_after: datetime
+    progress_done: int
+    progress_total: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+# Resposta de um endpoint que põe uma tarefa na fila
+class JobQueued(BaseModel):
+    message: str
+    job_id: UUID
+    status: JobStatus
@@ -7,6 +7,7 @@ class LeagueBase(BaseModel):
     country: str
     logo: Optional[str] = None
     type: Optional[str] = None
+    current_season: Optional[int] = None
 
 class LeagueCreate(LeagueBase):
     pass
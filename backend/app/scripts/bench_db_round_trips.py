@@ -0,0 +1,170 @@
+import argparse
+import asyncio
+import os
+import statistics
+import struct
+import time
+import uuid
+
+# Conta os round trips à base de dados por pedido em várias rotas da API. Entre a API
+# (em processo, via ASGITransport) e o PostgreSQL do .env fica um proxy TCP que lê o
+# protocolo do PostgreSQL: cada mensagem Sync (consulta preparada) ou Query (consulta
+# simples, ex: BEGIN/COMMIT) enviada pelo cliente é um round trip.
+# Compara a sessão atual com o comportamento antigo (commit no fim de todos os pedidos).
+#   python -m app.scripts.bench_db_round_trips --requests 20
+
+SSL_REQUEST_CODE = 80877103
+GSSENC_REQUEST_CODE = 80877104
+
+
+class RoundTripProxy:
+    """Proxy TCP para o PostgreSQL que conta as mensagens Sync/Query dos clientes."""
+
+    def __init__(self, upstream_host: str, upstream_port: int):
+        self.upstream_host = upstream_host
+        self.upstream_port = upstream_port
+        self.round_trips = 0
+        self.messages = 0
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self._server.close()
+
+    async def _handle(self, client_reader, client_writer):
+        upstream_reader, upstream_writer = await asyncio.open_connection(self.upstream_host, self.upstream_port)
+        tasks = [
+            asyncio.create_task(self._client_to_server(client_reader, upstream_writer)),
+            asyncio.create_task(self._pipe(upstream_reader, client_writer)),
+        ]
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        client_writer.close()
+        upstream_writer.close()
+
+    @staticmethod
+    async def _pipe(reader, writer):
+        while chunk := await reader.read(65536):
+            writer.write(chunk)
+            await writer.drain()
+
+    async def _client_to_server(self, reader, writer):
+        # Mensagens de arranque (sem byte de tipo): pedido de SSL/GSS e StartupMessage
+        while True:
+            header = await reader.readexactly(8)
+            length, code = struct.unpack("!ii", header)
+            body = await reader.readexactly(length - 8)
+            writer.write(header + body)
+            await writer.drain()
+            if code not in (SSL_REQUEST_CODE, GSSENC_REQUEST_CODE):
+                break
+        while True:
+            header = await reader.readexactly(5)
+            kind, length = header[:1], struct.unpack("!i", header[1:])[0]
+            body = await reader.readexactly(length - 4)
+            self.messages += 1
+            if kind in (b"S", b"Q"):
+                self.round_trips += 1
+            writer.write(header + body)
+            await writer.drain()
+
+
+async def _legacy_get_db_session():
+    """get_db_session como era antes: commit no fim de todos os pedidos."""
+    from app.db.session import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+
+async def main(requests: int):
+    proxy = RoundTripProxy(os.environ["DB_HOST"], int(os.environ["DB_PORT"]))
+    port = await proxy.start()
+    # O engine é criado na importação com as variáveis DB_*: tem de apontar para o proxy
+    os.environ["DB_HOST"], os.environ["DB_PORT"] = "127.0.0.1", str(port)
+
+    import httpx
+    from sqlalchemy import select
+
+    from app.core.security import create_access_token, get_password_hash
+    from app.db.session import AsyncSessionLocal, engine, get_db_session, get_readonly_db_session
+    from app.main import app
+    from app.models import Game, User
+
+    async with AsyncSessionLocal() as db:
+        user = User(
+            email=f"bench-{uuid.uuid4().hex[:8]}@example.com",
+            hashed_password=get_password_hash(uuid.uuid4().hex),
+            is_superuser=True,
+        )
+        db.add(user)
+        await db.commit()
+        game_id = (await db.execute(select(Game.id).limit(1))).scalar()
+
+    headers = {"Authorization": f"Bearer {create_access_token(user.id)}"}
+    bet = {"game_id": game_id, "market_name": "Vencedor do Jogo", "selection": "Casa", "odds": 2.1, "stake": 1}
+    routes = [
+        ("GET /games/", "GET", "/api/v1/games/", None),
+        ("GET /games/{id}", "GET", f"/api/v1/games/{game_id}", None),
+        ("GET /bets/", "GET", "/api/v1/bets/", None),
+        ("POST /bets/", "POST", "/api/v1/bets/", bet),
+        ("GET /admin/roles/", "GET", "/api/v1/admin/roles/", None),
+        ("GET /users/me", "GET", "/api/v1/users/me", None),
+    ]
+    if game_id is None:
+        routes = [route for route in routes if route[0] != "GET /games/{id}"]
+        print("Aviso: não há jogos na base de dados; a rota /games/{id} não é medida.")
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            for mode in ("antes", "agora"):
+                if mode == "antes":
+                    app.dependency_overrides[get_db_session] = _legacy_get_db_session
+                    app.dependency_overrides[get_readonly_db_session] = _legacy_get_db_session
+                else:
+                    app.dependency_overrides.clear()
+                for label, method, path, body in routes:
+                    # Aquece a cache de principals e os prepared statements das conexões
+                    for _ in range(3):
+                        (await http.request(method, path, json=body, headers=headers)).raise_for_status()
+                    counts, durations = [], []
+                    for _ in range(requests):
+                        before = proxy.round_trips
+                        start = time.perf_counter()
+                        (await http.request(method, path, json=body, headers=headers)).raise_for_status()
+                        durations.append((time.perf_counter() - start) * 1000)
+                        counts.append(proxy.round_trips - before)
+                    results[(mode, label)] = (statistics.mean(counts), statistics.median(durations))
+    finally:
+        app.dependency_overrides.clear()
+        async with AsyncSessionLocal() as db:
+            await db.delete(await db.get(User, user.id))
+            await db.commit()
+        await engine.dispose()
+        await proxy.stop()
+
+    print(f"{'rota':<24}{'round trips antes':>20}{'agora':>8}{'ms antes':>12}{'agora':>8}")
+    for label, *_ in routes:
+        before_trips, before_ms = results[("antes", label)]
+        after_trips, after_ms = results[("agora", label)]
+        print(f"{label:<24}{before_trips:>20.1f}{after_trips:>8.1f}{before_ms:>12.2f}{after_ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Round trips à base de dados por pedido.")
+    parser.add_argument("--requests", type=int, default=20, help="Pedidos medidos por rota.")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+# Mede o pico de memória (RSS) ao processar a resposta de /fixtures com diferentes tamanhos
+# de temporada, comparando o caminho antigo (response.json() + lista de jogos normalizados)
+# com o caminho em streaming usado pelo sync_games. Cada medição corre num processo novo,
+# porque o pico de RSS de um processo nunca desce. A base de dados não é usada: os lotes
+# normalizados são descartados no lugar do upsert.
+#   python -m app.scripts.bench_fixtures_memory --sizes 380 3800 38000
+
+MODES = {
+    "json": "response.json() + lista",
+    "stream": "streaming",
+    "stream-cache": "streaming + cache em disco",
+}
+
+
+def _max_rss_mb() -> float:
+    # No Linux o ru_maxrss herda o pico do processo pai (fork + exec), por isso preferimos o
+    # VmHWM, que é do espaço de memória do próprio processo. Ambos vêm em KB.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _child(mode: str, base_url: str) -> None:
+    """Processa uma temporada num processo isolado e escreve o resultado em JSON no stdout."""
+    from app.core.config import settings
+    from app.services import football_api_service
+    from app.services.http_client import close_http_client
+    from app.services.rate_limiter import football_api_limiter
+    from app.scripts.sync_games import UPSERT_BATCH_SIZE, normalize_fixture
+
+    settings.API_FOOTBALL_BASE_URL = base_url
+    football_api_limiter.set_rate(10_000_000)
+    baseline = _max_rss_mb()
+    start = time.perf_counter()
+
+    count = 0
+    if mode == "json":
+        fixtures = await football_api_service.get_fixtures(league_id=71, season=2023)
+        games = [game for game in map(normalize_fixture, fixtures) if game]
+        count = len(games)
+    else:
+        fixtures = await football_api_service.stream_fixtures(league_id=71, season=2023)
+        batch = []
+        async for item in fixtures:
+            game = normalize_fixture(item)
+            if game:
+                batch.append(game)
+                count += 1
+            if len(batch) >= UPSERT_BATCH_SIZE:
+                batch = []
+
+    elapsed = time.perf_counter() - start
+    await close_http_client()
+    print(json.dumps({"fixtures": count, "baseline_mb": baseline, "peak_mb": _max_rss_mb(), "seconds": elapsed}))
+
+
+async def _measure(mode: str, base_url: str, cache_dir: str) -> dict:
+    env = {
+        **os.environ,
+        "API_FOOTBALL_KEY": "bench-key",
+        "API_FOOTBALL_CACHE_ENABLED": "true" if mode == "stream-cache" else "false",
+        "CACHE_DIR": cache_dir,
+    }
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "app.scripts.bench_fixtures_memory", "--child", mode, "--base-url", base_url,
+        env=env, stdout=asyncio.subprocess.PIPE,
+    )
+    stdout, _ = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"O processo de medição '{mode}' terminou com o código {process.returncode}")
+    return json.loads(stdout.decode().strip().splitlines()[-1])
+
+
+async def main(sizes, port: int):
+    from app.scripts.fake_football_api import run_fake_api
+
+    print(f"{'Jogos':>8} {'Modo':<28} {'Pico RSS':>10} {'Acima da base':>14} {'Tempo':>8}")
+    for size in sizes:
+        async with run_fake_api(port=port, fixtures_per_season=size) as (base_url, _):
+            for mode, label in MODES.items():
+                with tempfile.TemporaryDirectory() as cache_dir:
+                    r = await _measure(mode, base_url, cache_dir)
+                print(
+                    f"{r['fixtures']:>8} {label:<28} {r['peak_mb']:>8.1f}MB "
+                    f"{r['peak_mb'] - r['baseline_mb']:>12.1f}MB {r['seconds']:>7.2f}s"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pico de memória ao processar temporadas de vários tamanhos.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[380, 3800, 38000])
+    parser.add_argument("--port", type=int, default=8083)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        asyncio.run(_child(args.child, args.base_url))
+    else:
+        asyncio.run(main(args.sizes, args.port))
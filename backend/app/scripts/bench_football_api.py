@@ -0,0 +1,70 @@
+import argparse
+import asyncio
+import os
+import time
+
+# O benchmark corre contra o servidor falso local, por isso configuramos o ambiente
+# antes de importar os módulos da aplicação (as configurações são lidas no import).
+os.environ.setdefault("API_FOOTBALL_KEY", "bench-key")
+
+import httpx
+
+from app.core.config import settings
+from app.services import football_api_service
+from app.services.http_client import close_http_client
+from app.services.rate_limiter import football_api_limiter
+from app.scripts.fake_football_api import run_fake_api
+
+# Compara o padrão antigo (um httpx.AsyncClient novo por chamada) com o cliente
+# partilhado do pool. Como o servidor local não usa TLS, o ganho medido aqui é um
+# limite inferior do ganho real contra o fornecedor (onde cada conexão nova paga o handshake).
+#   python -m app.scripts.bench_football_api --requests 500 --concurrency 10
+
+
+async def _old_style_call(url: str) -> None:
+    """Replica o comportamento anterior: um cliente (e uma conexão) por pedido."""
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url, headers=football_api_service.HEADERS)
+        response.raise_for_status()
+        response.json()
+
+
+async def _run(label: str, call, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await call()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed
+    print(f"{label:<28} {total} pedidos em {elapsed:.2f}s -> {rate:,.0f} pedidos/s")
+    return rate
+
+
+async def main(total: int, concurrency: int, port: int):
+    async with run_fake_api(port=port) as (base_url, _):
+        settings.API_FOOTBALL_BASE_URL = base_url
+        # O servidor local não tem quota: desligamos o ritmo do token bucket para medir só o transporte
+        football_api_limiter.set_rate(10_000_000)
+        status_url = f"{base_url}/status"
+
+        # Aquecimento para que o arranque do servidor não conte para nenhum dos lados
+        await _old_style_call(status_url)
+
+        before = await _run("Antes (cliente por pedido)", lambda: _old_style_call(status_url), total, concurrency)
+        after = await _run("Depois (pool partilhado)", football_api_service.get_api_status, total, concurrency)
+        await close_http_client()
+
+    print(f"\nGanho: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do cliente HTTP partilhado da API-Futebol.")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8081)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.port))
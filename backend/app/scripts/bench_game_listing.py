@@ -0,0 +1,161 @@
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import timedelta
+
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.crud import crud_game
+from app.db.base_class import Base
+from app.db.session import engine
+from app.models import Game, GameStatus, Team
+
+# Compara a paginação por OFFSET com a paginação por cursor de GET /games, e mede os filtros
+# por liga/equipa/estado/datas, numa base de dados própria (criada e apagada pelo script)
+# com as tabelas teams e games e N jogos gerados no servidor com generate_series.
+# Mede primeiro com os índices do modelo e depois (com --without-indexes) sem eles.
+#   python -m app.scripts.bench_game_listing --games 1000000
+
+PAGE_SIZE = 100
+
+SEED_TEAMS_SQL = text("""
+    INSERT INTO teams (id, name, sport, league)
+    SELECT g, 'Equipa ' || g, 'futebol', 'Liga ' || (1 + g % :leagues)
+    FROM generate_series(1, :teams) AS g
+""")
+
+# Um jogo a cada 2,5 minutos, de forma que os últimos 10% fiquem no futuro (agendados)
+SEED_GAMES_SQL = text("""
+    INSERT INTO games (id, home_team_id, away_team_id, league_id, game_time, status, api_provider)
+    SELECT
+        g,
+        1 + (g::bigint * 7919) % :teams,
+        1 + ((g::bigint * 7919) % :teams + 1 + g % (:teams - 1)) % :teams,
+        1 + g % :leagues,
+        now() - (:games * 0.9 - g) * interval '150 seconds',
+        CASE WHEN g < :games * 0.9 THEN 'FINISHED'::gamestatus ELSE 'SCHEDULED'::gamestatus END,
+        'bench'
+    FROM generate_series(1, :games) AS g
+""")
+
+
+def _index_names(plan: dict) -> set:
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", ()):
+        names |= _index_names(child)
+    return names
+
+
+async def _measure(db: AsyncSession, query, repeat: int):
+    """Mediana em ms da consulta principal (sem o selectinload das equipas) e os índices usados."""
+    core = query.with_only_columns(Game.id, Game.game_time)
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        (await db.execute(core)).all()
+        durations.append((time.perf_counter() - start) * 1000)
+    compiled = core.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+    plan = (await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))).scalar()[0]["Plan"]
+    return statistics.median(durations), ", ".join(sorted(_index_names(plan))) or "seq scan"
+
+
+def _page_query(filters: dict, after=None, offset=None):
+    query = crud_game._games_query(**filters)
+    if after is not None:
+        query = query.where(tuple_(Game.game_time, Game.id) > tuple_(*after))
+    if offset is not None:
+        query = query.offset(offset)
+    return query.limit(PAGE_SIZE)
+
+
+async def _run(db: AsyncSession, label: str, args) -> None:
+    print(f"\n--- {label} ---")
+    print(f"{'consulta':<46}{'offset ms':>11}{'cursor ms':>11}  índices (cursor)")
+
+    now = (await db.execute(text("SELECT now()"))).scalar()
+    cases = [
+        ("todos", {}),
+        ("liga", {"league_id": 7}),
+        ("equipa", {"team_id": 42}),
+        ("agendados", {"status": GameStatus.SCHEDULED}),
+        ("liga + próximos 30 dias", {
+            "league_id": 7, "date_from": now, "date_to": now + timedelta(days=30),
+        }),
+    ]
+    for name, filters in cases:
+        total = (await db.execute(
+            select(func.count()).select_from(crud_game._games_query(**filters).order_by(None).subquery())
+        )).scalar()
+        for page in args.pages:
+            offset = page * PAGE_SIZE
+            if offset >= total:
+                continue
+            # O cursor da página é o último jogo da página anterior (não medido)
+            after = None
+            if offset:
+                previous = (await db.execute(
+                    crud_game._games_query(**filters).with_only_columns(Game.game_time, Game.id)
+                    .offset(offset - 1).limit(1)
+                )).one()
+                after = (previous.game_time, previous.id)
+            offset_ms, _ = await _measure(db, _page_query(filters, offset=offset), args.repeat)
+            cursor_ms, indexes = await _measure(db, _page_query(filters, after=after), args.repeat)
+            print(f"{f'{name} ({total} jogos), página {page}':<46}{offset_ms:>11.2f}{cursor_ms:>11.2f}  {indexes}")
+
+
+async def main(args) -> None:
+    bench_db = args.database or f"{engine.url.database}_bench_games"
+    admin = engine.execution_options(isolation_level="AUTOCOMMIT")
+    async with admin.connect() as conn:
+        await conn.execute(text(f'DROP DATABASE IF EXISTS "{bench_db}"'))
+        await conn.execute(text(f'CREATE DATABASE "{bench_db}"'))
+    await engine.dispose()
+
+    bench_engine = create_async_engine(engine.url.set(database=bench_db))
+    try:
+        async with bench_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[Team.__table__, Game.__table__])
+            start = time.perf_counter()
+            await conn.execute(SEED_TEAMS_SQL, {"teams": args.teams, "leagues": args.leagues})
+            await conn.execute(SEED_GAMES_SQL, {"games": args.games, "teams": args.teams, "leagues": args.leagues})
+            print(f"{args.games} jogos, {args.teams} equipas e {args.leagues} ligas criados em "
+                  f"{time.perf_counter() - start:.1f}s na base de dados '{bench_db}'.")
+        async with bench_engine.connect() as conn:
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("VACUUM ANALYZE games"))
+
+        async with AsyncSession(bench_engine) as db:
+            await _run(db, "com os índices de listagem", args)
+
+        if args.without_indexes:
+            async with bench_engine.begin() as conn:
+                for index in Game.__table__.indexes:
+                    await conn.execute(text(f"DROP INDEX {index.name}"))
+                await conn.execute(text("ANALYZE games"))
+            async with AsyncSession(bench_engine) as db:
+                await _run(db, "sem os índices de listagem (só a chave primária)", args)
+    finally:
+        await bench_engine.dispose()
+        if not args.keep:
+            async with admin.connect() as conn:
+                await conn.execute(text(f'DROP DATABASE IF EXISTS "{bench_db}"'))
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Paginação por OFFSET vs cursor em GET /games.")
+    parser.add_argument("--games", type=int, default=1_000_000)
+    parser.add_argument("--teams", type=int, default=2000)
+    parser.add_argument("--leagues", type=int, default=50)
+    parser.add_argument("--page", type=int, action="append", dest="pages",
+                        help="Página a medir (pode repetir). Por omissão: 0, 10, 100, 1000 e 5000.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database", help="Nome da base de dados temporária.")
+    parser.add_argument("--without-indexes", action="store_true",
+                        help="Mede também sem os índices de listagem.")
+    parser.add_argument("--keep", action="store_true", help="Não apaga a base de dados no fim.")
+    args = parser.parse_args()
+    args.pages = args.pages or [0, 10, 100, 1000, 5000]
+    asyncio.run(main(args))
@@ -0,0 +1,58 @@
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from app.core.config import settings
+from app.crud import crud_game
+from app.db.session import ReadOnlySessionLocal, engine
+from app.services import ai_prediction_service
+from app.services.local_prediction_model import local_model
+
+# Mede o modelo de previsão local (Poisson) com as estatísticas da base de dados do .env:
+# o tempo de leitura das estatísticas, o tempo de cada previsão (só o modelo e a previsão
+# completa, com o PredictionCreate) e a distribuição das probabilidades obtidas.
+#   python -m app.scripts.bench_local_model --predictions 100000
+
+
+async def main(args) -> None:
+    start = time.perf_counter()
+    await local_model.ensure_loaded()
+    print(f"Estatísticas lidas em {(time.perf_counter() - start) * 1000:.1f} ms: {local_model.snapshot()}")
+
+    team_ids = list(local_model.teams) or list(range(1, 21))
+    rng = random.Random(42)
+    pairs = [tuple(rng.sample(team_ids, 2)) for _ in range(args.predictions)]
+    start = time.perf_counter()
+    outcomes = [local_model.predict(home, away) for home, away in pairs]
+    elapsed = time.perf_counter() - start
+    print(f"{args.predictions} previsões do modelo: {elapsed * 1e6 / args.predictions:.1f} µs por previsão")
+
+    totals = [o.home_win + o.draw + o.away_win for o in outcomes]
+    print(f"casa/empate/fora médios: {statistics.mean(o.home_win for o in outcomes):.3f} / "
+          f"{statistics.mean(o.draw for o in outcomes):.3f} / {statistics.mean(o.away_win for o in outcomes):.3f} "
+          f"(soma entre {min(totals):.6f} e {max(totals):.6f})")
+
+    async with ReadOnlySessionLocal() as db:
+        games = await crud_game.get_games_page(db, limit=args.games)
+    if games:
+        settings.PREDICTION_BACKEND = "local"
+        rounds = max(1, args.predictions // (10 * len(games)))
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for game in games:
+                await ai_prediction_service.generate_prediction_for_game(game)
+        elapsed = time.perf_counter() - start
+        print(f"{rounds * len(games)} previsões completas (generate_prediction_for_game): "
+              f"{elapsed * 1e6 / (rounds * len(games)):.1f} µs por previsão")
+        example = await ai_prediction_service.generate_prediction_for_game(games[0])
+        print(f"exemplo: {example.model_dump()}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Desempenho do modelo de previsão local.")
+    parser.add_argument("--predictions", type=int, default=100_000)
+    parser.add_argument("--games", type=int, default=100, help="Jogos da base de dados para as previsões completas.")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,161 @@
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Form, HTTPException
+
+from app.core import security
+
+# Mede o impacto do bcrypt no event loop: um servidor de teste (processo separado) recebe uma
+# rajada de logins enquanto é pedida, a ritmo constante, uma rota leve do tipo /games.
+# Compara a verificação síncrona (no event loop, como antes) com o pool de threads da API.
+#   python -m app.scripts.bench_login_storm --logins 100 --login-concurrency 20
+
+PASSWORD = "benchmark-password"
+
+
+def create_app(mode: str) -> FastAPI:
+    """Servidor de teste: login com bcrypt (síncrono ou no pool) e uma rota leve."""
+    hashed = security.get_password_hash(PASSWORD)
+    games = [
+        {"id": i, "home_team_id": i * 2, "away_team_id": i * 2 + 1, "status": "scheduled"}
+        for i in range(100)
+    ]
+    lags: list = []
+
+    async def monitor_loop():
+        # Atraso com que o event loop acorda de um sleep de 10ms
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - start - 0.01)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        monitor = asyncio.create_task(monitor_loop())
+        yield
+        monitor.cancel()
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.post("/login")
+    async def login(password: str = Form(...)):
+        if mode == "sync":
+            valid = security.verify_password(password, hashed)
+        else:
+            valid = await security.verify_password_async(password, hashed)
+        if not valid:
+            raise HTTPException(status_code=401)
+        return {"access_token": "x"}
+
+    @app.get("/games")
+    async def list_games():
+        return games
+
+    @app.post("/reset")
+    async def reset():
+        lags.clear()
+        return {}
+
+    @app.get("/stats")
+    async def stats():
+        return {"loop_lag_ms": [lag * 1000 for lag in lags]}
+
+    return app
+
+
+def _percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summary(values) -> str:
+    return (
+        f"p50={_percentile(values, 50):.1f} p95={_percentile(values, 95):.1f} "
+        f"p99={_percentile(values, 99):.1f} max={max(values):.1f}"
+    )
+
+
+async def _run_mode(mode: str, port: int, logins: int, login_concurrency: int, games_interval_ms: float):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.scripts.bench_login_storm", "--serve", mode, "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        limits = httpx.Limits(max_connections=login_concurrency + 10)
+        async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as http:
+            for _ in range(100):
+                try:
+                    await http.get("/games")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            await http.post("/reset")
+
+            storm_done = asyncio.Event()
+            semaphore = asyncio.Semaphore(login_concurrency)
+            login_times = []
+
+            async def login():
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await http.post("/login", data={"password": PASSWORD})
+                    response.raise_for_status()
+                    login_times.append((time.perf_counter() - start) * 1000)
+
+            async def storm():
+                await asyncio.gather(*(login() for _ in range(logins)))
+                storm_done.set()
+
+            game_times = []
+
+            async def games_traffic():
+                while not storm_done.is_set():
+                    start = time.perf_counter()
+                    (await http.get("/games")).raise_for_status()
+                    game_times.append((time.perf_counter() - start) * 1000)
+                    await asyncio.sleep(games_interval_ms / 1000)
+
+            start = time.perf_counter()
+            await asyncio.gather(storm(), games_traffic())
+            elapsed = time.perf_counter() - start
+            lags = (await http.get("/stats")).json()["loop_lag_ms"]
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"[{mode}] {logins} logins em {elapsed:.1f}s ({logins / elapsed:.1f}/s)")
+    print(f"  /games ({len(game_times)} pedidos) latência ms: {_summary(game_times)}")
+    print(f"  /login latência ms: {_summary(login_times)} (média {statistics.mean(login_times):.0f})")
+    if lags:
+        print(f"  atraso do event loop ms: {_summary(lags)}")
+
+
+async def main(modes, port: int, logins: int, login_concurrency: int, games_interval_ms: float):
+    for mode in modes:
+        await _run_mode(mode, port, logins, login_concurrency, games_interval_ms)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latência do event loop durante uma rajada de logins.")
+    parser.add_argument("--mode", choices=["sync", "pool", "both"], default="both")
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--login-concurrency", type=int, default=20)
+    parser.add_argument("--games-interval-ms", type=float, default=20.0)
+    parser.add_argument("--port", type=int, default=8086)
+    parser.add_argument("--serve", choices=["sync", "pool"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        uvicorn.run(create_app(args.serve), host="127.0.0.1", port=args.port, log_level="warning")
+    else:
+        modes = ["sync", "pool"] if args.mode == "both" else [args.mode]
+        asyncio.run(main(modes, args.port, args.logins, args.login_concurrency, args.games_interval_ms))
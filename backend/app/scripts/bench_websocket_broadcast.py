@@ -0,0 +1,255 @@
+import argparse
+import asyncio
+import base64
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+
+from app.websocket_manager import ConnectionManager, league_topic
+
+# Teste de carga do ConnectionManager: um servidor (processo separado, com a mesma classe
+# usada pela API) e milhares de clientes WebSocket locais subscritos no mesmo tópico.
+# Alguns clientes podem ser "lentos" (nunca leem), para verificar que não atrasam os
+# restantes e que acabam desligados. Mede a latência entre a publicação e a receção.
+#   python -m app.scripts.bench_websocket_broadcast --clients 2000 --slow 20 --messages 50
+# Para ver os clientes lentos a serem desligados é preciso volume suficiente para encher os
+# buffers TCP (vários MB por conexão):
+#   python -m app.scripts.bench_websocket_broadcast --clients 50 --slow 5 --messages 3000 --size 8192 --interval-ms 2
+
+TOPIC = league_topic(1)
+
+
+def create_app(queue_size: int, send_timeout: float, max_dropped: int) -> FastAPI:
+    """Servidor de teste: mesmo ConnectionManager da API, sem autenticação."""
+    app = FastAPI()
+    manager = ConnectionManager(queue_size=queue_size, send_timeout=send_timeout, max_dropped=max_dropped)
+
+    @app.websocket("/ws")
+    async def ws(websocket: WebSocket):
+        await websocket.accept()
+        await manager.connect(websocket, uuid.uuid4())
+        manager.subscribe(websocket, [TOPIC])
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            manager.disconnect(websocket)
+
+    @app.post("/publish")
+    async def publish(count: int, interval_ms: float = 10.0, size: int = 256):
+        durations = []
+        padding = "x" * size
+        for seq in range(count):
+            start = time.perf_counter()
+            await manager.publish([TOPIC], {"type": "bench", "seq": seq, "ts": time.time(), "pad": padding})
+            durations.append(time.perf_counter() - start)
+            await asyncio.sleep(interval_ms / 1000)
+        return {"publish_max_ms": max(durations) * 1000, "publish_avg_ms": statistics.mean(durations) * 1000}
+
+    @app.get("/stats")
+    async def stats():
+        return manager.snapshot()
+
+    return app
+
+
+def _percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _client(url: str, expected: int, latencies: list, on_connected):
+    from websockets.asyncio.client import connect
+
+    async with connect(url, max_size=None) as ws:
+        on_connected()
+        for _ in range(expected):
+            try:
+                raw = await asyncio.wait_for(ws.recv(), timeout=30)
+            except asyncio.TimeoutError:
+                break
+            message = json.loads(raw)
+            latencies.append((message["seq"], time.time() - message["ts"]))
+
+
+async def _worker(url: str, clients: int, messages: int):
+    """
+    Processo de clientes: liga `clients` conexões, escreve READY no stdout e, no fim,
+    as latências medidas em JSON. Usar vários processos evita que os próprios clientes
+    sejam o gargalo da medição.
+    """
+    latencies: list = []
+    all_connected = asyncio.Event()
+    connected = 0
+
+    def on_connected():
+        nonlocal connected
+        connected += 1
+        if connected == clients:
+            all_connected.set()
+
+    tasks = []
+    for _ in range(clients):
+        tasks.append(asyncio.create_task(_client(url, messages, latencies, on_connected)))
+        # Liga aos poucos para não encher a fila de accept do servidor
+        if len(tasks) % 100 == 0:
+            await asyncio.sleep(0.05)
+    try:
+        await asyncio.wait_for(all_connected.wait(), timeout=120)
+    except asyncio.TimeoutError:
+        print(f"Aviso: só {connected}/{clients} clientes ligados.", file=sys.stderr)
+    print("READY", flush=True)
+    await asyncio.gather(*tasks, return_exceptions=True)
+    print(json.dumps(latencies), flush=True)
+
+
+async def _slow_client(port: int, stop: asyncio.Event):
+    """
+    Cliente que faz o handshake e nunca mais lê: o buffer TCP (reduzido) enche e o servidor
+    tem de o desligar. Devolve True se o servidor fechou a conexão.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.setblocking(False)
+    loop = asyncio.get_running_loop()
+    await loop.sock_connect(sock, ("127.0.0.1", port))
+    key = base64.b64encode(os.urandom(16)).decode()
+    await loop.sock_sendall(sock, (
+        f"GET /ws HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+    ).encode())
+    response = b""
+    while b"\r\n\r\n" not in response:
+        response += await loop.sock_recv(sock, 1)
+    try:
+        await stop.wait()
+        # Depois de parar, esvazia o buffer: se o servidor nos desligou, a leitura chega ao fim (EOF)
+        deadline = loop.time() + 15
+        while loop.time() < deadline:
+            chunk = await asyncio.wait_for(loop.sock_recv(sock, 1 << 20), timeout=15)
+            if not chunk:
+                return True
+        return False
+    except (asyncio.TimeoutError, ConnectionError):
+        return False
+    finally:
+        sock.close()
+
+
+async def main(
+    clients: int, slow: int, messages: int, interval_ms: float, size: int, port: int,
+    client_procs: int, server_args: list,
+):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.scripts.bench_websocket_broadcast", "--serve", "--port", str(port), *server_args],
+        stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(timeout=600) as http:
+            for _ in range(100):
+                try:
+                    await http.get(f"{base_url}/stats")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+
+            stop = asyncio.Event()
+            start = time.perf_counter()
+            shares = [clients // client_procs + (1 if i < clients % client_procs else 0) for i in range(client_procs)]
+            workers = [
+                await asyncio.create_subprocess_exec(
+                    sys.executable, "-m", "app.scripts.bench_websocket_broadcast", "--worker",
+                    "--port", str(port), "--clients", str(share), "--messages", str(messages),
+                    stdout=asyncio.subprocess.PIPE,
+                )
+                for share in shares if share
+            ]
+            slow_tasks = [asyncio.create_task(_slow_client(port, stop)) for _ in range(slow)]
+            for worker in workers:
+                while (await worker.stdout.readline()).strip() != b"READY":
+                    pass
+            print(
+                f"{clients} clientes em {len(workers)} processos (+{slow} lentos) "
+                f"ligados em {time.perf_counter() - start:.1f}s"
+            )
+
+            publish = (await http.post(
+                f"{base_url}/publish", params={"count": messages, "interval_ms": interval_ms, "size": size}
+            )).json()
+            latencies = []
+            for worker in workers:
+                stdout, _ = await worker.communicate()
+                latencies.extend(json.loads(stdout.decode().strip().splitlines()[-1]))
+            stats = (await http.get(f"{base_url}/stats")).json()
+
+            stop.set()
+            slow_codes = await asyncio.gather(*slow_tasks, return_exceptions=True)
+    finally:
+        server.terminate()
+        server.wait()
+
+    values = [latency * 1000 for _, latency in latencies]
+    per_message = {}
+    for seq, latency in latencies:
+        per_message[seq] = max(per_message.get(seq, 0.0), latency * 1000)
+    print(f"Mensagens recebidas: {len(values)}/{clients * messages}")
+    if values:
+        print(
+            "Latência por entrega (ms): "
+            f"p50={_percentile(values, 50):.1f} p95={_percentile(values, 95):.1f} "
+            f"p99={_percentile(values, 99):.1f} max={max(values):.1f}"
+        )
+        fanout = list(per_message.values())
+        print(
+            "Fan-out completo por mensagem (ms): "
+            f"p50={_percentile(fanout, 50):.1f} p95={_percentile(fanout, 95):.1f} "
+            f"p99={_percentile(fanout, 99):.1f} max={max(fanout):.1f}"
+        )
+    print(f"Tempo de publish no servidor: média {publish['publish_avg_ms']:.3f}ms, máx. {publish['publish_max_ms']:.3f}ms")
+    print(f"Clientes lentos desligados pelo servidor: {sum(1 for closed in slow_codes if closed is True)}/{slow}")
+    print("Servidor:", stats)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga do broadcast por WebSocket.")
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--slow", type=int, default=20, help="Clientes que nunca leem as mensagens.")
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--interval-ms", type=float, default=200.0)
+    parser.add_argument("--size", type=int, default=256, help="Tamanho do payload de cada mensagem (bytes).")
+    parser.add_argument("--port", type=int, default=8084)
+    parser.add_argument("--client-procs", type=int, default=os.cpu_count() or 1,
+                        help="Processos pelos quais os clientes são distribuídos.")
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--send-timeout", type=float, default=2.0)
+    parser.add_argument("--max-dropped", type=int, default=32)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        app = create_app(args.queue_size, args.send_timeout, args.max_dropped)
+        uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+    elif args.worker:
+        asyncio.run(_worker(f"ws://127.0.0.1:{args.port}/ws", args.clients, args.messages))
+    else:
+        server_args = [
+            "--queue-size", str(args.queue_size),
+            "--send-timeout", str(args.send_timeout),
+            "--max-dropped", str(args.max_dropped),
+        ]
+        asyncio.run(main(
+            args.clients, args.slow, args.messages, args.interval_ms, args.size, args.port,
+            args.client_procs, server_args,
+        ))
@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+os.environ.setdefault("API_FOOTBALL_KEY", "check-key")
+
+import httpx
+
+from app.core.config import settings
+from app.services import football_api_service, http_client
+from app.services.rate_limiter import football_api_limiter
+
+# Verifica as repetições do football_api_service com um transporte falso do httpx (sem rede):
+# um 5xx que dura mais do que as repetições tem de dar None (e não uma exceção), tanto nos
+# pedidos normais como nos pedidos em streaming, em que o corpo chega aos bocados e a
+# resposta ainda está aberta quando o erro é tratado; um 5xx seguido de 200 tem de dar os dados.
+#   python -m app.scripts.check_api_retries --retries 1
+
+BODY = json.dumps({"errors": [], "response": [{"fixture": {"id": 1}}, {"fixture": {"id": 2}}]}).encode()
+
+
+async def _chunks(body: bytes):
+    # Corpo sem content-length, como uma resposta chunked do fornecedor
+    for start in range(0, len(body), 16):
+        yield body[start:start + 16]
+
+
+def _transport(failures: int) -> httpx.MockTransport:
+    """Responde 503 (em streaming) aos primeiros `failures` pedidos e depois 200."""
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls <= failures:
+            return httpx.Response(503, content=_chunks(b'{"message": "indisponivel"}'))
+        return httpx.Response(200, content=_chunks(BODY))
+
+    return httpx.MockTransport(handler)
+
+
+async def _use_transport(failures: int) -> None:
+    await http_client.close_http_client()
+    http_client._client = httpx.AsyncClient(transport=_transport(failures))
+
+
+async def _stream_ids(failures: int):
+    await _use_transport(failures)
+    stream = await football_api_service.stream_fixtures(league_id=71, season=2023)
+    if stream is None:
+        return None
+    async with stream:
+        return [item["fixture"]["id"] async for item in stream]
+
+
+async def _teams(failures: int):
+    await _use_transport(failures)
+    items = await football_api_service.get_teams(league_id=71, season=2023)
+    return None if items is None else len(items)
+
+
+async def main(retries: int) -> int:
+    settings.API_FOOTBALL_MAX_RETRIES = retries
+    settings.API_FOOTBALL_BACKOFF_BASE_SECONDS = 0.01
+    # Todos os pedidos têm de chegar ao transporte
+    settings.API_FOOTBALL_CACHE_ENABLED = False
+    football_api_limiter.set_rate(6000, capacity=100)
+
+    failures = 0
+
+    async def expect(label: str, call, expected):
+        nonlocal failures
+        try:
+            got = await call
+        except Exception as e:
+            got = f"{type(e).__name__}: {e}"
+        ok = got == expected
+        failures += 0 if ok else 1
+        print(f"{'OK   ' if ok else 'FALHA'} {label}: {got} (esperado: {expected})")
+
+    always = retries + 1
+    await expect("5xx em todas as tentativas (pedido normal)", _teams(always), None)
+    await expect("5xx em todas as tentativas (streaming)", _stream_ids(always), None)
+    await expect("5xx e depois 200 (pedido normal)", _teams(retries), 2)
+    await expect("5xx e depois 200 (streaming)", _stream_ids(retries), [1, 2])
+
+    await http_client.close_http_client()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifica as repetições de pedidos com 5xx, incluindo em streaming.")
+    parser.add_argument("--retries", type=int, default=1)
+    sys.exit(asyncio.run(main(parser.parse_args().retries)))
@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import sys
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.replica import ReplicaRouter
+from app.db.session import ReadOnlySessionLocal, engine, replica_engine
+
+# Teste de integração do encaminhamento para a réplica de leitura, com dois PostgreSQL locais
+# (primário do .env e uma réplica em streaming replication indicada em DB_REPLICA_HOST/PORT).
+# Verifica que as leituras vão para a réplica, que passam para o primário quando a réplica
+# se atrasa (replay do WAL em pausa) ou está em baixo, e que voltam depois.
+# Precisa de um utilizador com permissão para pg_wal_replay_pause() na réplica.
+#   DB_REPLICA_HOST=127.0.0.1 DB_REPLICA_PORT=5433 python -m app.scripts.check_db_replica
+
+
+async def _served_by(router: ReplicaRouter) -> str:
+    async with router.session() as session:
+        in_recovery = (await session.execute(text("SELECT pg_is_in_recovery()"))).scalar()
+    return "réplica" if in_recovery else "primário"
+
+
+async def _write_on_primary() -> None:
+    # Uma transação com escrita no WAL, sem tocar em nenhuma tabela
+    async with engine.begin() as conn:
+        await conn.execute(text("SELECT pg_logical_emit_message(true, 'check_db_replica', 'x')"))
+
+
+async def main(max_lag: float) -> int:
+    if replica_engine is None:
+        print("DB_REPLICA_HOST não está definido.")
+        return 1
+
+    failures = 0
+
+    def expect(label: str, got: str, expected: str):
+        nonlocal failures
+        ok = got == expected
+        failures += 0 if ok else 1
+        print(f"{'OK   ' if ok else 'FALHA'} {label}: {got} (esperado: {expected})")
+
+    router = ReplicaRouter(replica_engine, ReadOnlySessionLocal, max_lag=max_lag, check_interval=0.5)
+    await router.start()
+    try:
+        expect("réplica em dia", await _served_by(router), "réplica")
+
+        async with replica_engine.connect() as conn:
+            await conn.execute(text("SELECT pg_wal_replay_pause()"))
+        try:
+            await _write_on_primary()
+            await asyncio.sleep(max_lag + 1.5)
+            await _write_on_primary()
+            await router.check_once()
+            print(f"      atraso medido com o replay em pausa: {router.lag:.1f}s")
+            expect("réplica atrasada", await _served_by(router), "primário")
+        finally:
+            async with replica_engine.connect() as conn:
+                await conn.execute(text("SELECT pg_wal_replay_resume()"))
+
+        await asyncio.sleep(1)
+        await router.check_once()
+        expect("réplica recuperada", await _served_by(router), "réplica")
+    finally:
+        await router.stop()
+
+    # Réplica em baixo: uma porta sem servidor
+    dead_url = engine.url.set(port=1).render_as_string(hide_password=False)
+    dead_engine = create_async_engine(dead_url).execution_options(isolation_level="AUTOCOMMIT")
+    dead = ReplicaRouter(dead_engine, ReadOnlySessionLocal, max_lag=max_lag, check_interval=0.5)
+    await dead.start()
+    expect("réplica em baixo", await _served_by(dead), "primário")
+    await dead.stop()
+
+    # Réplica cai depois de ter sido considerada disponível: a sessão muda para o primário ao abrir
+    failing = ReplicaRouter(dead_engine, ReadOnlySessionLocal, max_lag=max_lag, check_interval=60)
+    failing.lag, failing.last_check_at = 0.0, time.monotonic()
+    expect("falha ao abrir a sessão", await _served_by(failing), "primário")
+    print(f"      mudanças para o primário ao abrir a sessão: {failing.failovers}")
+
+    await engine.dispose()
+    print("OK" if failures == 0 else f"{failures} falhas")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste do encaminhamento para a réplica de leitura.")
+    parser.add_argument("--max-lag", type=float, default=1.0)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.max_lag)))
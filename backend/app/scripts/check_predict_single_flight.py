@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.crud import crud_game
+from app.db.session import AsyncSessionLocal, engine
+from app.models import Game, Team
+from app.schemas.prediction import PredictionCreate
+from app.services import ai_prediction_service, prediction_service
+from app.services.single_flight import SingleFlight
+
+# Verifica que pedidos simultâneos de previsão para o mesmo jogo fazem uma única chamada ao
+# modelo: dentro de um processo (SingleFlight) e entre processos (advisory lock), simulando
+# cada processo com o seu SingleFlight. O modelo é substituído por uma função lenta que conta
+# as chamadas; os jogos de teste são criados e apagados na base de dados do .env.
+#   python -m app.scripts.check_predict_single_flight --callers 50
+
+CHECK_GAME_ID = 990900
+calls = 0
+
+
+async def _fake_generate(game: Game) -> PredictionCreate:
+    global calls
+    calls += 1
+    await asyncio.sleep(0.5)
+    return PredictionCreate(game_id=game.id, predicted_winner=game.home_team.name, model_version="check")
+
+
+async def _new_game(game_id: int) -> Game:
+    async with AsyncSessionLocal() as db:
+        team_ids = (await db.execute(select(Team.id).limit(2))).scalars().all()
+        db.add(Game(
+            id=game_id, home_team_id=team_ids[0], away_team_id=team_ids[1],
+            game_time=datetime.now(timezone.utc) + timedelta(days=3),
+        ))
+        await db.commit()
+        return await crud_game.get_game_by_id(db, game_id=game_id)
+
+
+async def _scenario(label: str, game_id: int, processes: int, callers: int, advisory_lock: bool, expected: int) -> bool:
+    global calls
+    calls = 0
+    settings.PREDICTION_ADVISORY_LOCK = advisory_lock
+    game = await _new_game(game_id)
+    flights = [SingleFlight() for _ in range(processes)]
+
+    async def call(flight: SingleFlight):
+        return await flight.do(game.id, lambda: prediction_service._generate_once(game))
+
+    start = time.perf_counter()
+    predictions = await asyncio.gather(*(call(flights[i % processes]) for i in range(callers)))
+    elapsed = time.perf_counter() - start
+    ids = {prediction.id for prediction in predictions}
+    ok = calls == expected and len(ids) == 1
+    print(f"{'OK   ' if ok else 'FALHA'} {label}: {callers} pedidos, {calls} chamadas ao modelo "
+          f"(esperado: {expected}), {len(ids)} previsão, {elapsed:.2f}s")
+    return ok
+
+
+async def main(callers: int) -> int:
+    ai_prediction_service.generate_prediction_for_game = _fake_generate
+    game_ids = [CHECK_GAME_ID + i for i in range(3)]
+    try:
+        results = [
+            await _scenario("um processo", game_ids[0], 1, callers, True, 1),
+            await _scenario("3 processos, com advisory lock", game_ids[1], 3, callers, True, 1),
+            await _scenario("3 processos, sem advisory lock", game_ids[2], 3, callers, False, 3),
+        ]
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Game).where(Game.id.in_(game_ids)))
+            await db.commit()
+        await engine.dispose()
+    print("OK" if all(results) else "FALHA")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifica a geração única de previsões por jogo.")
+    parser.add_argument("--callers", type=int, default=50)
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(main(args.callers)))
@@ -0,0 +1,54 @@
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("API_FOOTBALL_KEY", "bench-key")
+
+from app.core.config import settings
+from app.services import football_api_service
+from app.services.http_client import close_http_client
+from app.services.rate_limiter import football_api_limiter
+from app.scripts.fake_football_api import run_fake_api
+
+# Dispara uma rajada de chamadas ao football_api_service contra o fornecedor falso,
+# que aplica uma quota real (janela encurtada para o teste ser rápido).
+# Com o token bucket configurado para a quota do fornecedor não deve haver pedidos falhados,
+# e os 429 devem ser raros (apenas quando a janela do servidor e do cliente não coincidem).
+#   python -m app.scripts.check_rate_limiter --calls 60 --limit 20 --window 6
+
+
+async def main(calls: int, limit: int, window: float, burst: int, port: int):
+    # Quota equivalente por minuto para o cliente
+    client_rate = int(limit * 60 / window)
+    football_api_limiter.set_rate(client_rate, capacity=burst)
+    settings.API_FOOTBALL_BACKOFF_BASE_SECONDS = 0.2
+    # Queremos que todas as chamadas cheguem ao servidor
+    settings.API_FOOTBALL_CACHE_ENABLED = False
+
+    async with run_fake_api(port=port, requests_per_minute=limit, window_seconds=window) as (base_url, app):
+        settings.API_FOOTBALL_BASE_URL = base_url
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            football_api_service.get_teams(league_id=71, season=2023) for _ in range(calls)
+        ))
+        elapsed = time.perf_counter() - start
+        await close_http_client()
+
+        failed = sum(1 for r in results if r is None)
+        stats = app.state.stats
+        print(f"{calls} chamadas em {elapsed:.1f}s (quota do servidor: {limit} por {window:g}s)")
+        print(f"Falhadas: {failed} | Servidas: {stats['served']} | Rejeitadas (429): {stats['rejected']}")
+        print("Orçamento do cliente:", football_api_limiter.snapshot())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifica o token bucket contra um fornecedor com quota.")
+    parser.add_argument("--calls", type=int, default=60)
+    parser.add_argument("--limit", type=int, default=20, help="Pedidos permitidos por janela no servidor.")
+    parser.add_argument("--window", type=float, default=6.0, help="Duração da janela do servidor em segundos.")
+    parser.add_argument("--burst", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8082)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.limit, args.window, args.burst, args.port))
@@ -0,0 +1,152 @@
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+import httpx
+import uvicorn
+from fastapi import Body, FastAPI, Query, WebSocket, WebSocketDisconnect
+
+from app.core.config import settings
+from app.services.backplane import PostgresBackplane, asyncpg_dsn
+from app.websocket_manager import ConnectionManager
+
+# Teste de integração do backplane PostgreSQL: arranca vários processos da API (cada um com o
+# seu ConnectionManager, como os workers do uvicorn) ligados à base de dados do .env, liga
+# clientes WebSocket a todos e verifica que uma mensagem publicada num processo chega aos
+# clientes de todos os outros.
+#   python -m app.scripts.check_ws_backplane --workers 3 --clients-per-worker 2
+
+
+def create_app() -> FastAPI:
+    """Processo de teste: ConnectionManager com backplane PostgreSQL, sem autenticação."""
+    backplane = PostgresBackplane(asyncpg_dsn(), settings.WS_BACKPLANE_CHANNEL)
+    manager = ConnectionManager(backplane=backplane)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await backplane.start()
+        yield
+        await backplane.stop()
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.websocket("/ws")
+    async def ws(websocket: WebSocket, topic: str = Query(None)):
+        await websocket.accept()
+        await manager.connect(websocket, uuid.uuid4())
+        if topic:
+            manager.subscribe(websocket, [topic])
+        await manager.send_personal(websocket, {"type": "ready"})
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            manager.disconnect(websocket)
+
+    @app.post("/publish")
+    async def publish(payload: dict = Body(...), topic: str = Query(None)):
+        if topic:
+            await manager.publish([topic], payload)
+        else:
+            await manager.broadcast_json(payload)
+        return {"ok": True}
+
+    @app.get("/stats")
+    async def stats():
+        return {"websockets": manager.snapshot(), "backplane": backplane.snapshot()}
+
+    return app
+
+
+async def _receive(ws, timeout: float):
+    try:
+        return json.loads(await asyncio.wait_for(ws.recv(), timeout=timeout))
+    except asyncio.TimeoutError:
+        return None
+
+
+async def main(workers: int, clients_per_worker: int, port: int):
+    from websockets.asyncio.client import connect
+
+    ports = [port + i for i in range(workers)]
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "app.scripts.check_ws_backplane", "--serve", "--port", str(p)],
+            stdout=subprocess.DEVNULL,
+        )
+        for p in ports
+    ]
+    failures = 0
+    try:
+        async with httpx.AsyncClient(timeout=10) as http:
+            for p in ports:
+                for _ in range(100):
+                    try:
+                        await http.get(f"http://127.0.0.1:{p}/stats")
+                        break
+                    except httpx.TransportError:
+                        await asyncio.sleep(0.1)
+
+            # Metade dos clientes de cada processo subscreve league:1
+            clients = []
+            for p in ports:
+                for i in range(clients_per_worker):
+                    topic = "league:1" if i % 2 == 0 else None
+                    url = f"ws://127.0.0.1:{p}/ws" + (f"?topic={topic}" if topic else "")
+                    ws = await connect(url)
+                    assert (await _receive(ws, 5))["type"] == "ready"
+                    clients.append((p, topic, ws))
+
+            checks = [
+                ("broadcast", None, lambda topic: True),
+                ("tópico league:1", "league:1", lambda topic: topic == "league:1"),
+            ]
+            for label, topic, should_receive in checks:
+                sent_at = time.perf_counter()
+                await http.post(
+                    f"http://127.0.0.1:{ports[0]}/publish",
+                    params={"topic": topic} if topic else None,
+                    json={"type": "check", "label": label},
+                )
+                results = await asyncio.gather(*(_receive(ws, 2) for _, _, ws in clients))
+                elapsed_ms = (time.perf_counter() - sent_at) * 1000
+                for (p, client_topic, _), message in zip(clients, results):
+                    expected = should_receive(client_topic)
+                    got = message is not None and message.get("label") == label
+                    if got != expected:
+                        failures += 1
+                        print(f"FALHA [{label}] cliente no processo :{p} ({client_topic}): "
+                              f"{'recebeu' if got else 'não recebeu'} a mensagem")
+                delivered = sum(1 for m in results if m is not None)
+                print(f"{label}: {delivered}/{len(clients)} clientes receberam (esperado "
+                      f"{sum(1 for _, t, _ in clients if should_receive(t))}) em <= {elapsed_ms:.0f}ms")
+
+            for _, _, ws in clients:
+                await ws.close()
+            for p in ports:
+                print(f"Processo :{p}:", (await http.get(f"http://127.0.0.1:{p}/stats")).json()["backplane"])
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    print("OK" if failures == 0 else f"{failures} falhas")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste do backplane PostgreSQL com vários processos.")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--clients-per-worker", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8085)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        uvicorn.run(create_app(), host="127.0.0.1", port=args.port, log_level="warning")
+    else:
+        asyncio.run(main(args.workers, args.clients_per_worker, args.port))
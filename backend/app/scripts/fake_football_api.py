@@ -0,0 +1,153 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import uvicorn
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse, Response
+from typing import Optional
+
+# Servidor local que imita os endpoints da API-Futebol que usamos.
+# Serve para benchmarks e testes manuais sem gastar a quota do fornecedor real.
+#   python -m app.scripts.fake_football_api --port 8081
+
+
+def _fixture(fixture_id: int, league_id: int, season: int) -> dict:
+    kickoff = datetime(season, 1, 1, 20, 0, tzinfo=timezone.utc) + timedelta(days=fixture_id % 300)
+    return {
+        "fixture": {
+            "id": fixture_id,
+            "date": kickoff.isoformat(),
+            "timestamp": int(kickoff.timestamp()),
+            "status": {"long": "Match Finished", "short": "FT", "elapsed": 90},
+        },
+        "league": {"id": league_id, "season": season},
+        "teams": {
+            "home": {"id": 1000 + (fixture_id % 20), "name": f"Equipa {fixture_id % 20}"},
+            "away": {"id": 1000 + ((fixture_id + 7) % 20), "name": f"Equipa {(fixture_id + 7) % 20}"},
+        },
+        "goals": {"home": fixture_id % 4, "away": fixture_id % 3},
+    }
+
+
+def create_app(
+    fixtures_per_season: int = 380,
+    requests_per_minute: Optional[int] = None,
+    daily_limit: int = 100_000,
+    window_seconds: float = 60.0,
+) -> FastAPI:
+    """
+    Cria a aplicação do fornecedor falso.
+
+    Com `requests_per_minute`, o servidor aplica a quota numa janela deslizante
+    (`window_seconds`, 60s como o fornecedor real; pode ser encurtada em testes): devolve os
+    cabeçalhos de quota em todas as respostas e 429 (com Retry-After) quando a quota é excedida.
+    """
+    app = FastAPI(title="Fake API-Futebol")
+    app.state.stats = {"served": 0, "rejected": 0}
+    window: deque[float] = deque()
+    daily_used = 0
+
+    @app.middleware("http")
+    async def enforce_rate_limit(request: Request, call_next):
+        nonlocal daily_used
+        if requests_per_minute is None:
+            app.state.stats["served"] += 1
+            return await call_next(request)
+
+        now = time.monotonic()
+        while window and now - window[0] >= window_seconds:
+            window.popleft()
+
+        if len(window) >= requests_per_minute or daily_used >= daily_limit:
+            app.state.stats["rejected"] += 1
+            retry_after = max(1, int(window_seconds - (now - window[0]))) if window else int(window_seconds)
+            response = JSONResponse(
+                {"errors": {"rateLimit": "Too many requests."}, "response": []},
+                status_code=429,
+                headers={"Retry-After": str(retry_after)},
+            )
+        else:
+            window.append(now)
+            daily_used += 1
+            app.state.stats["served"] += 1
+            response = await call_next(request)
+
+        response.headers["X-RateLimit-Limit"] = str(requests_per_minute)
+        response.headers["X-RateLimit-Remaining"] = str(max(0, requests_per_minute - len(window)))
+        response.headers["x-ratelimit-requests-limit"] = str(daily_limit)
+        response.headers["x-ratelimit-requests-remaining"] = str(max(0, daily_limit - daily_used))
+        return response
+
+    def envelope(response: list) -> dict:
+        return {"errors": [], "results": len(response), "response": response}
+
+    @app.get("/status")
+    async def status():
+        return {"response": {"account": {"firstname": "Bench"}, "requests": {"current": 0, "limit_day": 100}}}
+
+    leagues_body = json.dumps(envelope([
+        {
+            "league": {"id": league_id, "name": f"Liga {league_id}", "type": "League", "logo": None},
+            "country": {"name": "Brasil"},
+        }
+        for league_id in range(1, 1001)
+    ])).encode("utf-8")
+    leagues_etag = f'"{hashlib.sha256(leagues_body).hexdigest()[:16]}"'
+
+    @app.get("/leagues")
+    async def leagues(request: Request):
+        # O catálogo de ligas suporta revalidação com ETag (304 sem corpo)
+        if request.headers.get("if-none-match") == leagues_etag:
+            return Response(status_code=304, headers={"ETag": leagues_etag})
+        return Response(leagues_body, media_type="application/json", headers={"ETag": leagues_etag})
+
+    @app.get("/teams")
+    async def teams(league: int = Query(...), season: int = Query(...)):
+        return envelope([
+            {"team": {"id": 1000 + i, "name": f"Equipa {i}", "logo": None}}
+            for i in range(20)
+        ])
+
+    @app.get("/fixtures")
+    async def fixtures(league: int = Query(...), season: int = Query(...)):
+        first_id = league * 100_000
+        return envelope([
+            _fixture(first_id + i, league, season)
+            for i in range(fixtures_per_season)
+        ])
+
+    return app
+
+
+@asynccontextmanager
+async def run_fake_api(host: str = "127.0.0.1", port: int = 8081, **app_kwargs):
+    """Arranca o servidor falso numa tarefa de fundo enquanto o contexto estiver ativo."""
+    app = create_app(**app_kwargs)
+    config = uvicorn.Config(app, host=host, port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    try:
+        yield f"http://{host}:{port}", app
+    finally:
+        server.should_exit = True
+        await task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local que imita a API-Futebol.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--fixtures-per-season", type=int, default=380)
+    parser.add_argument("--requests-per-minute", type=int, default=None,
+                        help="Quota por minuto a aplicar (por omissão sem limite).")
+    args = parser.parse_args()
+    app = create_app(fixtures_per_season=args.fixtures_per_season, requests_per_minute=args.requests_per_minute)
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,33 @@
+import argparse
+import asyncio
+
+from app.services.backplane import backplane
+from app.services.http_client import close_http_client
+from app.services.job_queue import job_worker
+
+# Worker da fila de tarefas de fundo (tabela jobs): executa a pré-análise de IA e as
+# restantes tarefas postas na fila pela API. Podem correr vários workers em simultâneo.
+#   python -m app.scripts.run_worker
+#   python -m app.scripts.run_worker --once   # executa as tarefas prontas e termina
+
+async def main(once: bool):
+    # Com WS_BACKPLANE=postgres o worker é acordado assim que uma tarefa entra na fila
+    await backplane.start()
+    try:
+        if once:
+            while await job_worker.run_once():
+                pass
+        else:
+            await job_worker.run()
+    finally:
+        await backplane.stop()
+        await close_http_client()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker da fila de tarefas de fundo.")
+    parser.add_argument("--once", action="store_true", help="Executa as tarefas prontas e termina.")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.once))
+    except KeyboardInterrupt:
+        print("Worker terminado.")
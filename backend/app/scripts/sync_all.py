@@ -0,0 +1,34 @@
+import argparse
+import asyncio
+
+from app.services.backplane import backplane
+from app.services.http_client import close_http_client
+from app.services.rate_limiter import football_api_limiter
+from app.services.sync_orchestrator import run_full_sync
+
+# Sincroniza equipas e jogos de todas as ligas com is_sync_enabled = true.
+#   python -m app.scripts.sync_all --season 2023 --season 2024 --concurrency 4
+
+async def main(seasons, concurrency, requests_per_minute):
+    try:
+        report = await run_full_sync(
+            seasons=seasons,
+            max_concurrency=concurrency,
+            requests_per_minute=requests_per_minute,
+        )
+        report.print_summary()
+        print("Orçamento da API-Futebol:", football_api_limiter.snapshot())
+    finally:
+        await close_http_client()
+        await backplane.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sincroniza todas as ligas ativas em paralelo.")
+    parser.add_argument("--season", type=int, action="append", dest="seasons",
+                        help="Temporada a sincronizar (pode repetir). Por omissão usa SYNC_SEASONS.")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Número máximo de ligas a sincronizar em simultâneo.")
+    parser.add_argument("--requests-per-minute", type=int, default=None,
+                        help="Quota de pedidos por minuto do fornecedor.")
+    args = parser.parse_args()
+    asyncio.run(main(args.seasons, args.concurrency, args.requests_per_minute))
@@ -1,16 +1,28 @@
+import argparse
 import asyncio
-from datetime import datetime
+import httpx
+from datetime import datetime, date, timedelta, timezone
+from typing import Any, Dict, List, Optional
 
+from app.core.config import settings
+from app.crud import crud_game, crud_league, crud_team
 from app.db.session import AsyncSessionLocal
+from app.db.upsert import UpsertResult, bulk_upsert
 from app.services import football_api_service
+from app.services.backplane import backplane
+from app.services.game_list_cache import game_list_cache
+from app.services.http_client import close_http_client
 from app.models import Game, GameStatus
-from sqlalchemy.dialects.postgresql import insert
 
 # --- CONFIGURAÇÃO ---
-# Usaremos a mesma liga e temporada que usámos para as equipas
-TARGET_LEAGUE_ID = 71 
+# Valores por omissão quando o script é executado diretamente (a mesma liga e temporada das equipas).
+# Para sincronizar todas as ligas ativas use app/scripts/sync_all.py
+TARGET_LEAGUE_ID = 71
 TARGET_SEASON = 2023
 
+# Número de jogos por instrução de upsert quando a resposta é lida em streaming
+UPSERT_BATCH_SIZE = 1000
+
 # Mapeamento do status da API para o nosso Enum de status
 STATUS_MAP = {
     "TBD": GameStatus.SCHEDULED,
@@ -33,64 +45,217 @@ STATUS_MAP = {
     "WO": GameStatus.FINISHED,
 }
 
-async def sync_games_data():
-    print(f"A iniciar a sincronização de jogos para a Liga ID: {TARGET_LEAGUE_ID}, Temporada: {TARGET_SEASON}")
-    db = AsyncSessionLocal()
+# Campos que a sincronização atualiza num jogo já existente
+SYNCED_FIELDS = ("league_id", "game_time", "status", "home_score", "away_score")
+
+def normalize_fixture(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Converte um item de /fixtures da API numa linha da tabela games (ou None se faltarem dados)."""
+    fixture_data = item.get("fixture", {})
+    teams_data = item.get("teams", {})
+    goals_data = item.get("goals", {})
+
+    # Garante que temos todos os dados essenciais antes de prosseguir
+    if not (fixture_data.get("id") and teams_data.get("home", {}).get("id") and teams_data.get("away", {}).get("id")):
+        return None
+
+    game_status_short = fixture_data.get("status", {}).get("short", "TBD")
+    return {
+        "id": fixture_data.get("id"),
+        "home_team_id": teams_data.get("home").get("id"),
+        "away_team_id": teams_data.get("away").get("id"),
+        "league_id": (item.get("league") or {}).get("id"),
+        "game_time": datetime.fromisoformat(fixture_data.get("date")),
+        "status": STATUS_MAP.get(game_status_short, GameStatus.SCHEDULED),
+        "home_score": goals_data.get("home"),
+        "away_score": goals_data.get("away"),
+        "api_provider": "api-football",
+        "api_game_id": str(fixture_data.get("id"))
+    }
 
-    fixtures_from_api = await football_api_service.get_fixtures(league_id=TARGET_LEAGUE_ID, season=TARGET_SEASON)
+async def sync_games_data(league_id: int = TARGET_LEAGUE_ID, season: int = TARGET_SEASON) -> Optional[int]:
+    """
+    Sincroniza os jogos de uma liga/temporada.
+    Devolve o número de jogos gravados (inseridos ou alterados), ou None se a API falhar.
+    """
+    print(f"A iniciar a sincronização de jogos para a Liga ID: {league_id}, Temporada: {season}")
 
-    if not fixtures_from_api:
+    fixtures_from_api = await football_api_service.stream_fixtures(league_id=league_id, season=season, only_changed=True)
+
+    if fixtures_from_api is football_api_service.UNCHANGED:
+        print("Os jogos não mudaram desde a última sincronização. Nada a fazer.")
+        return 0
+
+    if fixtures_from_api is None:
         print("Não foi possível obter jogos da API. A terminar.")
-        await db.close()
-        return
-
-    games_to_db = []
-    for item in fixtures_from_api:
-        fixture_data = item.get("fixture", {})
-        teams_data = item.get("teams", {})
-        goals_data = item.get("goals", {})
-
-        # Garante que temos todos os dados essenciais antes de prosseguir
-        if fixture_data.get("id") and teams_data.get("home", {}).get("id") and teams_data.get("away", {}).get("id"):
-            game_status_short = fixture_data.get("status", {}).get("short", "TBD")
-
-            games_to_db.append({
-                "id": fixture_data.get("id"),
-                "home_team_id": teams_data.get("home").get("id"),
-                "away_team_id": teams_data.get("away").get("id"),
-                "game_time": datetime.fromisoformat(fixture_data.get("date")),
-                "status": STATUS_MAP.get(game_status_short, GameStatus.SCHEDULED),
-                "home_score": goals_data.get("home"),
-                "away_score": goals_data.get("away"),
-                "api_provider": "api-football",
-                "api_game_id": str(fixture_data.get("id"))
-            })
-
-    if not games_to_db:
-        print("Nenhum jogo formatado a partir da resposta da API.")
-        await db.close()
-        return
-
-    print(f"Encontrados {len(games_to_db)} jogos na API. A inserir/atualizar na base de dados...")
+        return None
 
-    try:
-        stmt = insert(Game).values(games_to_db)
-        update_dict = {
-            'game_time': stmt.excluded.game_time,
-            'status': stmt.excluded.status,
-            'home_score': stmt.excluded.home_score,
-            'away_score': stmt.excluded.away_score,
-        }
-        stmt = stmt.on_conflict_do_update(
-            index_elements=['id'],
-            set_=update_dict
-        )
+    # Os jogos são lidos da resposta um a um e gravados em lotes, por isso nem o documento
+    # da API nem a lista completa de jogos chegam a estar em memória.
+    result = UpsertResult()
+    received = 0
+    # `async with` fecha a ligação (ou o ficheiro da cache) se a leitura parar a meio
+    async with AsyncSessionLocal() as db, fixtures_from_api:
+        try:
+            batch: List[Dict[str, Any]] = []
+            async for item in fixtures_from_api:
+                game = normalize_fixture(item)
+                if not game:
+                    continue
+                batch.append(game)
+                received += 1
+                if len(batch) >= UPSERT_BATCH_SIZE:
+                    result += await _upsert_games(db, batch)
+                    batch = []
+            if batch:
+                result += await _upsert_games(db, batch)
+        except (httpx.HTTPError, ValueError) as e:
+            await db.rollback()
+            print(f"Erro ao ler os jogos da API: {e}. Nenhuma alteração gravada.")
+            return None
+
+        if not received:
+            print("Nenhum jogo formatado a partir da resposta da API.")
+            return 0
 
-        await db.execute(stmt)
         await db.commit()
-        print("Sincronização de jogos concluída.")
+
+    if result.written:
+        await game_list_cache.invalidate()
+    await football_api_service.mark_synced("/fixtures", fixtures_from_api.content_hash, league=league_id, season=season)
+    print(f"Sincronização de jogos concluída ({received} jogos na API): {result}.")
+    return result.written
+
+async def _upsert_games(db, games_to_db: List[Dict[str, Any]]) -> UpsertResult:
+    """Insere os jogos novos e atualiza os existentes cujos campos sincronizados mudaram."""
+    return await bulk_upsert(db, Game, games_to_db, update_columns=SYNCED_FIELDS, touch_column="updated_at")
+
+async def sync_games_incremental(season: Optional[int] = None) -> Optional[int]:
+    """
+    Sincronização incremental para correr com frequência (ex: a cada minuto em dias de jogo).
+
+    Em vez da temporada inteira, pede à API apenas:
+      - os jogos das ligas ativas numa janela de datas curta (desde o jogo mais antigo que já
+        devia ter começado e ainda não terminou, até hoje + SYNC_INCREMENTAL_LOOKAHEAD_DAYS);
+      - os jogos a decorrer (`live`).
+    As janelas cujo conteúdo não mudou desde a última execução são ignoradas sem parsing, e
+    os jogos recebidos são comparados com os guardados: só as linhas alteradas são gravadas.
+    Uma janela com jogos novos ignorados (equipas ainda não sincronizadas) não é marcada como
+    sincronizada, para que esses jogos voltem a ser lidos na execução seguinte.
+
+    Cada liga é pedida na sua temporada em curso (League.current_season, gravada pelo
+    sync_leagues); sem ela, usa `season` ou, por omissão, a mais recente de SYNC_SEASONS.
+    Devolve o número de jogos gravados, ou None se a API falhar.
+    """
+    default_season = season or max(settings.SYNC_SEASONS)
+    started_at = datetime.now(timezone.utc)
+    today = started_at.date()
+
+    async with AsyncSessionLocal() as db:
+        leagues = await crud_league.get_sync_enabled_leagues(db)
+        league_ids = [league.id for league in leagues]
+        season_of = {league.id: league.current_season or default_season for league in leagues}
+        oldest_unfinished = await crud_game.get_oldest_unfinished_game_time(
+            db,
+            before=started_at,
+            not_before=started_at - timedelta(days=settings.SYNC_INCREMENTAL_MAX_LOOKBACK_DAYS),
+        )
+
+    if not league_ids:
+        print("Nenhuma liga com sincronização ativa (is_sync_enabled). Nada a fazer.")
+        return 0
+
+    date_from: date = oldest_unfinished.date() if oldest_unfinished else today
+    date_to: date = today + timedelta(days=settings.SYNC_INCREMENTAL_LOOKAHEAD_DAYS)
+    print(f"Sincronização incremental: {len(league_ids)} ligas, de {date_from} a {date_to} + jogos ao vivo")
+
+    window_results = await asyncio.gather(*(
+        football_api_service.get_fixtures_by_date_range(
+            league_id=league_id, season=season_of[league_id], date_from=date_from, date_to=date_to, only_changed=True
+        )
+        for league_id in league_ids
+    ))
+    live_fixtures = await football_api_service.get_live_fixtures(league_ids=league_ids)
+
+    fixtures: Dict[int, Dict[str, Any]] = {}
+    # Liga -> hash do conteúdo da janela lida (para o mark_synced)
+    changed_windows: Dict[int, str] = {}
+    failed = live_fixtures is None
+    for league_id, result in zip(league_ids, window_results):
+        if result is None:
+            failed = True
+        elif result is not football_api_service.UNCHANGED:
+            changed_windows[league_id] = result.content_hash
+            for game in filter(None, map(normalize_fixture, result)):
+                fixtures[game["id"]] = game
+    # Os dados ao vivo são os mais recentes, por isso têm prioridade
+    for game in filter(None, map(normalize_fixture, live_fixtures or [])):
+        fixtures[game["id"]] = game
+
+    if failed and not fixtures:
+        print("Não foi possível obter jogos da API. A terminar.")
+        return None
+
+    async with AsyncSessionLocal() as db:
+        stored = await crud_game.get_games_sync_state(db, game_ids=fixtures.keys())
+
+        changed, new = [], []
+        for game_id, game in fixtures.items():
+            current = stored.get(game_id)
+            if current is None:
+                new.append(game)
+            elif current["updated_at"] and current["updated_at"] > started_at:
+                # Outro processo (ex: o poller ao vivo) gravou dados mais recentes durante esta execução
+                continue
+            elif any(current[field] != game[field] for field in SYNCED_FIELDS):
+                changed.append(game)
+
+        skipped_leagues, skipped_count = set(), 0
+        if new:
+            team_ids = {game["home_team_id"] for game in new} | {game["away_team_id"] for game in new}
+            known_teams = await crud_team.get_existing_team_ids(db, team_ids=team_ids)
+            skipped = [g for g in new if g["home_team_id"] not in known_teams or g["away_team_id"] not in known_teams]
+            if skipped:
+                print(f"{len(skipped)} jogos novos ignorados por terem equipas ainda não sincronizadas.")
+                skipped_leagues, skipped_count = {g["league_id"] for g in skipped}, len(skipped)
+            new = [g for g in new if g not in skipped]
+
+        games_to_db = changed + new
+        print(
+            f"{len(fixtures)} jogos recebidos: {len(changed)} alterados, {len(new)} novos, "
+            f"{skipped_count} ignorados, {len(fixtures) - len(games_to_db) - skipped_count} sem alterações."
+        )
+        written = 0
+        if games_to_db:
+            result = await _upsert_games(db, games_to_db)
+            await db.commit()
+            written = result.written
+
+    if written:
+        await game_list_cache.invalidate()
+    for league_id, window_hash in changed_windows.items():
+        if league_id in skipped_leagues:
+            continue
+        await football_api_service.mark_synced(
+            "/fixtures", window_hash, league=league_id, season=season_of[league_id],
+            **{"from": date_from.isoformat(), "to": date_to.isoformat()},
+        )
+    return written
+
+async def main(league_id: int, season: int, incremental: bool = False):
+    try:
+        if incremental:
+            await sync_games_incremental()
+        else:
+            await sync_games_data(league_id=league_id, season=season)
     finally:
-        await db.close()
+        await close_http_client()
+        await backplane.stop()
 
 if __name__ == "__main__":
-    asyncio.run(sync_games_data())
+    parser = argparse.ArgumentParser(description="Sincroniza os jogos de uma liga/temporada.")
+    parser.add_argument("--league", type=int, default=TARGET_LEAGUE_ID)
+    parser.add_argument("--season", type=int, default=TARGET_SEASON)
+    parser.add_argument("--incremental", action="store_true",
+                        help="Sincroniza só a janela de datas atual e os jogos ao vivo de todas as ligas ativas.")
+    args = parser.parse_args()
+    asyncio.run(main(args.league, args.season, args.incremental))
@@ -1,20 +1,22 @@
 import asyncio
 from app.db.session import AsyncSessionLocal
 from app.services import football_api_service
+from app.services.http_client import close_http_client
 # A importação do schema LeagueCreate não é estritamente necessária aqui, mas podemos deixar
 from app.schemas import LeagueCreate 
 from app.models import League
-
-# --- INÍCIO DA CORREÇÃO ---
-# Importar a construção 'insert' específica do dialeto do PostgreSQL
-from sqlalchemy.dialects.postgresql import insert
-# --- FIM DA CORREÇÃO ---
+from app.db.upsert import bulk_upsert
 
 async def sync_leagues_data():
     print("A iniciar a sincronização de ligas...")
     db = AsyncSessionLocal()
 
-    leagues_from_api = await football_api_service.get_leagues()
+    leagues_from_api = await football_api_service.get_leagues(only_changed=True)
+
+    if leagues_from_api is football_api_service.UNCHANGED:
+        print("O catálogo de ligas não mudou desde a última sincronização. Nada a fazer.")
+        await db.close()
+        return
 
     if not leagues_from_api:
         print("Não foi possível obter ligas da API. A terminar.")
@@ -26,12 +28,14 @@ async def sync_leagues_data():
         league_data = item.get("league")
         country_data = item.get("country")
         if league_data and country_data:
+            current_seasons = [s.get("year") for s in item.get("seasons") or [] if s.get("current")]
             leagues_to_db.append({
                 "id": league_data.get("id"),
                 "name": league_data.get("name"),
                 "type": league_data.get("type"),
                 "logo": league_data.get("logo"),
-                "country": country_data.get("name")
+                "country": country_data.get("name"),
+                "current_season": max(current_seasons) if current_seasons else None,
             })
 
     if not leagues_to_db:
@@ -39,25 +43,24 @@ async def sync_leagues_data():
         await db.close()
         return
 
-    print(f"Encontradas {len(leagues_to_db)} ligas na API. A inserir/ignorar na base de dados...")
+    print(f"Encontradas {len(leagues_to_db)} ligas na API. A inserir/atualizar na base de dados...")
 
     try:
-        # --- INÍCIO DA CORREÇÃO ---
-        # Usa a construção 'insert' importada do dialeto do PostgreSQL
-        stmt = insert(League).values(leagues_to_db)
-
-        # Define a política de conflito para a chave primária 'id'
-        # Se uma liga com o mesmo ID já existir, não faz nada (ignora).
-        stmt = stmt.on_conflict_do_nothing(
-            index_elements=['id']
+        # is_sync_enabled é gerido por nós, por isso nunca é sobrescrito pela API
+        result = await bulk_upsert(
+            db, League, leagues_to_db, update_columns=("name", "type", "logo", "country", "current_season")
         )
-        # --- FIM DA CORREÇÃO ---
-
-        await db.execute(stmt)
         await db.commit()
-        print("Sincronização de ligas concluída.")
+        await football_api_service.mark_synced("/leagues", leagues_from_api.content_hash)
+        print(f"Sincronização de ligas concluída: {result}.")
     finally:
         await db.close()
 
+async def main():
+    try:
+        await sync_leagues_data()
+    finally:
+        await close_http_client()
+
 if __name__ == "__main__":
-    asyncio.run(sync_leagues_data())
+    asyncio.run(main())
@@ -1,24 +1,45 @@
+import argparse
 import asyncio
+from typing import Optional
 
 from app.db.session import AsyncSessionLocal
+from app.db.upsert import bulk_upsert
 from app.services import football_api_service
+from app.services.backplane import backplane
+from app.services.game_list_cache import game_list_cache
+from app.services.http_client import close_http_client
 from app.models import Team
-from sqlalchemy.dialects.postgresql import insert
 
 # --- CONFIGURAÇÃO ---
-TARGET_LEAGUE_ID = 71 
+# Valores por omissão quando o script é executado diretamente.
+# Para sincronizar todas as ligas ativas use app/scripts/sync_all.py
+TARGET_LEAGUE_ID = 71
 TARGET_SEASON = 2023
+TARGET_LEAGUE_NAME = "Brasileirão Série A"
 
-async def sync_teams_data():
-    print(f"A iniciar a sincronização de equipas para a Liga ID: {TARGET_LEAGUE_ID}, Temporada: {TARGET_SEASON}")
+async def sync_teams_data(
+    league_id: int = TARGET_LEAGUE_ID,
+    season: int = TARGET_SEASON,
+    league_name: Optional[str] = TARGET_LEAGUE_NAME,
+) -> Optional[int]:
+    """
+    Sincroniza as equipas de uma liga/temporada.
+    Devolve o número de equipas gravadas (inseridas ou alteradas), ou None se a API falhar.
+    """
+    print(f"A iniciar a sincronização de equipas para a Liga ID: {league_id}, Temporada: {season}")
     db = AsyncSessionLocal()
 
-    teams_from_api = await football_api_service.get_teams(league_id=TARGET_LEAGUE_ID, season=TARGET_SEASON)
+    teams_from_api = await football_api_service.get_teams(league_id=league_id, season=season, only_changed=True)
+
+    if teams_from_api is football_api_service.UNCHANGED:
+        print("As equipas não mudaram desde a última sincronização. Nada a fazer.")
+        await db.close()
+        return 0
 
     if not teams_from_api:
         print("Não foi possível obter equipas da API. A terminar.")
         await db.close()
-        return
+        return None
 
     teams_to_db = []
     for item in teams_from_api:
@@ -28,35 +49,40 @@ async def sync_teams_data():
                 "id": team_data.get("id"),
                 "name": team_data.get("name"),
                 "logo_url": team_data.get("logo"), # <-- CORREÇÃO AQUI
-                "sport": "futebol", 
-                "league": f"Brasileirão Série A - {TARGET_SEASON}"
+                "sport": "futebol",
+                "league": f"{league_name or league_id} - {season}"
             })
 
     if not teams_to_db:
         print("Nenhuma equipa encontrada na resposta da API.")
         await db.close()
-        return
+        return 0
 
     print(f"Encontradas {len(teams_to_db)} equipas na API. A inserir/atualizar na base de dados...")
 
     try:
-        stmt = insert(Team).values(teams_to_db)
-
-        update_dict = {
-            'name': stmt.excluded.name,
-            'logo_url': stmt.excluded.logo_url, # <-- CORREÇÃO AQUI
-            'league': stmt.excluded.league,
-        }
-        stmt = stmt.on_conflict_do_update(
-            index_elements=['id'],
-            set_=update_dict
-        )
-
-        await db.execute(stmt)
+        result = await bulk_upsert(db, Team, teams_to_db, update_columns=("name", "logo_url", "league"))
         await db.commit()
-        print("Sincronização de equipas concluída.")
+        if result.written:
+            # As listas de jogos incluem o nome e o logótipo das equipas
+            await game_list_cache.invalidate()
+        await football_api_service.mark_synced("/teams", teams_from_api.content_hash, league=league_id, season=season)
+        print(f"Sincronização de equipas concluída: {result}.")
+        return result.written
     finally:
         await db.close()
 
+async def main(league_id: int, season: int):
+    try:
+        league_name = TARGET_LEAGUE_NAME if league_id == TARGET_LEAGUE_ID else None
+        await sync_teams_data(league_id=league_id, season=season, league_name=league_name)
+    finally:
+        await close_http_client()
+        await backplane.stop()
+
 if __name__ == "__main__":
-    asyncio.run(sync_teams_data())
+    parser = argparse.ArgumentParser(description="Sincroniza as equipas de uma liga/temporada.")
+    parser.add_argument("--league", type=int, default=TARGET_LEAGUE_ID)
+    parser.add_argument("--season", type=int, default=TARGET_SEASON)
+    args = parser.parse_args()
+    asyncio.run(main(args.league, args.season))
@@ -1,5 +1,6 @@
 import asyncio
 from app.services import football_api_service
+from app.services.http_client import close_http_client
 
 async def main():
     print("A testar a conexão com a API-Futebol...")
@@ -13,5 +14,7 @@ async def main():
     else:
         print("\nFalha ao conectar ou obter dados da API.")
 
+    await close_http_client()
+
 if __name__ == "__main__":
     asyncio.run(main())
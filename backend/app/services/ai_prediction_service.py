@@ -1,4 +1,5 @@
 import google.generativeai as genai
+from abc import ABC, abstractmethod
 import json
 import re
 from typing import Dict, Any
@@ -6,23 +7,26 @@ from typing import Dict, Any
 from app.core.config import settings
 from app.models.game import Game
 from app.schemas.prediction import PredictionCreate
+from app.services import ai_response_cache
+from app.services.local_prediction_model import local_model
 
-# Configura a API do Google AI com a sua chave
-try:
-    genai.configure(api_key=settings.GOOGLE_API_KEY)
-    # Configurações de segurança para o modelo
-    safety_settings = [
-        {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-        {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-        {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-        {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
-    ]
-    # Seleciona o modelo a ser usado. 'gemini-1.5-flash' é rápido e eficiente.
-    model = genai.GenerativeModel('gemini-1.5-flash', safety_settings=safety_settings)
-    print("Modelo Gemini configurado com sucesso.")
-except Exception as e:
-    print(f"ERRO ao configurar o modelo Gemini: {e}")
-    model = None
+# As previsões são geradas por um "backend" (PredictionBackend): o Gemini ou o modelo
+# estatístico local. PREDICTION_BACKEND escolhe o principal; PREDICTION_FALLBACK_BACKEND só é
+# usado se o principal não estiver configurado (ex: sem GOOGLE_API_KEY). Os erros do principal
+# propagam-se: a previsão fica por gerar, em vez de ser feita pelo modelo alternativo.
+
+MODEL_NAME = "gemini-1.5-flash"
+# Versão do modelo + prompt gravada em cada previsão
+MODEL_VERSION = "gemini-1.5-flash-v1"
+LOCAL_MODEL_VERSION = "local-poisson-v1"
+
+# Configurações de segurança para o modelo
+safety_settings = [
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
+]
 
 
 def parse_ai_response(text_response: str, game: Game) -> Dict[str, Any]:
@@ -55,18 +59,10 @@ def parse_ai_response(text_response: str, game: Game) -> Dict[str, Any]:
         }
 
 
-async def generate_prediction_for_game(game: Game) -> PredictionCreate:
-    """
-    Gera uma previsão para um jogo específico usando o modelo Gemini.
-    """
-    print(f"A gerar predição com IA para o jogo ID: {game.id}...")
-
-    if not model:
-        raise Exception("O modelo Gemini não está configurado. Verifique a chave de API.")
-
-    # 1. Construir o Prompt
+def build_prompt(game: Game) -> str:
+    """Prompt enviado ao modelo para um jogo (o mesmo jogo, com os mesmos dados, dá o mesmo prompt)."""
     # Este é o "cérebro" da nossa pergunta. Um prompt bem elaborado resulta numa resposta melhor.
-    prompt = f"""
+    return f"""
     **Análise de Jogo de Futebol para Apostas de Valor**
 
     **Contexto:** Você é um analista desportivo especialista, focado em encontrar apostas de valor (EV+).
@@ -95,25 +91,146 @@ async def generate_prediction_for_game(game: Game) -> PredictionCreate:
     Com base nos nomes das equipas e na liga, realize a sua análise. Lembre-se, o objetivo é encontrar valor.
     """
 
-    try:
-        # 2. Enviar o Prompt para a API do Gemini
-        print("A enviar pedido para a API do Gemini...")
-        response = await model.generate_content_async(prompt)
+
+class PredictionBackend(ABC):
+    """
+    Gera a previsão de um jogo. Cada implementação define `name` (o valor usado em
+    PREDICTION_BACKEND) e `predict`; `available` é False quando não está configurada.
+    """
+    name: str
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    async def predict(self, game: Game) -> PredictionCreate:
+        """Gera a previsão do jogo (sem a gravar)."""
+
+
+class GeminiBackend(PredictionBackend):
+    """
+    Previsão pelo modelo Gemini. O modelo é configurado no primeiro pedido (sem
+    GOOGLE_API_KEY o backend fica indisponível e é usada a alternativa).
+
+    A resposta do modelo fica na cache de respostas (ai_response_cache): se o prompt do jogo
+    não mudou, a resposta guardada é interpretada outra vez sem nova chamada ao modelo.
+    """
+    name = "gemini"
+
+    def __init__(self):
+        self._model = None
+
+    @property
+    def available(self) -> bool:
+        return bool(settings.GOOGLE_API_KEY)
+
+    def _get_model(self):
+        if not self.available:
+            raise Exception("O modelo Gemini não está configurado. Verifique a chave de API.")
+        if self._model is None:
+            # Configura a API do Google AI com a sua chave
+            genai.configure(api_key=settings.GOOGLE_API_KEY)
+            # 'gemini-1.5-flash' é rápido e eficiente.
+            self._model = genai.GenerativeModel(MODEL_NAME, safety_settings=safety_settings)
+            print("Modelo Gemini configurado com sucesso.")
+        return self._model
+
+    async def predict(self, game: Game) -> PredictionCreate:
+        print(f"A gerar predição com IA para o jogo ID: {game.id}...")
+
+        # 1. Construir o Prompt
+        prompt = build_prompt(game)
+
+        ai_text_response = await ai_response_cache.load(MODEL_NAME, prompt)
+        cached = ai_text_response is not None
+        if cached:
+            print("Resposta da IA encontrada na cache.")
+        else:
+            model = self._get_model()
+            try:
+                # 2. Enviar o Prompt para a API do Gemini
+                print("A enviar pedido para a API do Gemini...")
+                response = await model.generate_content_async(prompt)
+                ai_text_response = response.text
+            except Exception as e:
+                print(f"ERRO ao gerar conteúdo com o Gemini: {e}")
+                # Em caso de falha da API, podemos retornar uma previsão de erro ou levantar uma exceção
+                raise Exception("Falha ao comunicar com o serviço de IA.")
+            print("Resposta da IA recebida. A analisar...")
 
         # 3. Processar a Resposta
-        print("Resposta da IA recebida. A analisar...")
-        ai_text_response = response.text
         parsed_data = parse_ai_response(ai_text_response, game)
+        if not cached:
+            # Só depois de uma chamada ao modelo: regravar num acerto reiniciaria o TTL da entrada
+            await ai_response_cache.store(MODEL_NAME, prompt, ai_text_response, parsed_data)
 
-        # 4. Criar o objeto de previsão
-        prediction_data = PredictionCreate(
+        # 4. Criar o objeto de previsão (uma resposta inválida levanta ValidationError; a resposta
+        # fica na cache, por isso uma nova tentativa depois de corrigir a interpretação não chama o modelo)
+        return PredictionCreate(
             game_id=game.id,
-            model_version="gemini-1.5-flash-v1",
+            model_version=MODEL_VERSION,
             **parsed_data
         )
-        return prediction_data
 
-    except Exception as e:
-        print(f"ERRO ao gerar conteúdo com o Gemini: {e}")
-        # Em caso de falha da API, podemos retornar uma previsão de erro ou levantar uma exceção
-        raise Exception("Falha ao comunicar com o serviço de IA.")
+
+class LocalBackend(PredictionBackend):
+    """Previsão pelo modelo de Poisson local (sem rede; ver local_prediction_model)."""
+    name = "local"
+
+    async def predict(self, game: Game) -> PredictionCreate:
+        await local_model.ensure_loaded()
+        outcome = local_model.predict(game.home_team_id, game.away_team_id)
+        home_name, away_name = game.home_team.name, game.away_team.name
+
+        probabilities = {home_name: outcome.home_win, "Empate": outcome.draw, away_name: outcome.away_win}
+        predicted_winner = max(probabilities, key=probabilities.get)
+        home_goals, away_goals = outcome.likely_score
+        if outcome.over_2_5 >= 0.5:
+            tip = f"Mais de 2.5 golos (probabilidade estimada: {outcome.over_2_5:.0%})"
+        else:
+            tip = f"Menos de 2.5 golos (probabilidade estimada: {1 - outcome.over_2_5:.0%})"
+
+        return PredictionCreate(
+            game_id=game.id,
+            model_version=LOCAL_MODEL_VERSION,
+            predicted_winner=predicted_winner,
+            prediction_summary=(
+                f"Modelo estatístico: golos esperados {home_name} {outcome.home_goals:.2f} - "
+                f"{outcome.away_goals:.2f} {away_name}; resultado mais provável {home_goals}-{away_goals}."
+            ),
+            value_bet_suggestion=tip,
+            home_win_probability=round(outcome.home_win, 4),
+            draw_probability=round(outcome.draw, 4),
+            away_win_probability=round(outcome.away_win, 4),
+            # Confiança: probabilidade do resultado previsto, pesada pelo número de jogos conhecidos
+            confidence_level=round(max(probabilities.values()) * outcome.evidence, 4),
+        )
+
+
+BACKENDS: Dict[str, PredictionBackend] = {
+    GeminiBackend.name: GeminiBackend(),
+    LocalBackend.name: LocalBackend(),
+}
+
+
+def get_backend(name: str) -> PredictionBackend:
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Backend de previsão desconhecido: {name!r} (disponíveis: {', '.join(BACKENDS)})")
+
+
+async def generate_prediction_for_game(game: Game) -> PredictionCreate:
+    """
+    Gera uma previsão para um jogo com o backend PREDICTION_BACKEND. Se este não estiver
+    configurado, usa PREDICTION_FALLBACK_BACKEND (se definido). Um erro do backend principal
+    é propagado: a previsão é gravada com o game_id único e nunca mais regenerada, por isso
+    uma falha temporária não deve deixar gravada a previsão do modelo alternativo.
+    """
+    backend = get_backend(settings.PREDICTION_BACKEND)
+    if not backend.available and settings.PREDICTION_FALLBACK_BACKEND:
+        fallback = get_backend(settings.PREDICTION_FALLBACK_BACKEND)
+        if fallback is not backend:
+            return await fallback.predict(game)
+    return await backend.predict(game)
@@ -0,0 +1,72 @@
+import asyncio
+import hashlib
+import os
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.disk_cache import DiskCache, make_key
+
+# Cache em disco das respostas do modelo de IA, endereçada pelo conteúdo: a chave é o hash
+# do prompt e o nome do modelo. Se os dados do jogo (e portanto o prompt) não mudaram, uma
+# nova geração (reprocessamento, backfill, nova tentativa depois de um erro ao interpretar a
+# resposta) usa a resposta guardada em vez de chamar o modelo outra vez.
+# Cada entrada guarda a resposta em bruto (corpo) e, nos metadados, o resultado interpretado.
+
+_cache = DiskCache(
+    directory=os.path.join(settings.CACHE_DIR, "ai_responses"),
+    max_entries=settings.AI_RESPONSE_CACHE_MAX_ENTRIES,
+)
+
+hits = 0
+misses = 0
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def cache_key(model_name: str, prompt: str) -> str:
+    return make_key("ai_response", model_name, prompt_hash(prompt))
+
+
+def _is_fresh(meta: Dict[str, Any]) -> bool:
+    ttl = settings.AI_RESPONSE_CACHE_TTL_SECONDS
+    return ttl <= 0 or time.time() - meta.get("created_at", 0) < ttl
+
+
+async def load(model_name: str, prompt: str) -> Optional[str]:
+    """Resposta em bruto guardada para este prompt e modelo, ou None."""
+    global hits, misses
+    if not settings.AI_RESPONSE_CACHE_ENABLED:
+        return None
+    key = cache_key(model_name, prompt)
+    meta = await asyncio.to_thread(_cache.get_meta, key)
+    body = await asyncio.to_thread(_cache.get_body, key) if meta is not None and _is_fresh(meta) else None
+    if body is None:
+        misses += 1
+        return None
+    hits += 1
+    return body.decode("utf-8")
+
+
+async def store(model_name: str, prompt: str, response_text: str, parsed: Dict[str, Any]) -> None:
+    """Guarda a resposta em bruto e o resultado interpretado."""
+    if not settings.AI_RESPONSE_CACHE_ENABLED:
+        return
+    meta = {
+        "model": model_name,
+        "prompt_hash": prompt_hash(prompt),
+        "created_at": time.time(),
+        "parsed": parsed,
+    }
+    await asyncio.to_thread(_cache.set, cache_key(model_name, prompt), meta, response_text.encode("utf-8"))
+
+
+async def delete(model_name: str, prompt: str) -> None:
+    """Descarta a resposta guardada (para forçar uma nova chamada ao modelo)."""
+    await asyncio.to_thread(_cache.delete, cache_key(model_name, prompt))
+
+
+def snapshot() -> Dict[str, Any]:
+    return {"enabled": settings.AI_RESPONSE_CACHE_ENABLED, "hits": hits, "misses": misses}
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import uuid
+
+import asyncpg
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+# Backplane: canal de mensagens entre os processos da API (vários workers do uvicorn ou
+# vários pods). Cada processo publica eventos (ex: uma mensagem WebSocket para difundir)
+# e recebe os eventos publicados pelos outros. Os handlers são registados por tipo de evento.
+#
+#   - "local": sem comunicação entre processos (um único worker, desenvolvimento);
+#   - "postgres": PostgreSQL LISTEN/NOTIFY, numa conexão asyncpg dedicada.
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Identifica este processo: um processo ignora os eventos que ele próprio publicou,
+# porque já os entregou localmente no momento da publicação.
+PROCESS_ID = uuid.uuid4().hex
+
+# O payload de um NOTIFY tem de ter menos de 8000 bytes
+MAX_NOTIFY_PAYLOAD_BYTES = 7900
+
+
+class Backplane:
+    """Backplane local: entrega os eventos apenas aos handlers deste processo."""
+    name = "local"
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = {}
+        self.published = 0
+        self.received = 0
+
+    def subscribe(self, kind: str, handler: Handler) -> None:
+        """Regista um handler para os eventos de um tipo (ex: "ws")."""
+        self._handlers.setdefault(kind, []).append(handler)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, kind: str, data: Dict[str, Any]) -> None:
+        """Entrega o evento aos handlers locais e envia-o aos outros processos."""
+        self.published += 1
+        await self._dispatch(kind, data)
+        await self._relay(kind, data)
+
+    async def _relay(self, kind: str, data: Dict[str, Any]) -> None:
+        pass
+
+    async def _dispatch(self, kind: str, data: Dict[str, Any]) -> None:
+        for handler in self._handlers.get(kind, ()):
+            try:
+                await handler(data)
+            except Exception as e:
+                print(f"Erro no handler do backplane para '{kind}': {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"backend": self.name, "published": self.published, "received": self.received}
+
+
+class PostgresBackplane(Backplane):
+    """
+    Backplane sobre PostgreSQL LISTEN/NOTIFY.
+
+    Usa duas conexões asyncpg dedicadas (fora do pool do SQLAlchemy): uma fica em LISTEN
+    no canal e a outra envia os NOTIFY. Se a conexão de escuta cair, é restabelecida com
+    backoff; os eventos publicados nesse intervalo pelos outros processos perdem-se
+    (o NOTIFY não é persistente), o que é aceitável para mensagens de tempo real.
+    """
+    name = "postgres"
+
+    def __init__(self, dsn: str, channel: str):
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self._listener = None
+        self._publisher = None
+        self._publish_lock = asyncio.Lock()
+        self._supervisor: Optional[asyncio.Task] = None
+        self._listener_lost = asyncio.Event()
+        self._dispatching: set = set()
+        self.dropped_oversized = 0
+
+    async def start(self) -> None:
+        await self._connect_listener()
+        self._supervisor = asyncio.create_task(self._supervise(), name="backplane-supervisor")
+        print(f"Backplane PostgreSQL ativo no canal '{self.channel}'.")
+
+    async def stop(self) -> None:
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            try:
+                await self._supervisor
+            except asyncio.CancelledError:
+                pass
+            self._supervisor = None
+        for conn in (self._listener, self._publisher):
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        self._listener = self._publisher = None
+
+    async def _connect_listener(self) -> None:
+        self._listener_lost.clear()
+        self._listener = await asyncpg.connect(self.dsn)
+        self._listener.add_termination_listener(lambda conn: self._listener_lost.set())
+        await self._listener.add_listener(self.channel, self._on_notify)
+
+    async def _supervise(self) -> None:
+        """Restabelece a conexão de escuta quando cai."""
+        attempt = 0
+        while True:
+            await self._listener_lost.wait()
+            print("Backplane: conexão de escuta perdida. A restabelecer...")
+            while True:
+                await asyncio.sleep(min(30, 2 ** attempt))
+                try:
+                    await self._connect_listener()
+                    attempt = 0
+                    print("Backplane: conexão de escuta restabelecida.")
+                    break
+                except Exception as e:
+                    attempt += 1
+                    print(f"Backplane: falha ao restabelecer a conexão ({e}).")
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+        except json.JSONDecodeError:
+            return
+        if message.get("origin") == PROCESS_ID:
+            return
+        self.received += 1
+        task = asyncio.create_task(self._dispatch(message["kind"], message["data"]))
+        self._dispatching.add(task)
+        task.add_done_callback(self._dispatching.discard)
+
+    async def _relay(self, kind: str, data: Dict[str, Any]) -> None:
+        payload = json.dumps(
+            {"origin": PROCESS_ID, "kind": kind, "data": data}, separators=(",", ":"), default=str
+        )
+        if len(payload.encode("utf-8")) > MAX_NOTIFY_PAYLOAD_BYTES:
+            self.dropped_oversized += 1
+            print(f"Backplane: evento '{kind}' demasiado grande para NOTIFY; entregue apenas neste processo.")
+            return
+
+        async with self._publish_lock:
+            try:
+                if self._publisher is None or self._publisher.is_closed():
+                    self._publisher = await asyncpg.connect(self.dsn)
+                await self._publisher.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                print(f"Backplane: falha ao publicar o evento '{kind}': {e}")
+                if self._publisher is not None and not self._publisher.is_closed():
+                    self._publisher.terminate()
+                self._publisher = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **super().snapshot(),
+            "channel": self.channel,
+            "listening": self._listener is not None and not self._listener.is_closed(),
+            "dropped_oversized": self.dropped_oversized,
+        }
+
+
+def asyncpg_dsn() -> str:
+    """DSN da base de dados principal no formato aceite pelo asyncpg (sem o '+asyncpg' do SQLAlchemy)."""
+    from app.db.session import engine
+
+    return engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def create_backplane() -> Backplane:
+    """Cria o backplane configurado em WS_BACKPLANE."""
+    if settings.WS_BACKPLANE == "postgres":
+        return PostgresBackplane(asyncpg_dsn(), settings.WS_BACKPLANE_CHANNEL)
+    if settings.WS_BACKPLANE != "local":
+        print(f"ATENÇÃO: WS_BACKPLANE '{settings.WS_BACKPLANE}' desconhecido. A usar o backplane local.")
+    return Backplane()
+
+
+backplane = create_backplane()
@@ -1,11 +1,16 @@
+import asyncio
+import hashlib
+import json
 import httpx
-from typing import Optional, Dict, Any, List # Adicionado 'List' aqui
+from datetime import date
+from typing import Optional, Dict, Any, List, Union, AsyncIterator # Adicionado 'List' aqui
 
 # Importa as nossas configurações centrais
 from app.core.config import settings
-
-# URL base da API
-BASE_URL = "https://v3.football.api-sports.io"
+from app.services import response_cache
+from app.services.json_stream import aiter_array_items
+from app.services.http_client import get_http_client
+from app.services.rate_limiter import football_api_limiter, backoff_delay
 
 # Cabeçalhos padrão que serão enviados em todos os pedidos
 # A API requer a chave no cabeçalho 'x-rapidapi-key'
@@ -14,107 +19,513 @@ HEADERS = {
     "x-rapidapi-key": settings.API_FOOTBALL_KEY,
 }
 
-async def get_api_status() -> Optional[Dict[str, Any]]:
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# Em modo streaming, as respostas até este tamanho são lidas de uma vez para detetar erros de quota no corpo
+SMALL_BODY_BYTES = 16 * 1024
+
+
+class _Unchanged:
+    """Marcador devolvido com `only_changed=True` quando o conteúdo não mudou desde a última sincronização."""
+    def __repr__(self) -> str:
+        return "UNCHANGED"
+
+UNCHANGED = _Unchanged()
+
+
+class SyncItems(list):
     """
-    Faz um pedido ao endpoint /status da API para verificar a conectividade e o estado da subscrição.
+    Elementos de "response" de uma resposta, com o hash do corpo de onde foram lidos.
+    Depois de os gravar, passa-se `content_hash` a `mark_synced`.
     """
-    # (O resto da função continua igual)
-    if not settings.API_FOOTBALL_KEY:
-        print("ERRO: A chave da API-Futebol não está configurada no ficheiro .env")
+    def __init__(self, items: List[Dict[str, Any]], content_hash: Optional[str]):
+        super().__init__(items)
+        self.content_hash = content_hash
+
+
+class RateLimitPayloadError(httpx.HTTPError):
+    """Resposta 200 com o erro de quota no corpo, detetada a meio de uma leitura em streaming."""
+
+
+class ItemStream:
+    """
+    Iterador assíncrono sobre os elementos de "response" de um corpo lido aos bocados.
+    `content_hash` (o hash do corpo, para `mark_synced`) só fica definido depois de o corpo
+    ser lido até ao fim; se a iteração parar antes, fica None.
+
+    Quem pára a iteração antes do fim (erro, break) deve chamar `aclose` (ou usar
+    `async with`) para fechar logo a ligação ou o ficheiro da cache.
+    """
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+        self._items: Optional[AsyncIterator[Dict[str, Any]]] = None
+        self.content_hash: Optional[str] = None
+
+    def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        if self._items is None:
+            self._items = aiter_array_items(self._hashed_chunks())
+        return self._items
+
+    async def _hashed_chunks(self) -> AsyncIterator[bytes]:
+        digest = hashlib.sha256()
+        async for chunk in self._chunks:
+            digest.update(chunk)
+            yield chunk
+        self.content_hash = digest.hexdigest()
+
+    async def aclose(self) -> None:
+        # Fechar só o iterador de fora não fecha a fonte: a resposta (ou o ficheiro) é
+        # fechada pelo `finally` da fonte, que tem de ser fechada explicitamente
+        if self._items is not None:
+            await self._items.aclose()
+        await self._chunks.aclose()
+
+    async def __aenter__(self) -> "ItemStream":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+def _params(**values: Any) -> Dict[str, str]:
+    """Normaliza os parâmetros da query (a mesma forma é usada para a chave da cache)."""
+    return {key: str(value) for key, value in values.items() if value is not None}
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Lê o cabeçalho Retry-After (em segundos), se existir."""
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
         return None
 
-    endpoint = "/status"
-    url = f"{BASE_URL}{endpoint}"
+def _is_rate_limit_body(body: bytes) -> bool:
+    """A API-Futebol por vezes responde 200 com o erro de quota no corpo ('errors': {'rateLimit': ...})."""
+    # Verificação barata nos bytes antes de fazer o parsing completo
+    if b'"rateLimit"' not in body:
+        return False
+    try:
+        errors = json.loads(body).get("errors")
+    except ValueError:
+        return False
+    return isinstance(errors, dict) and "rateLimit" in errors
+
+def _is_rate_limit_payload(response: httpx.Response) -> bool:
+    return _is_rate_limit_body(response.content)
+
+async def _checked_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Passa os bocados de um corpo em streaming, mas retém os primeiros SMALL_BODY_BYTES: se o
+    corpo acabar antes disso e for o erro de quota, levanta RateLimitPayloadError sem entregar
+    nada ao parser nem à cache. Cobre as respostas sem content-length (chunked), que o
+    `_request` não pode verificar antes de as devolver.
+    """
+    head = bytearray()
+    async for chunk in chunks:
+        if head is None:
+            yield chunk
+            continue
+        head += chunk
+        if len(head) > SMALL_BODY_BYTES:
+            yield bytes(head)
+            head = None
+    if head is not None:
+        if _is_rate_limit_body(bytes(head)):
+            football_api_limiter.penalize()
+            raise RateLimitPayloadError("Quota da API excedida (erro no corpo da resposta).")
+        if head:
+            yield bytes(head)
+
+async def _request(
+    endpoint: str,
+    params: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+    error_context: str = "",
+    extra_headers: Optional[Dict[str, str]] = None,
+    stream: bool = False,
+) -> Optional[httpx.Response]:
+    """
+    Faz um pedido GET à API usando o cliente HTTP partilhado (pool com keep-alive).
+
+    Todos os pedidos passam pelo token bucket `football_api_limiter`, que respeita a quota
+    do fornecedor. Respostas 429/5xx e erros de rede são repetidos com backoff exponencial
+    com jitter. Devolve a resposta (2xx ou 304) ou None em caso de erro.
+
+    Com `stream=True` o corpo não é lido: o chamador itera `response.aiter_bytes()` e
+    tem de fechar a resposta com `response.aclose()`.
+    """
+    url = f"{settings.API_FOOTBALL_BASE_URL}{endpoint}"
+    client = get_http_client()
+    kwargs = {"headers": {**HEADERS, **(extra_headers or {})}, "params": params}
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+
+    max_retries = settings.API_FOOTBALL_MAX_RETRIES
+    for attempt in range(max_retries + 1):
+        await football_api_limiter.acquire()
+        try:
+            response = await client.send(client.build_request("GET", url, **kwargs), stream=stream)
+        except httpx.RequestError as e:
+            if attempt < max_retries:
+                football_api_limiter.retries += 1
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+            print(f"Erro de requisição{error_context}: {e}")
+            return None
+
+        football_api_limiter.update_from_headers(response.headers)
+
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            retry_after = _retry_after(response)
+            if response.status_code == 429:
+                # Com Retry-After, o bucket fica em dívida e o próximo acquire() já espera o tempo pedido
+                football_api_limiter.penalize(retry_after)
+            if attempt < max_retries:
+                # Só fecha quando vai repetir: na última tentativa o corpo ainda é lido abaixo para o erro
+                await response.aclose()
+                football_api_limiter.retries += 1
+                if not (response.status_code == 429 and retry_after):
+                    await asyncio.sleep(backoff_delay(attempt, retry_after))
+                continue
+
+        if response.status_code == 304:
+            return response
 
-    async with httpx.AsyncClient() as client:
         try:
-            response = await client.get(url, headers=HEADERS)
             response.raise_for_status()
-            return response.json()
         except httpx.HTTPStatusError as e:
-            print(f"Erro de status HTTP ao chamar a API: {e.response.status_code} - {e.response.text}")
+            await response.aread()
+            await response.aclose()
+            print(f"Erro de status HTTP{error_context}: {e.response.status_code} - {e.response.text}")
             return None
-        except httpx.RequestError as e:
-            print(f"Erro de requisição ao chamar a API: {e}")
+
+        if stream:
+            length = response.headers.get("content-length")
+            if length is None or int(length) > SMALL_BODY_BYTES:
+                return response
+            await response.aread()
+
+        if _is_rate_limit_payload(response):
+            await response.aclose()
+            football_api_limiter.penalize()
+            if attempt < max_retries:
+                football_api_limiter.retries += 1
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+            print(f"Quota da API excedida{error_context}: {response.json().get('errors')}")
             return None
+        return response
+
+    return None
+
+async def _get_body(
+    endpoint: str,
+    params: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+    error_context: str = "",
+    only_changed: bool = False,
+    ttl: Optional[int] = None,
+) -> Union[bytes, _Unchanged, None]:
+    """
+    Obtém o corpo de um endpoint, passando pela cache em disco quando o endpoint tem TTL.
+
+    - Dentro do TTL a resposta é servida da cache sem tocar na rede nem na quota;
+    - depois do TTL é revalidada com ETag / If-Modified-Since (um 304 não traz corpo);
+    - com `only_changed=True`, devolve `UNCHANGED` (sem fazer parsing) quando o conteúdo
+      é igual ao último marcado como sincronizado com `mark_synced`.
+
+    `ttl` substitui o TTL configurado para o endpoint (ex: 0 para dados ao vivo).
+    Devolve None em caso de erro.
+    """
+    if ttl is None or not settings.API_FOOTBALL_CACHE_ENABLED:
+        ttl = response_cache.ttl_for(endpoint)
+    if ttl <= 0:
+        response = await _request(endpoint, params, timeout, error_context)
+        return None if response is None else response.content
+
+    key = response_cache.cache_key(endpoint, params)
+    meta = await response_cache.load_meta(key)
+    body = None
+
+    if meta is None or not response_cache.is_fresh(meta, ttl):
+        headers = response_cache.conditional_headers(meta)
+        response = await _request(endpoint, params, timeout, error_context, extra_headers=headers)
+        if response is None:
+            return None
+        if response.status_code == 304 and meta is not None:
+            await response_cache.mark_revalidated(key)
+        else:
+            body = response.content
+            meta = await response_cache.store(
+                key,
+                endpoint=endpoint,
+                params=params,
+                body=body,
+                etag=response.headers.get("etag"),
+                last_modified=response.headers.get("last-modified"),
+                previous=meta,
+            )
+
+    if only_changed and meta.get("consumed_hash") == meta.get("content_hash"):
+        return UNCHANGED
+
+    if body is None:
+        body = await response_cache.load_body(key)
+        if body is None:
+            # O corpo desapareceu do disco (ex: limpeza manual): pede de novo sem revalidação
+            response = await _request(endpoint, params, timeout, error_context)
+            if response is None:
+                return None
+            body = response.content
+            await response_cache.store(
+                key, endpoint=endpoint, params=params, body=body,
+                etag=response.headers.get("etag"),
+                last_modified=response.headers.get("last-modified"),
+                previous=meta,
+            )
+
+    return body
+
+
+async def _get(
+    endpoint: str,
+    params: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+    error_context: str = "",
+    only_changed: bool = False,
+    ttl: Optional[int] = None,
+) -> Union[Dict[str, Any], _Unchanged, None]:
+    """Como `_get_body`, mas devolve o JSON já interpretado."""
+    body = await _get_body(endpoint, params, timeout, error_context, only_changed, ttl)
+    if body is None or body is UNCHANGED:
+        return body
+    return json.loads(body)
+
+
+async def _get_items(
+    endpoint: str,
+    params: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+    error_context: str = "",
+    only_changed: bool = False,
+    ttl: Optional[int] = None,
+) -> Union[SyncItems, _Unchanged, None]:
+    """Como `_get`, mas devolve os elementos de "response" com o hash do corpo (ver `SyncItems`)."""
+    body = await _get_body(endpoint, params, timeout, error_context, only_changed, ttl)
+    if body is None or body is UNCHANGED:
+        return body
+    return SyncItems(json.loads(body).get("response", []), response_cache.content_hash(body))
+
+
+async def _response_chunks(response: httpx.Response) -> AsyncIterator[bytes]:
+    try:
+        async for chunk in _checked_chunks(response.aiter_bytes()):
+            yield chunk
+    finally:
+        await response.aclose()
+
+async def _get_items_stream(
+    endpoint: str,
+    params: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+    error_context: str = "",
+    only_changed: bool = False,
+) -> Union[ItemStream, _Unchanged, None]:
+    """
+    Versão em streaming de `_get_items` para respostas grandes: devolve um iterador assíncrono
+    (`ItemStream`) sobre os elementos de "response", sem nunca ter o documento inteiro em memória.
+
+    Com cache, o corpo é escrito em disco à medida que chega e depois lido aos bocados, por
+    isso `only_changed` e a revalidação funcionam como em `_get`. Sem cache, os elementos
+    são lidos diretamente da ligação. Um erro de rede a meio da iteração propaga-se como
+    `httpx.HTTPError` e um corpo inválido como `ValueError`.
+    """
+    ttl = response_cache.ttl_for(endpoint)
+    if ttl <= 0:
+        response = await _request(endpoint, params, timeout, error_context, stream=True)
+        return None if response is None else ItemStream(_response_chunks(response))
+
+    key = response_cache.cache_key(endpoint, params)
+    meta = await response_cache.load_meta(key)
 
+    if meta is None or not response_cache.is_fresh(meta, ttl):
+        headers = response_cache.conditional_headers(meta)
+        max_retries = settings.API_FOOTBALL_MAX_RETRIES
+        for attempt in range(max_retries + 1):
+            response = await _request(endpoint, params, timeout, error_context, extra_headers=headers, stream=True)
+            if response is None:
+                return None
+            try:
+                if response.status_code == 304 and meta is not None:
+                    await response_cache.mark_revalidated(key)
+                else:
+                    # Um erro de quota no corpo aborta a escrita antes de a entrada ser gravada
+                    meta = await response_cache.store_stream(
+                        key,
+                        endpoint=endpoint,
+                        params=params,
+                        chunks=_checked_chunks(response.aiter_bytes()),
+                        etag=response.headers.get("etag"),
+                        last_modified=response.headers.get("last-modified"),
+                        previous=meta,
+                    )
+            except RateLimitPayloadError:
+                if attempt < max_retries:
+                    football_api_limiter.retries += 1
+                    await asyncio.sleep(backoff_delay(attempt))
+                    continue
+                print(f"Quota da API excedida{error_context}.")
+                return None
+            except httpx.HTTPError as e:
+                print(f"Erro ao descarregar a resposta{error_context}: {e}")
+                return None
+            finally:
+                await response.aclose()
+            break
 
-async def get_leagues() -> Optional[List[Dict[str, Any]]]:
+    if only_changed and meta.get("consumed_hash") == meta.get("content_hash"):
+        return UNCHANGED
+
+    chunks = await response_cache.open_body_stream(key)
+    if chunks is None:
+        # O corpo desapareceu do disco (ex: limpeza manual): lê diretamente da ligação
+        response = await _request(endpoint, params, timeout, error_context, stream=True)
+        return None if response is None else ItemStream(_response_chunks(response))
+    return ItemStream(chunks)
+
+
+async def mark_synced(endpoint: str, content_hash: Optional[str], **params: Any) -> None:
+    """
+    Marca como sincronizado o conteúdo com hash `content_hash` (o `content_hash` dos
+    `SyncItems`/`ItemStream` que foram gravados) para o endpoint/parâmetros.
+    Deve ser chamado depois de gravar os dados com sucesso, para que a próxima chamada
+    com `only_changed=True` devolva `UNCHANGED` se o fornecedor não tiver alterações.
+    Se entretanto a cache recebeu um conteúdo mais recente, esse não é marcado.
+    """
+    await response_cache.mark_consumed(response_cache.cache_key(endpoint, _params(**params)), content_hash)
+
+
+async def get_api_status() -> Optional[Dict[str, Any]]:
+    """
+    Faz um pedido ao endpoint /status da API para verificar a conectividade e o estado da subscrição.
+    """
+    if not settings.API_FOOTBALL_KEY:
+        print("ERRO: A chave da API-Futebol não está configurada no ficheiro .env")
+        return None
+
+    return await _get("/status", error_context=" ao chamar a API")
+
+
+async def get_leagues(only_changed: bool = False) -> Union[SyncItems, _Unchanged, None]:
     """
     Busca a lista de todas as ligas disponíveis na API-Futebol.
+    Com `only_changed=True` devolve `UNCHANGED` se o catálogo não mudou desde a última sincronização.
     """
     if not settings.API_FOOTBALL_KEY:
         print("ERRO: A chave da API-Futebol não está configurada.")
         return None
 
-    endpoint = "/leagues"
-    url = f"{BASE_URL}{endpoint}"
-
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=HEADERS)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("response", [])
-        except httpx.HTTPStatusError as e:
-            print(f"Erro de status HTTP: {e.response.status_code} - {e.response.text}")
-            return None
-        except httpx.RequestError as e:
-            print(f"Erro de requisição: {e}")
-            return None
+    return await _get_items("/leagues", only_changed=only_changed)
 
 # Buscar Equipes
-async def get_teams(league_id: int, season: int) -> Optional[List[Dict[str, Any]]]:
+async def get_teams(
+    league_id: int, season: int, only_changed: bool = False
+) -> Union[SyncItems, _Unchanged, None]:
     """
     Busca a lista de todas as equipas de uma liga e temporada específicas.
+    Com `only_changed=True` devolve `UNCHANGED` se a lista não mudou desde a última sincronização.
     """
     if not settings.API_FOOTBALL_KEY:
         print("ERRO: A chave da API-Futebol não está configurada.")
         return None
 
-    endpoint = "/teams"
-    url = f"{BASE_URL}{endpoint}"
-    params = {"league": str(league_id), "season": str(season)}
-
-    async with httpx.AsyncClient() as client:
-        try:
-            # O tempo limite pode ser aumentado para pedidos que demoram mais
-            response = await client.get(url, headers=HEADERS, params=params, timeout=30.0)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("response", [])
-        except httpx.HTTPStatusError as e:
-            print(f"Erro de status HTTP: {e.response.status_code} - {e.response.text}")
-            return None
-        except httpx.RequestError as e:
-            print(f"Erro de requisição: {e}")
-            return None
+    params = _params(league=league_id, season=season)
+    return await _get_items("/teams", params=params, only_changed=only_changed)
 
 # Buscar Jogos
-async def get_fixtures(league_id: int, season: int) -> Optional[List[Dict[str, Any]]]:
+async def get_fixtures(
+    league_id: int, season: int, only_changed: bool = False
+) -> Union[SyncItems, _Unchanged, None]:
     """
     Busca a lista de todos os jogos de uma liga e temporada específicas.
+    Com `only_changed=True` devolve `UNCHANGED` se os jogos não mudaram desde a última sincronização.
     """
     if not settings.API_FOOTBALL_KEY:
         print("ERRO: A chave da API-Futebol não está configurada.")
         return None
 
-    endpoint = "/fixtures"
-    url = f"{BASE_URL}{endpoint}"
-    params = {"league": str(league_id), "season": str(season)}
-
+    params = _params(league=league_id, season=season)
     # Este pedido pode ser grande, usamos um timeout maior
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        try:
-            response = await client.get(url, headers=HEADERS, params=params)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("response", [])
-        except httpx.HTTPStatusError as e:
-            print(f"Erro de status HTTP ao buscar jogos: {e.response.status_code} - {e.response.text}")
-            return None
-        except httpx.RequestError as e:
-            print(f"Erro de requisição ao buscar jogos: {e}")
+    return await _get_items(
+        "/fixtures", params=params, timeout=60.0, error_context=" ao buscar jogos", only_changed=only_changed
+    )
+
+async def stream_fixtures(
+    league_id: int, season: int, only_changed: bool = False
+) -> Union[ItemStream, _Unchanged, None]:
+    """
+    Como `get_fixtures`, mas devolve um iterador assíncrono que produz os jogos um a um
+    à medida que a resposta é lida, com memória constante independentemente do tamanho da temporada.
+    """
+    if not settings.API_FOOTBALL_KEY:
+        print("ERRO: A chave da API-Futebol não está configurada.")
+        return None
+
+    params = _params(league=league_id, season=season)
+    return await _get_items_stream(
+        "/fixtures", params=params, timeout=60.0, error_context=" ao buscar jogos", only_changed=only_changed
+    )
+
+async def get_fixtures_by_date_range(
+    league_id: int, season: int, date_from: date, date_to: date, only_changed: bool = False
+) -> Union[SyncItems, _Unchanged, None]:
+    """
+    Busca os jogos de uma liga/temporada entre duas datas (inclusive).
+    Usado pela sincronização incremental: uma janela de poucos dias em vez da temporada inteira.
+    """
+    if not settings.API_FOOTBALL_KEY:
+        print("ERRO: A chave da API-Futebol não está configurada.")
+        return None
+
+    params = _params(league=league_id, season=season, **{"from": date_from.isoformat(), "to": date_to.isoformat()})
+    return await _get_items(
+        "/fixtures", params=params, error_context=" ao buscar jogos por data",
+        only_changed=only_changed, ttl=settings.API_FOOTBALL_CACHE_TTL_FIXTURES_WINDOW,
+    )
+
+async def get_live_fixtures(league_ids: Optional[List[int]] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Busca os jogos a decorrer neste momento (`live=all`), opcionalmente filtrados por ligas.
+    Nunca usa a cache: os resultados ao vivo mudam a cada minuto.
+    """
+    if not settings.API_FOOTBALL_KEY:
+        print("ERRO: A chave da API-Futebol não está configurada.")
+        return None
+
+    live = "-".join(str(league_id) for league_id in league_ids) if league_ids else "all"
+    data = await _get("/fixtures", params=_params(live=live), error_context=" ao buscar jogos ao vivo", ttl=0)
+    if data is None:
+        return None
+    return data.get("response", [])
+
+# A API aceita no máximo 20 IDs por pedido em /fixtures?ids=
+MAX_FIXTURE_IDS_PER_REQUEST = 20
+
+async def get_fixtures_by_ids(fixture_ids: List[int]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Busca jogos específicos pelo ID (ex: para obter o resultado final de jogos que saíram do `live`).
+    Nunca usa a cache. Devolve None se algum dos pedidos falhar.
+    """
+    if not settings.API_FOOTBALL_KEY:
+        print("ERRO: A chave da API-Futebol não está configurada.")
+        return None
+
+    fixtures = []
+    for start in range(0, len(fixture_ids), MAX_FIXTURE_IDS_PER_REQUEST):
+        ids = "-".join(str(fixture_id) for fixture_id in fixture_ids[start:start + MAX_FIXTURE_IDS_PER_REQUEST])
+        data = await _get("/fixtures", params=_params(ids=ids), error_context=" ao buscar jogos por ID", ttl=0)
+        if data is None:
             return None
+        fixtures.extend(data.get("response", []))
+    return fixtures
 
 # Futuramente, adicionaremos outras funções aqui...
@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import time
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.schemas.game import GameRead
+from app.services.backplane import Backplane, backplane
+
+_game_list_adapter = TypeAdapter(List[GameRead])
+
+
+class CachedGameList:
+    """Lista de jogos já serializada em JSON, pronta a enviar, e o cursor da página seguinte."""
+    __slots__ = ("body", "next_cursor", "etag", "built_at")
+
+    def __init__(self, body: bytes, next_cursor: Optional[str], built_at: float):
+        self.body = body
+        self.next_cursor = next_cursor
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.built_at = built_at
+
+
+class GameListCache:
+    """
+    Cache partilhada das listas de GET /games (live/today/upcoming), já serializadas.
+
+    As listas são iguais para todos os utilizadores e só mudam quando a sincronização ou o
+    poller ao vivo gravam jogos, por isso cada filtro é lido da base de dados e serializado
+    uma vez; os pedidos seguintes recebem os mesmos bytes sem consultas nem serialização.
+
+    Quem grava jogos chama `invalidate`, que descarta as listas em todos os processos através
+    do backplane (evento "games"). Como "today" e "upcoming" dependem da data, a chave inclui
+    o dia (UTC); o TTL (GAME_LIST_CACHE_TTL_SECONDS) limita o tempo de vida de uma lista
+    quando uma escrita não chega a este processo (ex: sync_games noutro processo com o
+    backplane local).
+
+    Cada lista é a primeira página do filtro; as seguintes são pedidas com o cursor
+    guardado (`next_cursor`) e já não vêm da cache.
+
+    Pedidos simultâneos para uma lista em falta esperam por uma única leitura. Uma lista
+    lida antes de uma invalidação é entregue a esses pedidos mas não fica em cache.
+    """
+
+    def __init__(self, ttl: float, limit: int, backplane: Optional[Backplane] = None):
+        self.ttl = ttl
+        self.limit = limit
+        self._entries: Dict[Tuple[str, date], CachedGameList] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.backplane = backplane
+        if backplane is not None:
+            backplane.subscribe("games", self._on_backplane_event)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _lookup(self, key: Tuple[str, date]) -> Optional[CachedGameList]:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry.built_at < self.ttl:
+            return entry
+        return None
+
+    async def get(self, time_filter: str) -> CachedGameList:
+        """Devolve a lista serializada do filtro, lendo-a da base de dados se não estiver em cache."""
+        if not self.enabled:
+            return await self._load(time_filter)
+        key = (time_filter, datetime.now(timezone.utc).date())
+        entry = self._lookup(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        lock = self._locks.setdefault(time_filter, asyncio.Lock())
+        async with lock:
+            # Outro pedido pode ter lido a lista enquanto este esperava
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            self.misses += 1
+            generation = self.generation
+            entry = await self._load(time_filter)
+            if generation == self.generation:
+                # As listas de dias anteriores já não voltam a ser pedidas
+                for old_key in [k for k in self._entries if k[1] != key[1]]:
+                    del self._entries[old_key]
+                self._entries[key] = entry
+            return entry
+
+    async def _load(self, time_filter: str) -> CachedGameList:
+        # Lê do primário: uma lista lida de uma réplica atrasada ficaria em cache até à
+        # próxima escrita
+        from app.crud import crud_game
+        from app.db.session import ReadOnlySessionLocal
+
+        async with ReadOnlySessionLocal() as db:
+            # Mais um jogo do que o limite, para saber se há uma página seguinte
+            games = await crud_game.get_games_page(
+                db, **crud_game.time_filter_window(time_filter), limit=self.limit + 1
+            )
+            next_cursor = crud_game.encode_cursor(games[self.limit - 1]) if len(games) > self.limit else None
+            body = _game_list_adapter.dump_json(games[:self.limit])
+        return CachedGameList(body, next_cursor, time.monotonic())
+
+    def _discard(self) -> None:
+        self.generation += 1
+        self.invalidations += 1
+        self._entries.clear()
+
+    async def _on_backplane_event(self, data: Dict[str, Any]) -> None:
+        self._discard()
+
+    async def invalidate(self) -> None:
+        """Descarta as listas em cache (chamado depois de gravar jogos)."""
+        if self.backplane is None:
+            self._discard()
+        else:
+            await self.backplane.publish("games", {})
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+game_list_cache = GameListCache(
+    ttl=settings.GAME_LIST_CACHE_TTL_SECONDS,
+    limit=settings.GAMES_PAGE_SIZE,
+    backplane=backplane,
+)
@@ -0,0 +1,59 @@
+import httpx
+from typing import Optional
+
+from app.core.config import settings
+
+# Cliente HTTP partilhado por todo o processo.
+# Reutilizar o mesmo cliente mantém as conexões abertas (keep-alive) entre pedidos,
+# evitando pagar o handshake TLS e o estabelecimento da conexão em cada chamada.
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    """Verifica se o pacote 'h2' (necessário para HTTP/2 no httpx) está instalado."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _build_client() -> httpx.AsyncClient:
+    """Cria o cliente com os limites do pool definidos nas configurações."""
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+
+    http2 = settings.HTTP2_ENABLED
+    if http2 and not _http2_available():
+        print("ATENÇÃO [http_client]: HTTP2_ENABLED está ativo mas o pacote 'h2' não está instalado. A usar HTTP/1.1.")
+        http2 = False
+
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=settings.HTTP_TIMEOUT,
+        http2=http2,
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Devolve o cliente HTTP partilhado, criando-o na primeira utilização.
+
+    O cliente deve ser fechado com `close_http_client()` no fim do ciclo de vida
+    da aplicação (lifespan do FastAPI) ou no fim de um script.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def close_http_client() -> None:
+    """Fecha o cliente partilhado e liberta todas as conexões do pool."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
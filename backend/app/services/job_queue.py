@@ -0,0 +1,195 @@
+import asyncio
+import os
+import socket
+import uuid
+from contextlib import suppress
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud import crud_job
+from app.db.session import AsyncSessionLocal
+from app.models.job import Job, JobStatus
+from app.services import pre_analysis_service
+from app.services.backplane import backplane
+
+# Fila de tarefas de fundo sobre a tabela jobs. O processo da API põe tarefas na fila
+# (`enqueue`) e responde logo; os workers (app/scripts/run_worker.py) executam-nas.
+# Cada tipo de tarefa tem um handler que recebe a tarefa e uma função para reportar o
+# progresso, e devolve o resultado (JSON) guardado na tarefa.
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+JobHandler = Callable[[Job, ProgressCallback], Awaitable[Dict[str, Any]]]
+
+PRE_ANALYSIS = "pre_analysis"
+
+
+async def _run_pre_analysis(job: Job, on_progress: ProgressCallback) -> Dict[str, Any]:
+    # Cada passo com a sua sessão: nenhuma ligação fica reservada durante as chamadas ao modelo
+    async with AsyncSessionLocal() as db:
+        games = await pre_analysis_service.load_games_to_analyze(db, limit=job.payload.get("limit", 5))
+    if not games:
+        message = pre_analysis_service.NO_GAMES_MESSAGE
+        return {"message": message, "analyzed_count": 0, "failed_count": 0, "failed": []}
+    predictions, failed = await pre_analysis_service.generate_predictions(games, on_progress=on_progress)
+    async with AsyncSessionLocal() as db:
+        result = await pre_analysis_service.save_predictions(db, predictions, failed)
+    if result["failed_count"] and not result["analyzed_count"]:
+        # Nenhuma previsão gerada (ex: serviço de IA em baixo): repetir mais tarde
+        raise RuntimeError(f"Todas as previsões falharam: {result['failed'][0]['error']}")
+    return result
+
+
+HANDLERS: Dict[str, JobHandler] = {
+    PRE_ANALYSIS: _run_pre_analysis,
+}
+
+
+async def enqueue(db: AsyncSession, *, kind: str, payload: Dict[str, Any]) -> Tuple[Job, bool]:
+    """
+    Põe uma tarefa na fila e acorda os workers que estejam à espera. Se já houver uma tarefa
+    do mesmo tipo em fila ou em execução, devolve essa. Devolve (tarefa, criada).
+    """
+    job, created = await crud_job.enqueue_job(
+        db, kind=kind, payload=payload, max_attempts=settings.JOB_MAX_ATTEMPTS
+    )
+    if created:
+        await backplane.publish("jobs", {"kind": kind})
+    return job, created
+
+
+class JobWorker:
+    """
+    Executa as tarefas da fila, uma de cada vez.
+
+    Sem tarefas prontas, espera JOB_POLL_INTERVAL_SECONDS ou até ser acordado por um
+    evento "jobs" do backplane (publicado por `enqueue`; com o backplane "postgres" chega
+    também a workers noutros processos). Enquanto uma tarefa corre, o heartbeat é
+    atualizado a cada JOB_STALE_SECONDS / 3; periodicamente, as tarefas de workers que
+    deixaram de dar sinal voltam à fila.
+    """
+
+    def __init__(self, handlers: Dict[str, JobHandler], worker_id: Optional[str] = None):
+        self.handlers = handlers
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+        backplane.subscribe("jobs", self._on_backplane_event)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self.run(), name="job-worker")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        print(f"Worker {self.worker_id} parado.")
+
+    async def _on_backplane_event(self, data: Dict[str, Any]) -> None:
+        if data.get("kind") in self.handlers:
+            self._wakeup.set()
+
+    async def run(self) -> None:
+        print(f"Worker {self.worker_id} iniciado (tarefas: {', '.join(self.handlers)}).")
+        loop = asyncio.get_running_loop()
+        next_stale_check = 0.0
+        while True:
+            try:
+                if loop.time() >= next_stale_check:
+                    async with AsyncSessionLocal() as db:
+                        requeued = await crud_job.requeue_stale_jobs(db, stale_after_seconds=settings.JOB_STALE_SECONDS)
+                    if requeued:
+                        print(f"{requeued} tarefas sem heartbeat devolvidas à fila (ou dadas como falhadas).")
+                    next_stale_check = loop.time() + settings.JOB_STALE_SECONDS / 3
+                if await self.run_once():
+                    continue
+            except (OSError, DBAPIError) as e:
+                print(f"Worker: erro de acesso à base de dados: {e}")
+            self._wakeup.clear()
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL_SECONDS)
+
+    async def run_once(self) -> bool:
+        """Reserva e executa uma tarefa. Devolve False se não havia nenhuma pronta."""
+        async with AsyncSessionLocal() as db:
+            job = await crud_job.claim_next_job(db, worker_id=self.worker_id, kinds=list(self.handlers))
+        if job is None:
+            return False
+        await self._execute(job)
+        return True
+
+    async def _execute(self, job: Job) -> None:
+        print(f"A executar a tarefa {job.id} ({job.kind}), tentativa {job.attempts}/{job.max_attempts}...")
+
+        async def on_progress(done: int, total: int) -> None:
+            # O progresso é informativo: uma falha ao gravá-lo não interrompe a tarefa
+            try:
+                async with AsyncSessionLocal() as db:
+                    await crud_job.update_job_progress(db, job_id=job.id, done=done, total=total)
+            except (OSError, DBAPIError) as e:
+                print(f"Worker: falha ao gravar o progresso da tarefa {job.id}: {e}")
+
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            result = await self.handlers[job.kind](job, on_progress)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            async with AsyncSessionLocal() as db:
+                updated = await crud_job.fail_job(
+                    db, job_id=job.id, worker_id=self.worker_id, error=error,
+                    retry_base_seconds=settings.JOB_RETRY_BASE_SECONDS,
+                )
+            if updated is None:
+                print(f"Tarefa {job.id} falhou ({error}), mas já tinha sido devolvida à fila; resultado ignorado.")
+            elif updated.status == JobStatus.QUEUED:
+                self.retried += 1
+                print(f"Tarefa {job.id} falhou ({error}); nova tentativa a partir de {updated.run_after}.")
+            else:
+                self.failed += 1
+                print(f"Tarefa {job.id} falhou definitivamente: {error}")
+        else:
+            async with AsyncSessionLocal() as db:
+                completed = await crud_job.complete_job(db, job_id=job.id, worker_id=self.worker_id, result=result)
+            if completed:
+                self.succeeded += 1
+                print(f"Tarefa {job.id} concluída.")
+            else:
+                print(f"Tarefa {job.id} concluída, mas já tinha sido devolvida à fila; resultado ignorado.")
+        finally:
+            heartbeat.cancel()
+            with suppress(asyncio.CancelledError):
+                await heartbeat
+
+    async def _heartbeat(self, job: Job) -> None:
+        while True:
+            await asyncio.sleep(settings.JOB_STALE_SECONDS / 3)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await crud_job.touch_job(db, job_id=job.id)
+            except (OSError, DBAPIError) as e:
+                print(f"Worker: falha ao atualizar o heartbeat da tarefa {job.id}: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "worker_id": self.worker_id,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retried": self.retried,
+        }
+
+
+job_worker = JobWorker(HANDLERS)
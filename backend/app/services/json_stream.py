@@ -0,0 +1,121 @@
+import json
+import re
+from typing import Any, AsyncIterable, AsyncIterator, List, Optional
+
+# Parser incremental para respostas JSON grandes do tipo {"...": ..., "response": [ {...}, {...} ]}.
+# Em vez de carregar o documento inteiro (e depois uma segunda lista de dicts), lê o corpo
+# aos bocados e devolve cada elemento da lista `key` assim que está completo, por isso a
+# memória usada depende do tamanho de um elemento e não do tamanho da resposta.
+
+_QUOTE, _BACKSLASH = ord('"'), ord("\\")
+_OPEN = {ord("{"), ord("[")}
+_STRUCTURAL = re.compile(rb'["{}\[\]]')
+_STRING_SPECIAL = re.compile(rb'["\\]')
+
+
+class JsonArrayItemParser:
+    """
+    Extrai os elementos da lista `key` do objeto JSON de topo, alimentado por `feed(chunk)`.
+
+    Os elementos têm de ser objetos ou listas (é o caso de todas as respostas da API-Futebol).
+    O resto do documento é percorrido mas não é guardado.
+    """
+
+    def __init__(self, key: str = "response"):
+        self._key = key.encode("utf-8")
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key_buffer: Optional[bytearray] = None
+        self._last_key: Optional[bytes] = None
+        self._item_depth: Optional[int] = None  # profundidade dos elementos da lista alvo
+        self._item: Optional[bytearray] = None
+        self.done = False
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Processa mais um bocado do corpo e devolve os elementos completados por ele."""
+        items = []
+        item_from = 0 if self._item is not None else None
+        pos, size = 0, len(chunk)
+
+        while pos < size:
+            if self._escape:
+                # O caráter escapado ficou no início deste bocado
+                self._escape = False
+                if self._key_buffer is not None:
+                    self._key_buffer += chunk[pos:pos + 1]
+                pos += 1
+                continue
+
+            if self._in_string:
+                match = _STRING_SPECIAL.search(chunk, pos)
+                if match is None:
+                    if self._key_buffer is not None:
+                        self._key_buffer += chunk[pos:]
+                    break
+                i = match.start()
+                if chunk[i] == _BACKSLASH:
+                    if self._key_buffer is not None:
+                        self._key_buffer += chunk[pos:i + 2]
+                    if i + 1 >= size:
+                        self._escape = True
+                    pos = i + 2
+                    continue
+                if self._key_buffer is not None:
+                    self._key_buffer += chunk[pos:i]
+                    self._last_key = bytes(self._key_buffer)
+                    self._key_buffer = None
+                self._in_string = False
+                pos = i + 1
+                continue
+
+            match = _STRUCTURAL.search(chunk, pos)
+            if match is None:
+                break
+            i = match.start()
+            char = chunk[i]
+
+            if char == _QUOTE:
+                self._in_string = True
+                # As strings ao nível do objeto de topo são as chaves (ou valores simples)
+                if self._depth == 1:
+                    self._key_buffer = bytearray()
+            elif char in _OPEN:
+                if self._depth == self._item_depth and self._item is None:
+                    self._item = bytearray()
+                    item_from = i
+                elif (
+                    self._item_depth is None and not self.done and self._depth == 1
+                    and char == ord("[") and self._last_key == self._key
+                ):
+                    self._item_depth = 2
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._item is not None and self._depth == self._item_depth:
+                    self._item += chunk[item_from:i + 1]
+                    items.append(json.loads(self._item))
+                    self._item = None
+                    item_from = None
+                elif self._item_depth is not None and self._depth == self._item_depth - 1:
+                    self._item_depth = None
+                    self.done = True
+            pos = i + 1
+
+        if self._item is not None and item_from is not None:
+            self._item += chunk[item_from:]
+        return items
+
+    def close(self) -> None:
+        """Confirma que o documento terminou de forma válida."""
+        if self._depth != 0 or self._in_string or self._item is not None:
+            raise ValueError("Resposta JSON incompleta.")
+
+
+async def aiter_array_items(chunks: AsyncIterable[bytes], key: str = "response") -> AsyncIterator[Any]:
+    """Itera os elementos da lista `key` a partir de um fluxo assíncrono de bytes."""
+    parser = JsonArrayItemParser(key)
+    async for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+    parser.close()
@@ -0,0 +1,188 @@
+import asyncio
+import time
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.crud import crud_game, crud_league
+from app.db.session import AsyncSessionLocal
+from app.db.upsert import bulk_upsert
+from app.models import Game, GameStatus
+from app.scripts.sync_games import SYNCED_FIELDS, normalize_fixture
+from app.services import football_api_service
+from app.services.game_list_cache import game_list_cache
+from app.websocket_manager import game_topic, league_topic, manager
+
+# Intervalo para voltar a ler as ligas com sincronização ativa
+LEAGUES_REFRESH_SECONDS = 600
+
+
+def _delta_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, GameStatus):
+        return value.value
+    return value
+
+
+class LivePoller:
+    """
+    Tarefa de fundo que acompanha os jogos ao vivo.
+
+    A cada ciclo pede ao fornecedor os jogos a decorrer nas ligas ativas, compara-os com o
+    último estado conhecido e, se algo mudou (resultado, estado ou hora), grava as alterações
+    num único upsert e publica, para cada jogo alterado, uma mensagem só com os campos
+    alterados nos tópicos game:{id} e league:{id}:
+
+        {"type": "game_delta", "game": {"id": 123, "league_id": 71, "home_score": 1}}
+
+    Os jogos que saem do feed ao vivo são pedidos pelo ID para gravar o resultado final.
+    Enquanto há jogos a decorrer (ou a começar em breve) o intervalo é
+    LIVE_POLLER_INTERVAL_SECONDS; caso contrário LIVE_POLLER_IDLE_INTERVAL_SECONDS.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        # Último estado conhecido dos jogos acompanhados (os campos de SYNCED_FIELDS)
+        self._known: Dict[int, Dict[str, Any]] = {}
+        self._league_ids: List[int] = []
+        self._leagues_loaded_at = 0.0
+        self.polls = 0
+        self.errors = 0
+        self.games_updated = 0
+        self.last_poll_at: Optional[datetime] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run(), name="live-poller")
+            print("Poller de jogos ao vivo iniciado.")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        print("Poller de jogos ao vivo parado.")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "polls": self.polls,
+            "errors": self.errors,
+            "games_updated": self.games_updated,
+            "tracked_games": len(self._known),
+            "last_poll_at": self.last_poll_at.isoformat() if self.last_poll_at else None,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                active = await self.poll_once()
+            except Exception as e:
+                self.errors += 1
+                print(f"Erro no poller de jogos ao vivo: {e}")
+                active = True
+            interval = settings.LIVE_POLLER_INTERVAL_SECONDS if active else settings.LIVE_POLLER_IDLE_INTERVAL_SECONDS
+            await asyncio.sleep(interval)
+
+    async def _get_league_ids(self, db) -> List[int]:
+        if time.monotonic() - self._leagues_loaded_at > LEAGUES_REFRESH_SECONDS:
+            leagues = await crud_league.get_sync_enabled_leagues(db)
+            self._league_ids = [league.id for league in leagues]
+            self._leagues_loaded_at = time.monotonic()
+        return self._league_ids
+
+    async def poll_once(self) -> bool:
+        """Executa um ciclo. Devolve True se há jogos ativos (para usar o intervalo curto)."""
+        self.polls += 1
+        self.last_poll_at = now = datetime.now(timezone.utc)
+
+        # As sessões só ficam abertas durante as consultas: os pedidos à API (com as esperas do
+        # rate limiter e as novas tentativas) são feitos sem nenhuma ligação reservada
+        async with AsyncSessionLocal() as db:
+            league_ids = await self._get_league_ids(db)
+            if not league_ids:
+                return False
+            # Só os jogos das ligas acompanhadas: os das outras ligas nunca aparecem no feed
+            # ao vivo e seriam pedidos pelo ID em todos os ciclos
+            in_progress = set(await crud_game.get_in_progress_game_ids(db, league_ids=league_ids))
+
+        live = await football_api_service.get_live_fixtures(league_ids=league_ids)
+        if live is None:
+            # Erro na API: tentamos de novo no intervalo curto
+            return True
+        fixtures: Dict[int, Dict[str, Any]] = {}
+        league_of: Dict[int, int] = {}
+        self._collect(live, fixtures, league_of)
+        live_ids = set(fixtures)
+
+        # Jogos que estavam a decorrer e já não aparecem no feed ao vivo: buscar o estado final
+        gone = sorted((in_progress | set(self._known)) - live_ids)
+        if gone:
+            finished = await football_api_service.get_fixtures_by_ids(gone)
+            self._collect(finished or [], fixtures, league_of)
+
+        async with AsyncSessionLocal() as db:
+            unknown = [game_id for game_id in fixtures if game_id not in self._known]
+            if unknown:
+                self._known.update(await crud_game.get_games_sync_state(db, game_ids=unknown))
+
+            changed, deltas = [], []
+            for game_id, game in fixtures.items():
+                current = self._known.get(game_id)
+                if current is None:
+                    # Jogo ainda não sincronizado (equipas em falta, etc.): fica para o sync_games
+                    continue
+                delta = {field: game[field] for field in SYNCED_FIELDS if current[field] != game[field]}
+                if delta:
+                    changed.append(game)
+                    deltas.append({
+                        "id": game_id,
+                        "league_id": league_of.get(game_id),
+                        **{k: _delta_value(v) for k, v in delta.items()},
+                    })
+
+            if changed:
+                await bulk_upsert(db, Game, changed, update_columns=SYNCED_FIELDS, touch_column="updated_at")
+                await db.commit()
+                for game in changed:
+                    self._known[game["id"]].update({field: game[field] for field in SYNCED_FIELDS})
+                self.games_updated += len(changed)
+
+            # Só continuamos a acompanhar os jogos que ainda estão a decorrer
+            self._known = {
+                game_id: state for game_id, state in self._known.items()
+                if game_id in live_ids or state["status"] == GameStatus.IN_PROGRESS
+            }
+
+            starting_soon = bool(live_ids) or await crud_game.has_games_starting_between(
+                db, start=now, end=now + timedelta(seconds=settings.LIVE_POLLER_IDLE_INTERVAL_SECONDS)
+            )
+
+        if deltas:
+            await game_list_cache.invalidate()
+        for delta in deltas:
+            topics = [game_topic(delta["id"])]
+            if delta["league_id"] is not None:
+                topics.append(league_topic(delta["league_id"]))
+            await manager.publish(topics, {"type": "game_delta", "game": delta})
+        return starting_soon
+
+    @staticmethod
+    def _collect(items: List[Dict[str, Any]], fixtures: Dict[int, Dict[str, Any]], league_of: Dict[int, int]) -> None:
+        """Normaliza os jogos da API e guarda a liga de cada um (usada para o tópico league:{id})."""
+        for item in items:
+            game = normalize_fixture(item)
+            if game:
+                fixtures[game["id"]] = game
+                league_of[game["id"]] = (item.get("league") or {}).get("id")
+
+
+live_poller = LivePoller()
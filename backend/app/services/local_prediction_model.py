@@ -0,0 +1,200 @@
+import asyncio
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, select, union_all
+
+from app.core.config import settings
+from app.models.game import Game, GameStatus
+
+# Modelo estatístico local: golos de cada equipa como variáveis de Poisson independentes,
+# com médias dadas pela força de ataque e de defesa das equipas, calculadas a partir dos
+# resultados dos jogos terminados na base de dados. Não usa rede: as estatísticas são lidas
+# numa única consulta agregada e ficam em memória; cada previsão é só aritmética.
+
+# Médias de golos por jogo usadas enquanto não há resultados suficientes
+DEFAULT_HOME_GOALS = 1.5
+DEFAULT_AWAY_GOALS = 1.15
+# Peso (em jogos) da média geral na força de cada equipa: uma equipa com poucos jogos
+# fica perto da média em vez de herdar o acaso de dois ou três resultados
+PRIOR_GAMES = 5
+# Máximo de golos por equipa considerado na matriz de resultados
+MAX_GOALS = 10
+
+
+class TeamStats(NamedTuple):
+    games: int
+    goals_for: int
+    goals_against: int
+
+
+class Outcome(NamedTuple):
+    home_win: float
+    draw: float
+    away_win: float
+    home_goals: float
+    away_goals: float
+    over_2_5: float
+    likely_score: Tuple[int, int]
+    evidence: float  # 0..1: quantos jogos suportam a previsão
+
+
+def _poisson(mean: float) -> List[float]:
+    probabilities = [math.exp(-mean)]
+    for goals in range(1, MAX_GOALS + 1):
+        probabilities.append(probabilities[-1] * mean / goals)
+    return probabilities
+
+
+class LocalPredictionModel:
+    """
+    Modelo de Poisson com a força das equipas calculada a partir dos jogos terminados
+    nos últimos LOCAL_MODEL_HISTORY_DAYS dias.
+
+    Golos esperados da equipa da casa = média de golos em casa * ataque(casa) * defesa(fora),
+    e o simétrico para a equipa de fora, em que ataque e defesa são os golos marcados e
+    sofridos por jogo relativamente à média geral. As estatísticas são relidas no máximo a
+    cada LOCAL_MODEL_REFRESH_SECONDS; se a leitura falhar, continuam as anteriores (ou as
+    médias por omissão), de forma que o modelo responde sempre.
+    """
+
+    def __init__(self, refresh_seconds: float, history_days: int):
+        self.refresh_seconds = refresh_seconds
+        self.history_days = history_days
+        self.teams: Dict[int, TeamStats] = {}
+        self.home_goals = DEFAULT_HOME_GOALS
+        self.away_goals = DEFAULT_AWAY_GOALS
+        self.games = 0
+        self.loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self.predictions = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def _is_fresh(self) -> bool:
+        return self.loaded_at is not None and time.monotonic() - self.loaded_at < self.refresh_seconds
+
+    async def ensure_loaded(self) -> None:
+        """Lê as estatísticas da base de dados se ainda não foram lidas ou já expiraram."""
+        if self._is_fresh():
+            return
+        async with self._lock:
+            if self._is_fresh():
+                return
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.refresh_errors += 1
+                print(f"ERRO ao ler as estatísticas do modelo local (a usar as anteriores): {e}")
+            # Em caso de erro também espera pelo próximo intervalo, para não tentar a cada previsão
+            self.loaded_at = time.monotonic()
+
+    async def refresh(self) -> None:
+        # Estatísticas de longo prazo: o atraso de uma réplica não tem importância
+        from app.db.session import replica_router
+
+        since = datetime.now(timezone.utc) - timedelta(days=self.history_days)
+        finished = (
+            Game.status == GameStatus.FINISHED,
+            Game.home_score.is_not(None),
+            Game.away_score.is_not(None),
+            Game.game_time >= since,
+        )
+        # Uma linha por equipa e por jogo, vista do lado da equipa
+        sides = union_all(
+            select(Game.home_team_id.label("team_id"), Game.home_score.label("goals_for"),
+                   Game.away_score.label("goals_against")).where(*finished),
+            select(Game.away_team_id.label("team_id"), Game.away_score.label("goals_for"),
+                   Game.home_score.label("goals_against")).where(*finished),
+        ).subquery()
+
+        async with replica_router.session() as db:
+            totals = (await db.execute(
+                select(func.count(), func.avg(Game.home_score), func.avg(Game.away_score)).where(*finished)
+            )).one()
+            rows = (await db.execute(
+                select(sides.c.team_id, func.count(), func.sum(sides.c.goals_for), func.sum(sides.c.goals_against))
+                .group_by(sides.c.team_id)
+            )).all()
+
+        self.games = totals[0]
+        if self.games:
+            self.home_goals = float(totals[1]) or DEFAULT_HOME_GOALS
+            self.away_goals = float(totals[2]) or DEFAULT_AWAY_GOALS
+        self.teams = {
+            team_id: TeamStats(int(games), int(goals_for), int(goals_against))
+            for team_id, games, goals_for, goals_against in rows
+        }
+        self.refreshes += 1
+        print(f"Modelo local: estatísticas de {len(self.teams)} equipas em {self.games} jogos terminados.")
+
+    def _strength(self, team_id: int) -> Tuple[float, float, int]:
+        """Força de ataque e de defesa (1.0 = média) e número de jogos da equipa."""
+        average = (self.home_goals + self.away_goals) / 2
+        stats = self.teams.get(team_id)
+        if stats is None:
+            return 1.0, 1.0, 0
+        prior = PRIOR_GAMES * average
+        attack = (stats.goals_for + prior) / ((stats.games + PRIOR_GAMES) * average)
+        defense = (stats.goals_against + prior) / ((stats.games + PRIOR_GAMES) * average)
+        return attack, defense, stats.games
+
+    def predict(self, home_team_id: int, away_team_id: int) -> Outcome:
+        """Probabilidades do resultado de um jogo (sem consultas: usa as estatísticas em memória)."""
+        home_attack, home_defense, home_games = self._strength(home_team_id)
+        away_attack, away_defense, away_games = self._strength(away_team_id)
+        home_mean = self.home_goals * home_attack * away_defense
+        away_mean = self.away_goals * away_attack * home_defense
+
+        home_dist = _poisson(home_mean)
+        away_dist = _poisson(away_mean)
+        home_win = draw = away_win = under_2_5 = best = 0.0
+        likely_score = (0, 0)
+        for home, p_home in enumerate(home_dist):
+            for away, p_away in enumerate(away_dist):
+                p = p_home * p_away
+                if home > away:
+                    home_win += p
+                elif home == away:
+                    draw += p
+                else:
+                    away_win += p
+                if home + away <= 2:
+                    under_2_5 += p
+                if p > best:
+                    best, likely_score = p, (home, away)
+
+        # A matriz está truncada em MAX_GOALS: normaliza para somar 1
+        total = home_win + draw + away_win
+        evidence_games = min(home_games, away_games)
+        self.predictions += 1
+        return Outcome(
+            home_win=home_win / total,
+            draw=draw / total,
+            away_win=away_win / total,
+            home_goals=home_mean,
+            away_goals=away_mean,
+            over_2_5=max(0.0, 1.0 - under_2_5 / total),
+            likely_score=likely_score,
+            evidence=evidence_games / (evidence_games + 2 * PRIOR_GAMES),
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "teams": len(self.teams),
+            "games": self.games,
+            "home_goals": round(self.home_goals, 3),
+            "away_goals": round(self.away_goals, 3),
+            "loaded": self.loaded_at is not None,
+            "predictions": self.predictions,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+        }
+
+
+local_model = LocalPredictionModel(
+    refresh_seconds=settings.LOCAL_MODEL_REFRESH_SECONDS,
+    history_days=settings.LOCAL_MODEL_HISTORY_DAYS,
+)
@@ -1,39 +1,116 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
 from app.crud import crud_game, crud_prediction
+from app.models.game import Game
+from app.schemas.prediction import PredictionCreate
 from app.services import ai_prediction_service
 import asyncio
 
-async def run_pre_analysis_for_upcoming_games(db: AsyncSession, limit: int = 5):
-    """
-    Busca jogos futuros sem previsão e aciona a geração de análise de IA para eles.
+async def _generate(game: Game, semaphore: asyncio.Semaphore) -> Tuple[Game, PredictionCreate | Exception]:
+    """Gera a previsão de um jogo. Um erro (ou timeout) fica associado ao jogo, sem interromper os outros."""
+    async with semaphore:
+        try:
+            prediction_in = await asyncio.wait_for(
+                ai_prediction_service.generate_prediction_for_game(game=game),
+                timeout=settings.PRE_ANALYSIS_TIMEOUT_SECONDS,
+            )
+            return game, prediction_in
+        except Exception as e:
+            return game, e
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+NO_GAMES_MESSAGE = "Nenhum jogo novo para analisar."
+
+
+async def load_games_to_analyze(db: AsyncSession, limit: int = 5) -> List[Game]:
+    """Jogos futuros sem previsão, com as equipas já carregadas (não precisam da sessão depois)."""
+    return await crud_game.get_upcoming_games_without_prediction(db=db, limit=limit)
 
-    Numa aplicação real, isto seria executado por uma tarefa agendada (cron job).
-    Para o nosso propósito, será acionado por um endpoint de admin.
+
+async def generate_predictions(
+    games: List[Game], on_progress: Optional[ProgressCallback] = None
+) -> Tuple[List[PredictionCreate], List[Dict[str, Any]]]:
     """
-    print("A iniciar o serviço de pré-análise...")
+    Gera as previsões em simultâneo (no máximo PRE_ANALYSIS_CONCURRENCY de cada vez), sem
+    usar a base de dados. Devolve as previsões geradas e os jogos que falharam (erro da API,
+    resposta inválida ou timeout), com o erro de cada um.
+    `on_progress(feitos, total)` é chamado à medida que cada previsão termina.
+    """
+    print(f"Encontrados {len(games)} jogos para analisar. A gerar previsões...")
+    semaphore = asyncio.Semaphore(max(1, settings.PRE_ANALYSIS_CONCURRENCY))
+    done = 0
 
-    # 1. Encontrar jogos que precisam de análise
-    games_to_analyze = await crud_game.get_upcoming_games_without_prediction(db=db, limit=limit)
+    async def generate(game: Game):
+        nonlocal done
+        outcome = await _generate(game, semaphore)
+        done += 1
+        if on_progress is not None:
+            await on_progress(done, len(games))
+        return outcome
 
-    if not games_to_analyze:
-        print("Nenhum jogo novo para analisar.")
-        return {"message": "Nenhum jogo novo para analisar.", "analyzed_count": 0}
+    if on_progress is not None:
+        await on_progress(0, len(games))
+    results = await asyncio.gather(*(generate(game) for game in games))
 
-    print(f"Encontrados {len(games_to_analyze)} jogos para analisar. A gerar previsões...")
+    predictions: List[PredictionCreate] = []
+    failed: List[Dict[str, Any]] = []
+    for game, outcome in results:
+        if isinstance(outcome, Exception):
+            error = str(outcome) or type(outcome).__name__
+            print(f"ERRO na pré-análise do jogo ID {game.id}: {error}")
+            failed.append({"game_id": game.id, "error": error})
+        else:
+            predictions.append(outcome)
+    return predictions, failed
 
-    # 2. Gerar e guardar a previsão para cada jogo
-    tasks = []
-    for game in games_to_analyze:
-        # Cria uma "tarefa" para gerar a previsão para cada jogo.
-        # Isto permite que, no futuro, possamos executá-las em paralelo se quisermos.
-        prediction_in = await ai_prediction_service.generate_prediction_for_game(game=game)
-        tasks.append(crud_prediction.create_prediction(db=db, prediction_in=prediction_in))
 
-    # Executa todas as tarefas de criação de previsão
-    await asyncio.gather(*tasks)
+async def save_predictions(
+    db: AsyncSession, predictions: List[PredictionCreate], failed: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Grava todas as previsões numa única instrução e devolve o resumo da pré-análise."""
+    saved = await crud_prediction.create_predictions_bulk(db=db, predictions_in=predictions)
+    skipped = len(predictions) - len(saved)
 
-    print(f"Pré-análise concluída para {len(games_to_analyze)} jogos.")
+    message = f"Pré-análise concluída para {len(saved)} jogos."
+    if failed:
+        message += f" {len(failed)} falharam."
+    if skipped:
+        message += f" {skipped} já tinham previsão."
+    print(message)
     return {
-        "message": f"Pré-análise concluída para {len(games_to_analyze)} jogos.",
-        "analyzed_count": len(games_to_analyze)
+        "message": message,
+        "analyzed_count": len(saved),
+        "failed_count": len(failed),
+        "failed": failed,
     }
+
+
+async def run_pre_analysis_for_upcoming_games(
+    db: AsyncSession, limit: int = 5, on_progress: Optional[ProgressCallback] = None
+):
+    """
+    Busca jogos futuros sem previsão e aciona a geração de análise de IA para eles.
+
+    Três passos: ler os jogos (`load_games_to_analyze`), gerar as previsões em simultâneo
+    sem usar a sessão (`generate_predictions`) e gravá-las numa única instrução
+    (`save_predictions`). A transação da leitura é terminada antes da geração, para que a
+    ligação não fique reservada durante as chamadas ao modelo. Um jogo cuja previsão falhe
+    é reportado em "failed" e fica para a próxima execução.
+
+    O worker da fila de tarefas (tarefa "pre_analysis", ver job_queue) usa os três passos
+    diretamente, cada um com a sua sessão.
+    """
+    print("A iniciar o serviço de pré-análise...")
+
+    games_to_analyze = await load_games_to_analyze(db, limit=limit)
+    # Termina a transação da leitura e devolve a ligação ao pool (os jogos e as equipas já
+    # estão carregados); a sessão volta a abrir uma transação só para gravar as previsões
+    await db.commit()
+    if not games_to_analyze:
+        print(NO_GAMES_MESSAGE)
+        return {"message": NO_GAMES_MESSAGE, "analyzed_count": 0, "failed_count": 0, "failed": []}
+
+    predictions, failed = await generate_predictions(games_to_analyze, on_progress=on_progress)
+    return await save_predictions(db, predictions, failed)
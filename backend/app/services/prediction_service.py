@@ -0,0 +1,65 @@
+import asyncio
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.crud import crud_prediction
+from app.db.session import AsyncSessionLocal
+from app.models.game import Game
+from app.models.prediction import Prediction
+from app.services import ai_prediction_service
+from app.services.single_flight import SingleFlight
+
+# Namespace dos advisory locks das previsões (primeiro argumento de pg_advisory_xact_lock)
+PREDICTION_LOCK_NAMESPACE = 0x50524544  # "PRED"
+# Tempo, além de PREDICTION_TIMEOUT_SECONDS, que um processo espera pelo lock de outro
+LOCK_WAIT_MARGIN_SECONDS = 5
+
+# Uma geração por jogo neste processo
+prediction_flight = SingleFlight()
+
+
+async def _generate_once(game: Game) -> Prediction:
+    """
+    Gera e grava a previsão de um jogo. Com PREDICTION_ADVISORY_LOCK, um advisory lock
+    por jogo (mantido até ao commit) garante que entre vários processos só um chama o
+    modelo: os outros esperam pelo lock e encontram a previsão já gravada.
+
+    A geração tem o limite de PREDICTION_TIMEOUT_SECONDS e a espera pelo lock (lock_timeout)
+    esse limite mais LOCK_WAIT_MARGIN_SECONDS, por isso nem quem gera nem quem espera
+    mantém a ligação e a transação abertas indefinidamente.
+    """
+    async with AsyncSessionLocal() as db:
+        if settings.PREDICTION_ADVISORY_LOCK:
+            lock_timeout_ms = int((settings.PREDICTION_TIMEOUT_SECONDS + LOCK_WAIT_MARGIN_SECONDS) * 1000)
+            await db.execute(
+                text("SELECT set_config('lock_timeout', :timeout, true)"), {"timeout": f"{lock_timeout_ms}ms"}
+            )
+            await db.execute(
+                text("SELECT pg_advisory_xact_lock(:namespace, :game_id)"),
+                {"namespace": PREDICTION_LOCK_NAMESPACE, "game_id": game.id},
+            )
+        prediction = await crud_prediction.get_prediction_by_game_id(db=db, game_id=game.id)
+        if prediction is not None:
+            await db.commit()
+            return prediction
+        try:
+            prediction_in = await asyncio.wait_for(
+                ai_prediction_service.generate_prediction_for_game(game=game),
+                timeout=settings.PREDICTION_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f"A geração da previsão do jogo {game.id} excedeu {settings.PREDICTION_TIMEOUT_SECONDS}s."
+            )
+        # O commit grava a previsão e liberta o lock
+        return await crud_prediction.create_prediction_if_absent(db=db, prediction_in=prediction_in)
+
+
+async def get_or_generate_prediction(game: Game) -> Prediction:
+    """
+    Devolve a previsão do jogo, gerando-a se ainda não existir. Pedidos simultâneos para o
+    mesmo jogo partilham uma única geração (SingleFlight neste processo e, entre processos,
+    o advisory lock de `_generate_once`).
+    """
+    return await prediction_flight.do(game.id, lambda: _generate_once(game))
@@ -0,0 +1,200 @@
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+from uuid import UUID
+
+from cachetools import TTLCache
+
+from app.core.config import settings
+from app.models.user import User
+from app.services.backplane import Backplane, backplane
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Utilizador autenticado tal como as dependências de autorização o veem: identificação,
+    flags e o conjunto de permissões de todos os seus planos, já achatado.
+    """
+    id: UUID
+    email: str
+    is_active: bool
+    is_superuser: bool
+    permissions: FrozenSet[str]
+    role_ids: FrozenSet[int]
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        """Constrói o principal a partir de um User carregado com os roles e as permissões."""
+        return cls(
+            id=user.id,
+            email=user.email,
+            is_active=user.is_active,
+            is_superuser=user.is_superuser,
+            permissions=frozenset(
+                permission.name for role in user.roles for permission in role.permissions
+            ),
+            role_ids=frozenset(role.id for role in user.roles),
+        )
+
+    def has_permission(self, permission_name: str) -> bool:
+        return self.is_superuser or permission_name in self.permissions
+
+    def to_claims(self) -> Dict[str, Any]:
+        """Claims a incluir no token de acesso (JWT_EMBED_PERMISSIONS)."""
+        return {
+            "email": self.email,
+            "act": self.is_active,
+            "su": self.is_superuser,
+            "perms": sorted(self.permissions),
+            "roles": sorted(self.role_ids),
+        }
+
+    @classmethod
+    def from_claims(cls, user_id: UUID, payload: Dict[str, Any]) -> Optional["Principal"]:
+        """Reconstrói o principal a partir de um token com claims; None se o token não as tiver."""
+        if "perms" not in payload:
+            return None
+        return cls(
+            id=user_id,
+            email=payload.get("email", ""),
+            is_active=bool(payload.get("act", True)),
+            is_superuser=bool(payload.get("su", False)),
+            permissions=frozenset(payload["perms"]),
+            role_ids=frozenset(payload.get("roles", ())),
+        )
+
+
+class PrincipalCache:
+    """
+    Cache TTL/LRU de tokens já validados -> Principal.
+
+    Um acerto evita tanto a descodificação do JWT como a consulta do utilizador, roles e
+    permissões. Uma entrada nunca é usada depois de o token expirar.
+
+    As alterações de planos/permissões invalidam as entradas afetadas em todos os processos
+    através do backplane (evento "authz"). Para que um carregamento que começou antes de uma
+    invalidação não volte a pôr na cache dados antigos, cada invalidação incrementa
+    `generation` e `put` recusa resultados obtidos numa geração anterior.
+
+    Guarda também o momento da última alteração de cada utilizador (ou de todos), para
+    decidir sem ir à base de dados se as permissões incluídas num token ainda são válidas:
+    um token emitido antes da alteração já não é (ver `is_stale`). Só interessam as alterações
+    mais recentes que a duração de um token de acesso; as mais antigas são descartadas.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, backplane: Optional[Backplane] = None):
+        self._entries: TTLCache = TTLCache(maxsize=max_entries, ttl=ttl)
+        self._changed_at: Dict[str, float] = {}
+        self._all_changed_at = 0.0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.backplane = backplane
+        if backplane is not None:
+            backplane.subscribe("authz", self._on_backplane_event)
+
+    def get(self, token: str) -> Optional[Principal]:
+        entry: Optional[Tuple[Principal, float]] = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        principal, expires_at = entry
+        if expires_at <= time.time():
+            self._entries.pop(token, None)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return principal
+
+    def put(self, token: str, principal: Principal, *, expires_at: float, generation: int) -> None:
+        """Guarda o principal de um token, se entretanto não houve nenhuma invalidação."""
+        if generation == self.generation:
+            self._entries[token] = (principal, expires_at)
+
+    def is_stale(self, user_id: UUID, issued_at: Optional[float]) -> bool:
+        """Indica se um token emitido em `issued_at` é anterior à última alteração do utilizador."""
+        if issued_at is None:
+            return True
+        changed_at = max(self._all_changed_at, self._changed_at.get(str(user_id), 0.0))
+        # "iat" tem precisão de segundos: um token emitido no mesmo segundo da alteração é
+        # considerado antigo (o custo é apenas uma leitura da base de dados)
+        return issued_at <= changed_at
+
+    def _record_change(self, user_id: Optional[str], changed_at: float) -> None:
+        if user_id is None:
+            self._all_changed_at = max(self._all_changed_at, changed_at)
+            return
+        self._changed_at[user_id] = max(self._changed_at.get(user_id, 0.0), changed_at)
+        horizon = time.time() - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        for key in [key for key, value in self._changed_at.items() if value < horizon]:
+            del self._changed_at[key]
+
+    def record_changes(self, changes: Iterable[Tuple[UUID, datetime]]) -> None:
+        """Regista alterações lidas da base de dados (users.authz_updated_at) no arranque."""
+        for user_id, changed_at in changes:
+            self._record_change(str(user_id), changed_at.timestamp())
+
+    async def load_recent_changes(self) -> None:
+        """
+        Lê da base de dados as alterações ainda relevantes (mais recentes que a duração de um
+        token de acesso). Chamado no arranque: as alterações feitas antes de o processo
+        existir não lhe chegaram pelo backplane.
+        """
+        from app.crud import crud_user
+        from app.db.session import AsyncSessionLocal
+
+        since = time.time() - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        async with AsyncSessionLocal() as db:
+            changes = await crud_user.get_authz_changes_since(
+                db, since=datetime.fromtimestamp(since, timezone.utc)
+            )
+        self.record_changes(changes)
+
+    def _discard(self, user_id: Optional[str], changed_at: Optional[float] = None) -> None:
+        self.generation += 1
+        self.invalidations += 1
+        self._record_change(user_id, changed_at or time.time())
+        if user_id is None:
+            self._entries.clear()
+            return
+        for token in list(self._entries.keys()):
+            entry = self._entries.get(token)
+            if entry is not None and str(entry[0].id) == user_id:
+                self._entries.pop(token, None)
+
+    async def _on_backplane_event(self, data: Dict[str, Any]) -> None:
+        self._discard(data.get("user_id"), data.get("changed_at"))
+
+    async def _invalidate(self, user_id: Optional[str]) -> None:
+        changed_at = time.time()
+        if self.backplane is None:
+            self._discard(user_id, changed_at)
+        else:
+            await self.backplane.publish("authz", {"user_id": user_id, "changed_at": changed_at})
+
+    async def invalidate_user(self, user_id: UUID) -> None:
+        """Descarta os tokens de um utilizador (ex: mudança dos seus planos ou do seu estado)."""
+        await self._invalidate(str(user_id))
+
+    async def invalidate_all(self) -> None:
+        """Descarta tudo (ex: mudança das permissões de um plano, que afeta vários utilizadores)."""
+        await self._invalidate(None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "recent_authz_changes": len(self._changed_at),
+        }
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    backplane=backplane,
+)
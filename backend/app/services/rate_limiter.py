@@ -0,0 +1,135 @@
+import asyncio
+import random
+import time
+from typing import Any, Dict, Mapping, Optional
+
+from app.core.config import settings
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket que controla o ritmo dos pedidos a um fornecedor externo.
+
+    - `rate_per_minute` tokens são repostos de forma contínua (suaviza os picos);
+    - `capacity` é o número máximo de pedidos permitidos em rajada;
+    - os cabeçalhos de quota devolvidos pelo fornecedor corrigem a contagem local,
+      para que vários processos a partilhar a mesma chave não esgotem a quota.
+    """
+    def __init__(self, rate_per_minute: int, capacity: Optional[int] = None):
+        self.rate_per_minute = max(1, rate_per_minute)
+        self.capacity = max(1, capacity or self.rate_per_minute)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+        # Estado reportado pelo fornecedor (None enquanto não houver resposta)
+        self.minute_limit: Optional[int] = None
+        self.minute_remaining: Optional[int] = None
+        self.daily_limit: Optional[int] = None
+        self.daily_remaining: Optional[int] = None
+
+        # Contadores para métricas
+        self.requests = 0
+        self.throttled_seconds = 0.0
+        self.rate_limited_responses = 0
+        self.retries = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_minute / 60.0)
+
+    def set_rate(self, rate_per_minute: int, capacity: Optional[int] = None) -> None:
+        """Altera o ritmo (ex: depois de mudar de plano no fornecedor)."""
+        self._refill()
+        self.rate_per_minute = max(1, rate_per_minute)
+        self.capacity = max(1, capacity or self.rate_per_minute)
+        self._tokens = min(self._tokens, self.capacity)
+
+    async def acquire(self) -> None:
+        """Espera até haver um token disponível e consome-o."""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self.requests += 1
+                    return
+                wait = (1 - self._tokens) * 60.0 / self.rate_per_minute
+                self.throttled_seconds += wait
+                await asyncio.sleep(wait)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Atualiza o orçamento a partir dos cabeçalhos de quota da API-Futebol."""
+        minute_limit = _int_header(headers, "x-ratelimit-limit")
+        minute_remaining = _int_header(headers, "x-ratelimit-remaining")
+        daily_limit = _int_header(headers, "x-ratelimit-requests-limit")
+        daily_remaining = _int_header(headers, "x-ratelimit-requests-remaining")
+
+        if minute_limit is not None:
+            self.minute_limit = minute_limit
+        if daily_limit is not None:
+            self.daily_limit = daily_limit
+        if daily_remaining is not None:
+            self.daily_remaining = daily_remaining
+
+        if minute_remaining is not None:
+            self.minute_remaining = minute_remaining
+            # O fornecedor é a fonte de verdade: nunca gastamos mais do que ele diz que resta
+            self._refill()
+            self._tokens = min(self._tokens, float(minute_remaining))
+
+        if daily_remaining == 0:
+            print("ATENÇÃO [rate_limiter]: a quota diária da API-Futebol está esgotada.")
+
+    def penalize(self, retry_after: Optional[float] = None) -> None:
+        """Esvazia o bucket depois de um 429 para que os próximos pedidos esperem."""
+        self.rate_limited_responses += 1
+        self._refill()
+        self._tokens = min(self._tokens, 0.0)
+        if retry_after:
+            # Tokens negativos fazem o próximo acquire() esperar pelo tempo pedido
+            self._tokens = -retry_after * self.rate_per_minute / 60.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado atual do orçamento, exposto como métrica."""
+        self._refill()
+        return {
+            "tokens_available": round(max(self._tokens, 0.0), 2),
+            "capacity": self.capacity,
+            "rate_per_minute": self.rate_per_minute,
+            "provider_minute_limit": self.minute_limit,
+            "provider_minute_remaining": self.minute_remaining,
+            "provider_daily_limit": self.daily_limit,
+            "provider_daily_remaining": self.daily_remaining,
+            "requests": self.requests,
+            "retries": self.retries,
+            "rate_limited_responses": self.rate_limited_responses,
+            "throttled_seconds": round(self.throttled_seconds, 2),
+        }
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Tempo de espera antes de uma nova tentativa: exponencial com jitter, ou o Retry-After do servidor."""
+    if retry_after:
+        return retry_after
+    base = min(settings.API_FOOTBALL_BACKOFF_MAX_SECONDS, settings.API_FOOTBALL_BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return base / 2 + random.uniform(0, base / 2)
+
+
+# Instância partilhada por todas as chamadas à API-Futebol neste processo
+football_api_limiter = TokenBucket(
+    rate_per_minute=settings.API_FOOTBALL_REQUESTS_PER_MINUTE,
+    capacity=settings.API_FOOTBALL_BURST,
+)
@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import os
+import time
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Optional
+
+from app.core.config import settings
+from app.core.disk_cache import DiskCache, make_key
+
+# Cache em disco das respostas da API-Futebol.
+# Cada entrada guarda o corpo bruto e os metadados necessários para:
+#  - servir a resposta sem rede enquanto estiver dentro do TTL do endpoint;
+#  - revalidar com ETag / If-Modified-Since depois do TTL (304 = sem download);
+#  - comparar o hash do conteúdo com o último conteúdo sincronizado, para que os
+#    scripts de sincronização possam saltar o parsing e os upserts quando nada mudou.
+
+_cache = DiskCache(
+    directory=os.path.join(settings.CACHE_DIR, "football_api"),
+    max_entries=settings.API_FOOTBALL_CACHE_MAX_ENTRIES,
+)
+
+
+def cache_key(endpoint: str, params: Optional[Dict[str, str]]) -> str:
+    return make_key(endpoint, params or {})
+
+
+def ttl_for(endpoint: str) -> int:
+    """TTL em segundos para o endpoint (0 = sem cache)."""
+    if not settings.API_FOOTBALL_CACHE_ENABLED:
+        return 0
+    return settings.API_FOOTBALL_CACHE_TTLS.get(endpoint, 0)
+
+
+def content_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def is_fresh(meta: Dict[str, Any], ttl: int) -> bool:
+    return time.time() - meta.get("fetched_at", 0) < ttl
+
+
+def conditional_headers(meta: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Cabeçalhos de revalidação a partir da última resposta guardada."""
+    headers = {}
+    if meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+async def load_meta(key: str) -> Optional[Dict[str, Any]]:
+    return await asyncio.to_thread(_cache.get_meta, key)
+
+
+async def load_body(key: str) -> Optional[bytes]:
+    return await asyncio.to_thread(_cache.get_body, key)
+
+
+def _new_meta(
+    *,
+    endpoint: str,
+    params: Optional[Dict[str, str]],
+    digest: str,
+    etag: Optional[str],
+    last_modified: Optional[str],
+    previous: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    return {
+        "endpoint": endpoint,
+        "params": params or {},
+        "etag": etag,
+        "last_modified": last_modified,
+        "fetched_at": time.time(),
+        "content_hash": digest,
+        # Mantém o hash do último conteúdo sincronizado com sucesso
+        "consumed_hash": previous.get("consumed_hash") if previous else None,
+    }
+
+
+async def store(
+    key: str,
+    *,
+    endpoint: str,
+    params: Optional[Dict[str, str]],
+    body: bytes,
+    etag: Optional[str],
+    last_modified: Optional[str],
+    previous: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Guarda uma resposta 200 e devolve os metadados gravados."""
+    meta = _new_meta(
+        endpoint=endpoint, params=params, digest=content_hash(body),
+        etag=etag, last_modified=last_modified, previous=previous,
+    )
+    await asyncio.to_thread(_cache.set, key, meta, body)
+    return meta
+
+
+async def store_stream(
+    key: str,
+    *,
+    endpoint: str,
+    params: Optional[Dict[str, str]],
+    chunks: AsyncIterable[bytes],
+    etag: Optional[str],
+    last_modified: Optional[str],
+    previous: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Como `store`, mas escreve o corpo em disco à medida que chega, sem o ter todo em memória."""
+    writer = await asyncio.to_thread(_cache.body_writer, key)
+    digest = hashlib.sha256()
+    try:
+        async for chunk in chunks:
+            digest.update(chunk)
+            await asyncio.to_thread(writer.write, chunk)
+    except BaseException:
+        await asyncio.to_thread(writer.abort)
+        raise
+    meta = _new_meta(
+        endpoint=endpoint, params=params, digest=digest.hexdigest(),
+        etag=etag, last_modified=last_modified, previous=previous,
+    )
+    await asyncio.to_thread(writer.commit, meta)
+    return meta
+
+
+async def open_body_stream(key: str, chunk_size: int = 64 * 1024) -> Optional[AsyncIterator[bytes]]:
+    """Devolve um iterador assíncrono sobre o corpo guardado, ou None se não existir."""
+    f = await asyncio.to_thread(_cache.open_body, key)
+    if f is None:
+        return None
+
+    async def chunks() -> AsyncIterator[bytes]:
+        try:
+            while chunk := await asyncio.to_thread(f.read, chunk_size):
+                yield chunk
+        finally:
+            f.close()
+
+    return chunks()
+
+
+async def mark_revalidated(key: str) -> None:
+    """Depois de um 304, a entrada volta a estar fresca sem novo download."""
+    await asyncio.to_thread(_cache.update_meta, key, fetched_at=time.time())
+
+
+async def mark_consumed(key: str, processed_hash: Optional[str]) -> bool:
+    """
+    Regista que o conteúdo com hash `processed_hash` já foi processado (ex: gravado na base de
+    dados), mas só se ainda for o conteúdo atual da entrada: se entretanto outro pedido gravou
+    um corpo mais recente, esse fica por processar. Devolve True se a entrada foi marcada.
+    """
+    if processed_hash is None:
+        return False
+    meta = await load_meta(key)
+    if meta is None or meta.get("content_hash") != processed_hash:
+        return False
+    await asyncio.to_thread(_cache.update_meta, key, consumed_hash=processed_hash)
+    return True
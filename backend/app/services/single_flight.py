@@ -0,0 +1,40 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Junta chamadas simultâneas com a mesma chave numa única execução.
+
+    A primeira chamada para uma chave executa `fn`; as que chegam enquanto ela corre
+    esperam pelo mesmo resultado (ou pela mesma exceção) em vez de repetirem o trabalho.
+    Depois de terminar, a chave fica livre: o resultado não fica em cache.
+
+    A execução corre numa tarefa própria, por isso um pedido cancelado (ex: cliente que
+    desligou) não a interrompe para os restantes.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.executions = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "inflight": len(self._inflight),
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.calls - self.executions,
+        }
@@ -0,0 +1,112 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from app.core.config import settings
+from app.crud import crud_league
+from app.db.session import AsyncSessionLocal
+from app.services.rate_limiter import football_api_limiter
+from app.scripts.sync_teams import sync_teams_data
+from app.scripts.sync_games import sync_games_data
+
+
+@dataclass
+class LeagueSyncReport:
+    """Resultado da sincronização de uma liga/temporada."""
+    league_id: int
+    league_name: str
+    season: int
+    teams: Optional[int] = None
+    games: Optional[int] = None
+    teams_seconds: float = 0.0
+    games_seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.teams is not None and self.games is not None
+
+    @property
+    def total_seconds(self) -> float:
+        return self.teams_seconds + self.games_seconds
+
+
+@dataclass
+class SyncRunReport:
+    """Resumo de uma execução completa do orquestrador."""
+    leagues: List[LeagueSyncReport] = field(default_factory=list)
+    total_seconds: float = 0.0
+
+    def print_summary(self) -> None:
+        print("\n--- Resumo da sincronização ---")
+        print(f"{'Liga':<8} {'Temp.':<6} {'Equipas':>8} {'Jogos':>7} {'Equip.(s)':>10} {'Jogos(s)':>9}  Estado")
+        for r in self.leagues:
+            state = "ok" if r.ok else f"ERRO: {r.error or 'sem dados da API'}"
+            print(
+                f"{r.league_id:<8} {r.season:<6} {r.teams if r.teams is not None else '-':>8} "
+                f"{r.games if r.games is not None else '-':>7} {r.teams_seconds:>10.2f} {r.games_seconds:>9.2f}  {state}"
+            )
+        ok_count = sum(1 for r in self.leagues if r.ok)
+        print(f"{ok_count}/{len(self.leagues)} ligas/temporadas sincronizadas em {self.total_seconds:.1f}s")
+
+
+async def _sync_league_season(
+    league_id: int, league_name: str, season: int, semaphore: asyncio.Semaphore
+) -> LeagueSyncReport:
+    """Sincroniza equipas e depois jogos (os jogos dependem das equipas) de uma liga/temporada."""
+    report = LeagueSyncReport(league_id=league_id, league_name=league_name, season=season)
+    async with semaphore:
+        try:
+            start = time.perf_counter()
+            report.teams = await sync_teams_data(league_id=league_id, season=season, league_name=league_name)
+            report.teams_seconds = time.perf_counter() - start
+
+            # Sem equipas não é possível inserir jogos (chaves estrangeiras)
+            if report.teams is None:
+                return report
+
+            start = time.perf_counter()
+            report.games = await sync_games_data(league_id=league_id, season=season)
+            report.games_seconds = time.perf_counter() - start
+        except Exception as e:
+            # Uma liga com problemas não deve interromper as restantes
+            print(f"ERRO ao sincronizar a Liga ID {league_id}, Temporada {season}: {e}")
+            report.error = str(e)
+    return report
+
+
+async def run_full_sync(
+    seasons: Optional[List[int]] = None,
+    max_concurrency: Optional[int] = None,
+    requests_per_minute: Optional[int] = None,
+) -> SyncRunReport:
+    """
+    Sincroniza equipas e jogos de todas as ligas com `is_sync_enabled` para as temporadas indicadas,
+    com concorrência limitada. A quota por minuto do fornecedor é respeitada pelo token bucket
+    que está à frente de todas as chamadas do football_api_service.
+    """
+    seasons = seasons or settings.SYNC_SEASONS
+    semaphore = asyncio.Semaphore(max_concurrency or settings.SYNC_MAX_CONCURRENCY)
+    if requests_per_minute:
+        football_api_limiter.set_rate(requests_per_minute, capacity=settings.API_FOOTBALL_BURST)
+
+    async with AsyncSessionLocal() as db:
+        leagues = await crud_league.get_sync_enabled_leagues(db)
+        # Copiamos os dados necessários para não usar objetos ORM depois de fechar a sessão
+        targets = [(league.id, league.name) for league in leagues]
+
+    run_report = SyncRunReport()
+    if not targets:
+        print("Nenhuma liga com sincronização ativa (is_sync_enabled). Nada a fazer.")
+        return run_report
+
+    print(f"A sincronizar {len(targets)} ligas x {len(seasons)} temporadas...")
+    start = time.perf_counter()
+    run_report.leagues = await asyncio.gather(*(
+        _sync_league_season(league_id, league_name, season, semaphore)
+        for league_id, league_name in targets
+        for season in seasons
+    ))
+    run_report.total_seconds = time.perf_counter() - start
+    return run_report
@@ -1,38 +1,256 @@
 import asyncio
 import json
-from fastapi import WebSocket
-from typing import Dict
+import re
+from fastapi import WebSocket, status
+from typing import Any, Dict, Iterable, List, Optional, Set
 from uuid import UUID
 
+from app.core.config import settings
+from app.services.backplane import Backplane, backplane
+
+# Tópicos que os clientes podem subscrever. O tópico user:{id} é subscrito automaticamente
+# na autenticação e não pode ser pedido pelo cliente.
+CLIENT_TOPIC_PATTERN = re.compile(r"^(game|league):\d+$")
+MAX_SUBSCRIPTIONS_PER_CONNECTION = 200
+
+
+def game_topic(game_id: int) -> str:
+    return f"game:{game_id}"
+
+def league_topic(league_id: int) -> str:
+    return f"league:{league_id}"
+
+def user_topic(user_id: UUID) -> str:
+    return f"user:{user_id}"
+
+
+class _Connection:
+    """Estado de uma conexão: subscrições e fila de envio esvaziada por uma tarefa própria."""
+    def __init__(self, websocket: WebSocket, user_id: UUID, queue_size: int):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.topics: Set[str] = set()
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        # Mensagens descartadas desde a última vez que a fila ficou vazia
+        self.dropped = 0
+        self.writer: Optional[asyncio.Task] = None
+
+
 class ConnectionManager:
-    """Gere as conexões WebSocket ativas."""
-    def __init__(self):
-        self.active_connections: Dict[UUID, WebSocket] = {}
+    """
+    Gere as conexões WebSocket ativas e as subscrições de tópicos.
+
+    Um utilizador pode ter várias conexões (ex: vários separadores). As mensagens publicadas
+    num tópico só são enviadas às conexões que o subscreveram.
+
+    Com um `backplane`, as mensagens publicadas (publish/broadcast) são entregues pelos
+    ConnectionManager de todos os processos da API, cada um às suas conexões.
+
+    Publicar nunca espera pelos clientes: a mensagem é serializada uma vez e colocada na fila
+    de cada conexão, que é esvaziada pela sua própria tarefa. Se a fila de um cliente lento
+    encher, a mensagem mais antiga é descartada; se o cliente continuar atrasado (mais de
+    `max_dropped` mensagens descartadas) ou um envio exceder `send_timeout`, é desligado.
+    """
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        send_timeout: Optional[float] = None,
+        max_dropped: Optional[int] = None,
+        backplane: Optional[Backplane] = None,
+    ):
+        self.queue_size = queue_size or settings.WS_SEND_QUEUE_SIZE
+        self.send_timeout = send_timeout or settings.WS_SEND_TIMEOUT_SECONDS
+        self.max_dropped = max_dropped or settings.WS_MAX_DROPPED_MESSAGES
+        self.active_connections: Dict[UUID, Set[WebSocket]] = {}
+        self._connections: Dict[WebSocket, _Connection] = {}
+        self._subscribers: Dict[str, Set[WebSocket]] = {}
+        self._closing: Set[asyncio.Task] = set()
+        self.messages_enqueued = 0
+        self.messages_dropped = 0
+        self.evicted_connections = 0
+        self.backplane = backplane
+        if backplane is not None:
+            backplane.subscribe("ws", self._on_backplane_event)
+
+    @property
+    def connection_count(self) -> int:
+        return len(self._connections)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "connections": self.connection_count,
+            "users": len(self.active_connections),
+            "topics": len(self._subscribers),
+            "queued_messages": sum(conn.queue.qsize() for conn in self._connections.values()),
+            "messages_enqueued": self.messages_enqueued,
+            "messages_dropped": self.messages_dropped,
+            "evicted_connections": self.evicted_connections,
+        }
 
     async def connect(self, websocket: WebSocket, user_id: UUID):
         """Associa uma conexão WebSocket já aceite a um ID de utilizador."""
-        self.active_connections[user_id] = websocket
-        print(f"Conexão associada ao utilizador: {user_id}. Total de conexões: {len(self.active_connections)}")
+        conn = _Connection(websocket, user_id, self.queue_size)
+        conn.writer = asyncio.create_task(self._writer(conn))
+        self._connections[websocket] = conn
+        self.active_connections.setdefault(user_id, set()).add(websocket)
+        self._add_subscription(conn, user_topic(user_id))
+        print(f"Conexão associada ao utilizador: {user_id}. Total de conexões: {self.connection_count}")
+
+    def disconnect(self, websocket: WebSocket):
+        """Remove uma conexão WebSocket, as suas subscrições e a tarefa de envio."""
+        conn = self._connections.pop(websocket, None)
+        if conn is None:
+            return
+        if conn.writer is not None and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
+        for topic in conn.topics:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(websocket)
+                if not subscribers:
+                    del self._subscribers[topic]
+        sockets = self.active_connections.get(conn.user_id)
+        if sockets is not None:
+            sockets.discard(websocket)
+            if not sockets:
+                del self.active_connections[conn.user_id]
+        print(f"Cliente desconectado: {conn.user_id}. Total de conexões: {self.connection_count}")
+
+    def _evict(self, conn: _Connection, reason: str):
+        """Desliga um cliente lento. O fecho é feito em fundo para não bloquear quem publica."""
+        if conn.websocket not in self._connections:
+            return
+        self.evicted_connections += 1
+        print(f"A desligar cliente lento ({reason}): {conn.user_id}")
+        self.disconnect(conn.websocket)
+        task = asyncio.create_task(self._close(conn.websocket))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close(self, websocket: WebSocket):
+        # Sem timeout nosso: o servidor ASGI aborta a ligação se o cliente não completar o fecho
+        try:
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        except Exception:
+            pass
+
+    async def _writer(self, conn: _Connection):
+        """Envia as mensagens da fila de uma conexão, uma de cada vez."""
+        try:
+            while True:
+                message = await conn.queue.get()
+                await asyncio.wait_for(conn.websocket.send_text(message), self.send_timeout)
+                if conn.queue.empty():
+                    conn.dropped = 0
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self._evict(conn, "timeout no envio")
+        except Exception:
+            # A conexão foi fechada pelo cliente
+            self.disconnect(conn.websocket)
+
+    def _enqueue(self, conn: _Connection, message: str):
+        if conn.queue.full():
+            conn.queue.get_nowait()
+            conn.dropped += 1
+            self.messages_dropped += 1
+            if conn.dropped > self.max_dropped:
+                self._evict(conn, f"{conn.dropped} mensagens descartadas")
+                return
+        conn.queue.put_nowait(message)
+        self.messages_enqueued += 1
+
+    def _add_subscription(self, conn: _Connection, topic: str) -> None:
+        self._subscribers.setdefault(topic, set()).add(conn.websocket)
+        conn.topics.add(topic)
+
+    def subscribe(self, websocket: WebSocket, topics: Iterable[str]) -> List[str]:
+        """
+        Subscreve tópicos pedidos pelo cliente. Devolve os tópicos aceites
+        (os inválidos e os que excedem o limite por conexão são ignorados).
+        """
+        conn = self._connections.get(websocket)
+        if conn is None:
+            return []
+        accepted = []
+        for topic in topics:
+            if not isinstance(topic, str) or not CLIENT_TOPIC_PATTERN.match(topic):
+                continue
+            if topic not in conn.topics and len(conn.topics) >= MAX_SUBSCRIPTIONS_PER_CONNECTION:
+                break
+            self._add_subscription(conn, topic)
+            accepted.append(topic)
+        return accepted
+
+    def unsubscribe(self, websocket: WebSocket, topics: Iterable[str]) -> List[str]:
+        """Cancela subscrições pedidas pelo cliente. Devolve os tópicos removidos."""
+        conn = self._connections.get(websocket)
+        if conn is None:
+            return []
+        removed = []
+        for topic in topics:
+            if isinstance(topic, str) and topic in conn.topics and CLIENT_TOPIC_PATTERN.match(topic):
+                conn.topics.discard(topic)
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(websocket)
+                    if not subscribers:
+                        del self._subscribers[topic]
+                removed.append(topic)
+        return removed
+
+    def _send(self, sockets: Iterable[WebSocket], payload: Dict[str, Any]):
+        """Serializa a mensagem uma única vez e coloca-a na fila de cada conexão."""
+        sockets = list(sockets)
+        if not sockets:
+            return
+        message = json.dumps(payload, separators=(",", ":"), default=str)
+        for websocket in sockets:
+            conn = self._connections.get(websocket)
+            if conn is not None:
+                self._enqueue(conn, message)
 
-    def disconnect(self, user_id: UUID):
-        """Remove uma conexão WebSocket pelo ID do utilizador."""
-        if user_id in self.active_connections:
-            del self.active_connections[user_id]
-            print(f"Cliente desconectado: {user_id}. Total de conexões: {len(self.active_connections)}")
+    async def send_personal(self, websocket: WebSocket, payload: Dict[str, Any]):
+        """Envia um payload JSON a uma única conexão (respostas a pedidos do próprio cliente)."""
+        self._send([websocket], payload)
+
+    def _deliver(self, topics: Optional[List[str]], payload: Dict[str, Any]):
+        """Entrega às conexões deste processo (todas, se `topics` for None)."""
+        if topics is None:
+            self._send(self._connections, payload)
+            return
+        sockets: Set[WebSocket] = set()
+        for topic in topics:
+            sockets.update(self._subscribers.get(topic, ()))
+        self._send(sockets, payload)
+
+    async def _on_backplane_event(self, data: Dict[str, Any]):
+        self._deliver(data["topics"], data["payload"])
+
+    async def _publish(self, topics: Optional[List[str]], payload: Dict[str, Any]):
+        if self.backplane is None:
+            self._deliver(topics, payload)
+        else:
+            await self.backplane.publish("ws", {"topics": topics, "payload": payload})
+
+    async def publish(self, topics: Iterable[str], payload: Dict[str, Any]):
+        """
+        Envia um payload JSON às conexões subscritas em qualquer um dos tópicos.
+        Uma conexão subscrita em vários deles recebe a mensagem apenas uma vez.
+        """
+        await self._publish(list(topics), payload)
+
+    async def send_to_user(self, user_id: UUID, payload: Dict[str, Any]):
+        """Envia um payload JSON a todas as conexões de um utilizador."""
+        await self.publish([user_topic(user_id)], payload)
 
     async def broadcast(self, message_text: str):
         """Envia uma mensagem de texto para todos os utilizadores conectados."""
-        if not self.active_connections:
-            return
+        await self.broadcast_json({"type": "notification", "message": message_text})
+
+    async def broadcast_json(self, payload: Dict[str, Any]):
+        """Envia um payload JSON para todas as conexões, independentemente das subscrições."""
+        await self._publish(None, payload)
 
-        payload = {"type": "notification", "message": message_text}
-        message = json.dumps(payload)
-        
-        tasks = [
-            connection.send_text(message)
-            for connection in self.active_connections.values()
-        ]
-        if tasks:
-            await asyncio.gather(*tasks)
-
-manager = ConnectionManager()
+manager = ConnectionManager(backplane=backplane)